@@ -0,0 +1,268 @@
+# src/app/adapters/embedding_cache.py
+"""
+Persistent cache in front of the embeddings client.
+
+Search queries, semantic-cache lookups and re-ingestion embed the same
+strings over and over. `CachedEmbeddings` wraps any `Embeddings` (the port in
+`core/ports.py`) and keeps each vector in a local SQLite file keyed by
+(model, sha256(text)), stored as a float32 blob (~4 bytes per dimension
+instead of ~25 for a JSON float list). Only cache misses reach the API,
+and `embed_documents` sends all of a batch's misses in one call.
+
+The file is capped at `embedding_cache_max_bytes`. Least recently used
+vectors are evicted beyond it. Lookups are exported as
+`blob_cache_*{cache="embedding"}`.
+
+The cache never fails an embedding call. If the file is locked by another
+process past the busy timeout, or the disk is full, the lookup counts as a
+miss, the fresh vectors are returned unstored, and the failure is counted as
+`blob_cache_requests_total{result="error"}`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config.settings import settings
+from ..metrics import BLOB_CACHE_BYTES, BLOB_CACHE_BYTES_SAVED, BLOB_CACHE_HIT_RATIO, BLOB_CACHE_REQUESTS
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    hash  BLOB NOT NULL,
+    vec   BLOB NOT NULL,
+    used  REAL NOT NULL,
+    PRIMARY KEY (model, hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used);
+"""
+
+_BUSY_TIMEOUT_MS = 5000     # wait this long for another process's write lock
+
+
+def text_hash(text: str) -> bytes:
+    """sha256 digest of the exact text sent to the embeddings API."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class SqliteEmbeddingStore:
+    """
+    Size-capped (model, sha256(text)) -> float32 vector store in one SQLite file.
+
+    Thread-safe: one connection guarded by a lock (ingestion embeds from
+    several threads).
+    """
+
+    name = "embedding"
+
+    def __init__(self, path: str, *, max_bytes: int, clock=time.time) -> None:
+        """
+        Parameters
+        ----------
+        path : str
+            SQLite file (parent directory is created; ":memory:" for tests).
+        max_bytes : int
+            Cap on stored vector bytes; least recently used are evicted beyond it.
+        clock : Callable[[], float]
+            Time source for recency (injectable for tests).
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(length(vec)), 0) FROM embeddings").fetchone()[0]
+        BLOB_CACHE_BYTES.labels(cache=self.name).set(self._bytes)
+
+    def get_many(self, model: str, hashes: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """Return the stored vectors among `hashes` (refreshing their recency)."""
+        found: Dict[bytes, np.ndarray] = {}
+        uniq = list(dict.fromkeys(hashes))
+        with self._lock:
+            for i in range(0, len(uniq), 500):      # stay under SQLite's variable limit
+                part = uniq[i:i + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE model = ? AND hash IN ({marks})", (model, *part)
+                ).fetchall()
+                for h, vec in rows:
+                    found[h] = np.frombuffer(vec, dtype=np.float32)
+            if found:
+                now = self._clock()
+                self._conn.executemany(
+                    "UPDATE embeddings SET used = ? WHERE model = ? AND hash = ?",
+                    [(now, model, h) for h in found],
+                )
+        self._record(hits=len(found), misses=len(uniq) - len(found),
+                      saved=sum(v.nbytes for v in found.values()))
+        return found
+
+    def put_many(self, model: str, items: Dict[bytes, Sequence[float]]) -> None:
+        """Store vectors, then evict least recently used ones over the cap."""
+        if not items:
+            return
+        now = self._clock()
+        rows = [(model, h, np.asarray(v, dtype=np.float32).tobytes(), now) for h, v in items.items()]
+        with self._lock:
+            grown = 0
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for model_, h, blob, used in rows:
+                    old = self._conn.execute(
+                        "SELECT length(vec) FROM embeddings WHERE model = ? AND hash = ?", (model_, h)
+                    ).fetchone()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO embeddings (model, hash, vec, used) VALUES (?, ?, ?, ?)",
+                        (model_, h, blob, used),
+                    )
+                    grown += len(blob) - (old[0] if old else 0)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._bytes += grown                    # only what was committed
+            self._evict_locked()
+
+    def _evict_locked(self) -> int:
+        if self._bytes <= self.max_bytes:
+            BLOB_CACHE_BYTES.labels(cache=self.name).set(self._bytes)
+            return 0
+        removed = 0
+        # Delete oldest-used rows in chunks until ~90% of the cap, so eviction
+        # doesn't run again on the very next insert.
+        target = int(self.max_bytes * 0.9)
+        while self._bytes > target:
+            rows = self._conn.execute(
+                "SELECT model, hash, length(vec) FROM embeddings ORDER BY used LIMIT 256"
+            ).fetchall()
+            if not rows:
+                break
+            drop, freed = [], 0
+            for model, h, size in rows:
+                if self._bytes - freed <= target:
+                    break
+                drop.append((model, h))
+                freed += size
+            self._conn.executemany("DELETE FROM embeddings WHERE model = ? AND hash = ?", drop)
+            self._bytes -= freed
+            removed += len(drop)
+        BLOB_CACHE_BYTES.labels(cache=self.name).set(self._bytes)
+        log.info("Embedding cache evicted %d vector(s); %d bytes kept.", removed, self._bytes)
+        return removed
+
+    @property
+    def size_bytes(self) -> int:
+        """Tracked total size of stored vectors."""
+        return self._bytes
+
+    @property
+    def hit_ratio(self) -> float:
+        """Hits / lookups since creation (0.0 before the first lookup)."""
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
+
+    def _record(self, *, hits: int, misses: int, saved: int) -> None:
+        with self._lock:
+            self._hits += hits
+            self._misses += misses
+            ratio = self.hit_ratio
+        if hits:
+            BLOB_CACHE_REQUESTS.labels(cache=self.name, result="hit").inc(hits)
+            BLOB_CACHE_BYTES_SAVED.labels(cache=self.name).inc(saved)
+        if misses:
+            BLOB_CACHE_REQUESTS.labels(cache=self.name, result="miss").inc(misses)
+        BLOB_CACHE_HIT_RATIO.labels(cache=self.name).set(ratio)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class CachedEmbeddings:
+    """
+    `Embeddings` wrapper that only sends uncached texts to the inner client.
+    """
+
+    def __init__(self, inner, store: SqliteEmbeddingStore, model: Optional[str] = None) -> None:
+        """
+        Parameters
+        ----------
+        inner : Embeddings
+            The real client (e.g., `OpenAIEmbeddings`).
+        store : SqliteEmbeddingStore
+            Persistent vector cache.
+        model : Optional[str]
+            Cache namespace (default: the inner client's `model`, else
+            settings.openai_embed_model).
+        """
+        self.inner = inner
+        self.store = store
+        self.model = model or getattr(inner, "model", None) or settings.openai_embed_model
+
+    def _lookup(self, hashes: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        try:
+            return self.store.get_many(self.model, hashes)
+        except sqlite3.Error as e:
+            log.warning("Embedding cache lookup skipped: %s", e)
+            BLOB_CACHE_REQUESTS.labels(cache=self.store.name, result="error").inc()
+            return {}
+
+    def _store(self, items: Dict[bytes, Sequence[float]]) -> None:
+        try:
+            self.store.put_many(self.model, items)
+        except sqlite3.Error as e:
+            log.warning("Embedding cache write skipped: %s", e)
+            BLOB_CACHE_REQUESTS.labels(cache=self.store.name, result="error").inc()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(t) for t in texts]
+        found = self._lookup(hashes)
+        missing: Dict[bytes, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in found:
+                missing.setdefault(h, t)            # one API slot per distinct text
+        if missing:
+            vectors = self.inner.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing, vectors))
+            self._store(fresh)
+            found.update((h, np.asarray(v, dtype=np.float32)) for h, v in fresh.items())
+        return [found[h].tolist() for h in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        h = text_hash(text)
+        found = self._lookup([h])
+        if h in found:
+            return found[h].tolist()
+        vec = self.inner.embed_query(text)
+        self._store({h: vec})
+        return list(vec)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+def build_cached_embeddings(inner):
+    """
+    Wrap `inner` with the persistent cache configured in settings (or return
+    it unchanged when the cache is disabled).
+    """
+    if not settings.embedding_cache_enabled:
+        return inner
+    store = SqliteEmbeddingStore(settings.embedding_cache_path, max_bytes=settings.embedding_cache_max_bytes)
+    return CachedEmbeddings(inner, store)
@@ -0,0 +1,395 @@
+# src/app/adapters/hybrid_search.py
+"""
+Hybrid lexical + vector search over the `karan_bio` chunks.
+
+Summit questions are full of exact names ("room B204", speaker surnames)
+that dense embeddings rank poorly. `HybridVectorStore` wraps the vector
+store (Chroma or NumPy) and keeps a BM25 inverted index over the same
+chunks. Every `upsert`/`delete` from ingestion updates both, so the index
+is built at ingestion time, not at query time. The BM25 file is written
+once per ingestion run (`flush()`), not per batch. A process serving
+searches reloads it when the file changes, e.g. after `karan-bot-ingest`
+ran elsewhere.
+
+`search()` takes one of three paths (counted in `hybrid_searches_total{path}`):
+- lexical -> a short query whose terms all occur together in some chunk, and
+             whose top BM25 hit clearly beats the runner-up, is answered
+             from BM25 alone, with no embedding call and no vector search
+             (off by default: see `lexical_min_margin`)
+- hybrid  -> BM25 and vector candidates fused with reciprocal rank fusion:
+             score(d) = sum over both rankings of 1 / (rrf_k + rank(d))
+- vector  -> no query term is in the index vocabulary
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+import uuid
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from ..config.settings import settings
+from ..metrics import HYBRID_SEARCHES, inc
+from .vector_numpy import SearchRetriever, metadata_matches
+
+log = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or "
+    "s the to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric terms without stopwords ("Room B-204" -> ["room", "b", "204"])."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Incrementally updated BM25 (Okapi) index, persisted as one JSON file.
+
+    Each chunk's term frequencies are stored, so loading rebuilds the
+    postings without re-tokenizing anything. Writes stay in memory until
+    `save()`/`flush()`. `refresh()` picks up a file another process
+    replaced.
+    """
+
+    def __init__(self, path: Optional[str] = None, *, k1: float = 1.5, b: float = 0.75) -> None:
+        """
+        Parameters
+        ----------
+        path : Optional[str]
+            JSON file to load from and save to (None = in memory only).
+        k1, b : float
+            BM25 term-saturation and length-normalization parameters.
+        """
+        self.path = path
+        self.k1, self.b = k1, b
+        self._docs: Dict[str, Tuple[str, Dict[str, Any], Dict[str, int]]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_len = 0
+        self._lock = threading.RLock()
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._dirty = False
+        self.refresh()
+
+    # ------- persistence -------
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Identity of the index file (os.replace gives it a new inode), None if absent."""
+        if not self.path:
+            return None
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load(self) -> None:
+        stamp = self._file_stamp()
+        with open(self.path, encoding="utf-8") as f:
+            docs = json.load(f)
+        self._docs, self._postings, self._lengths, self._total_len = {}, {}, {}, 0
+        for doc_id, (text, meta, tf) in docs.items():
+            self._index(doc_id, text, meta, tf)
+        self._stamp = stamp
+        log.info("BM25 index loaded: %d chunks, %d terms.", len(self._docs), len(self._postings))
+
+    def refresh(self) -> bool:
+        """
+        Reload the file if another process replaced it since it was last
+        read or written here. Skipped while this index has unsaved writes.
+        Returns True if it reloaded.
+        """
+        with self._lock:
+            stamp = self._file_stamp()
+            if stamp is None or stamp == self._stamp or self._dirty:
+                return False
+            self._load()
+            return True
+
+    def save(self) -> None:
+        """Write the index atomically (no-op without a path)."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.{uuid.uuid4().hex}.part"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._docs, f)
+            os.replace(tmp, self.path)
+            self._stamp = self._file_stamp()
+            self._dirty = False
+
+    def flush(self) -> None:
+        """Save if there are unsaved writes."""
+        if self._dirty:
+            self.save()
+
+    # ------- writes -------
+
+    def _index(self, doc_id: str, text: str, meta: Dict[str, Any], tf: Dict[str, int]) -> None:
+        self._docs[doc_id] = (text, meta, tf)
+        length = sum(tf.values())
+        self._lengths[doc_id] = length
+        self._total_len += length
+        for term, n in tf.items():
+            self._postings.setdefault(term, {})[doc_id] = n
+
+    def _unindex(self, doc_id: str) -> None:
+        _, _, tf = self._docs.pop(doc_id)
+        self._total_len -= self._lengths.pop(doc_id)
+        for term in tf:
+            post = self._postings[term]
+            post.pop(doc_id, None)
+            if not post:
+                del self._postings[term]
+
+    def upsert(self, ids, texts, metadatas=None) -> None:
+        """Add or replace chunks (tokenized once, here)."""
+        metadatas = metadatas or [{} for _ in ids]
+        with self._lock:
+            for doc_id, text, meta in zip(ids, texts, metadatas):
+                if doc_id in self._docs:
+                    self._unindex(doc_id)
+                self._index(doc_id, text, dict(meta or {}), dict(Counter(tokenize(text))))
+            self._dirty = True
+
+    def delete(self, ids) -> None:
+        """Remove chunks by id (unknown ids are ignored)."""
+        with self._lock:
+            for doc_id in ids:
+                if doc_id in self._docs:
+                    self._unindex(doc_id)
+                    self._dirty = True
+
+    # ------- reads -------
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._docs
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._docs)
+
+    def has_terms(self, terms: Iterable[str]) -> List[str]:
+        """The subset of `terms` present in the vocabulary."""
+        return [t for t in terms if t in self._postings]
+
+    def search(
+        self,
+        terms: List[str],
+        k: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[str, float, int]]:
+        """
+        Top-k `(id, bm25 score, matched query terms)` for tokenized `terms`.
+        """
+        with self._lock:
+            n = len(self._docs)
+            if not n or not terms:
+                return []
+            avg = self._total_len / n or 1.0
+            scores: Dict[str, float] = {}
+            matched: Dict[str, int] = {}
+            for term in set(terms):
+                post = self._postings.get(term)
+                if not post:
+                    continue
+                idf = math.log(1 + (n - len(post) + 0.5) / (len(post) + 0.5))
+                for doc_id, tf in post.items():
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+            if filter:
+                scores = {d: s for d, s in scores.items() if metadata_matches(self._docs[d][1], filter)}
+            top = heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+            return [(d, s, matched[d]) for d, s in top]
+
+    def document(self, doc_id: str, score: Optional[float] = None) -> Document:
+        """The stored chunk as a `Document` (with its BM25 `score`, if given)."""
+        text, meta, _ = self._docs[doc_id]
+        return Document(id=doc_id, page_content=text, metadata=meta if score is None else {**meta, "score": score})
+
+
+class HybridVectorStore:
+    """
+    `VectorStore` that pairs a vector index with a BM25 index over the same chunks.
+    """
+
+    def __init__(
+        self,
+        vector,
+        bm25: BM25Index,
+        *,
+        rrf_k: Optional[int] = None,
+        candidates: Optional[int] = None,
+        lexical_max_terms: Optional[int] = None,
+        lexical_min_margin: Optional[float] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        vector : VectorStore
+            `VSAdapter` (Chroma) or `NumpyVectorStore`.
+        bm25 : BM25Index
+            Lexical index kept in step with `vector`.
+        rrf_k : Optional[int]
+            Reciprocal rank fusion constant (default: settings.hybrid_rrf_k).
+        candidates : Optional[int]
+            Results taken from each ranking before fusion (default: settings).
+        lexical_max_terms : Optional[int]
+            Longest query (in content terms) eligible for the lexical-only
+            path; 0 disables it (default: settings).
+        lexical_min_margin : Optional[float]
+            Relative gap `(top - second) / top` between the two best BM25
+            scores required for the lexical-only path. Generic terms ("room",
+            "talk") score many chunks alike and must still be embedded.
+            0 disables the path (default: settings).
+        """
+        self.vector = vector
+        self.bm25 = bm25
+        self.rrf_k = rrf_k or settings.hybrid_rrf_k
+        self.candidates = candidates or settings.hybrid_candidates
+        self.lexical_max_terms = (
+            lexical_max_terms if lexical_max_terms is not None else settings.hybrid_lexical_max_terms
+        )
+        self.lexical_min_margin = (
+            lexical_min_margin if lexical_min_margin is not None else settings.hybrid_lexical_min_margin
+        )
+
+    @property
+    def embeddings(self):
+        return self.vector.embeddings
+
+    # ------- writes (kept in step) -------
+
+    def add_texts(self, texts, metadatas=None):
+        texts = list(texts)
+        ids = self.vector.add_texts(texts, metadatas=metadatas)
+        if ids:
+            self.bm25.upsert(ids, texts, metadatas)
+            self.flush()
+        return ids
+
+    def upsert(self, ids, texts, vectors, metadatas=None) -> None:
+        """Write to both indexes; the BM25 file is written on `flush()`."""
+        self.vector.upsert(ids, texts, vectors, metadatas)
+        self.bm25.upsert(ids, texts, metadatas)
+
+    def delete(self, ids) -> None:
+        """Delete from both indexes; the BM25 file is written on `flush()`."""
+        ids = list(ids)
+        self.vector.delete(ids)
+        self.bm25.delete(ids)
+
+    def flush(self) -> None:
+        """Persist the BM25 index (once per ingestion run, after all batches)."""
+        self.bm25.flush()
+
+    def ids(self, where=None):
+        return self.vector.ids(where)
+
+    def sync(self) -> int:
+        """
+        Make BM25 hold exactly the vector store's chunks: index the ones it
+        lacks (e.g., a collection ingested before hybrid search was enabled,
+        or a run that died before `flush()`) and drop the ones the vector
+        store no longer has. Returns the number of chunks added or removed.
+        """
+        self.bm25.refresh()
+        live = self.vector.ids()
+        held = set(self.bm25.ids())
+        missing = [i for i in live if i not in held]
+        stale = list(held - set(live))
+        ids, texts, metas = [], [], []
+        for doc_id, text, meta in self.vector.documents(missing):
+            ids.append(doc_id)
+            texts.append(text)
+            metas.append(meta)
+        if not ids and not stale:
+            return 0
+        self.bm25.upsert(ids, texts, metas)
+        self.bm25.delete(stale)
+        self.flush()
+        log.info("BM25 index synced: %d chunk(s) added, %d removed.", len(ids), len(stale))
+        return len(ids) + len(stale)
+
+    # ------- reads -------
+
+    def search(self, query: str, k: int = 3, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        self.bm25.refresh()             # once per query: ingestion may have rewritten the file
+        terms = tokenize(query)
+        known = self.bm25.has_terms(terms)
+        if not known:
+            inc(HYBRID_SEARCHES, path="vector")
+            return self.vector.search(query, k=k, filter=filter)
+
+        n_terms = len(set(terms))
+        lexical = self.bm25.search(terms, max(k, self.candidates), filter)
+        full = [hit for hit in lexical if hit[2] == n_terms]
+        if full and n_terms <= self.lexical_max_terms and self._decisive(lexical):
+            # Some chunk contains every query term and clearly outranks the
+            # rest: exact-name lookups ("room B204") need no embedding.
+            inc(HYBRID_SEARCHES, path="lexical")
+            return [self.bm25.document(d, s) for d, s, _ in full[:k]]
+
+        inc(HYBRID_SEARCHES, path="hybrid")
+        dense = self.vector.search(query, k=self.candidates, filter=filter)
+        return self._fuse(dense, lexical, k)
+
+    def _decisive(self, lexical: List[Tuple[str, float, int]]) -> bool:
+        """Whether the top BM25 hit leads the runner-up by `lexical_min_margin`."""
+        if self.lexical_min_margin <= 0:
+            return False
+        top = lexical[0][1]
+        second = lexical[1][1] if len(lexical) > 1 else 0.0
+        return top > 0 and (top - second) / top >= self.lexical_min_margin
+
+    def _fuse(self, dense: List[Document], lexical: List[Tuple[str, float, int]], k: int) -> List[Document]:
+        """Reciprocal rank fusion, keyed by chunk text (ids may be absent on dense results)."""
+        scores: Dict[str, float] = {}
+        docs: Dict[str, Document] = {}
+        for rank, d in enumerate(dense):
+            key = d.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+            docs.setdefault(key, d)
+        for rank, (doc_id, _, _) in enumerate(lexical):
+            doc = self.bm25.document(doc_id)
+            key = doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+            docs.setdefault(key, doc)
+        top = heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+        return [docs[key] for key, _ in top]
+
+    def as_retriever(self, k: int = 3):
+        return SearchRetriever(store=self, k=k)
+
+
+def build_hybrid(vector, collection: str = "karan_bio"):
+    """
+    Wrap `vector` with BM25 hybrid search per settings (or return it
+    unchanged when disabled), reconciling the lexical index with it.
+    """
+    if not settings.hybrid_search_enabled:
+        return vector
+    store = HybridVectorStore(vector, BM25Index(os.path.join(settings.bm25_index_dir, f"{collection}.json")))
+    try:
+        store.sync()
+    except Exception as e:  # the bot still answers from the vector index
+        log.warning("BM25 sync failed (%s); lexical results may be incomplete.", e)
+    return store
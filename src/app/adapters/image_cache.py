@@ -0,0 +1,135 @@
+# src/app/adapters/image_cache.py
+"""
+Prompt-keyed image cache with a pre-rendered variant pool.
+
+Image generation takes tens of seconds, while the bot mostly asks for the
+same persona prompt. `CachedImageGen` keeps up to `pool_size` variants per
+(model, quality, size, prompt) in a `DiskLRU`:
+
+- a request with at least one cached variant is served from disk at once
+  (a random variant, so repeat requests still vary);
+- missing variants are rendered in the background on a single worker;
+- only a completely cold prompt waits for a live generation.
+
+`warm(prompt)` fills the pool ahead of the first request.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set, Tuple
+
+from ..config.settings import settings
+from ..utils.disk_cache import DiskLRU
+from .media_store import get_media_store
+
+log = logging.getLogger(__name__)
+
+
+def image_cache_key(prompt: str, size: str) -> str:
+    """Return the content address of a prompt (model/quality/size included)."""
+    raw = "\x00".join((settings.openai_image_model, settings.openai_image_quality, size, prompt.strip()))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CachedImageGen:
+    """
+    Image generator wrapper serving cached variants from disk.
+
+    Same call signature as the wrapped generator: `image_gen(prompt, size)
+    -> path`; the returned path belongs to the caller.
+    """
+
+    def __init__(self, inner, cache: DiskLRU, pool_size: int = 1) -> None:
+        """
+        Parameters
+        ----------
+        inner : ImageGen
+            The real generator (returns a temp file path).
+        cache : DiskLRU
+            Blob store for rendered images.
+        pool_size : int
+            Variants kept per prompt (>= 1).
+        """
+        self._inner = inner
+        self.cache = cache
+        self.pool_size = max(1, pool_size)
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-pool")
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _variant_keys(self, prompt: str, size: str) -> List[str]:
+        base = image_cache_key(prompt, size)
+        return [f"{base}-{i}" for i in range(self.pool_size)]
+
+    def __call__(self, prompt: str, size: str = "1024x1024") -> str:
+        """Return an image for `prompt`, from the pool when possible."""
+        keys = self._variant_keys(prompt, size)
+        ready = [k for k in keys if self.cache.contains(k)]
+        if ready:
+            path = self.cache.checkout(random.choice(ready))
+            if path is not None:
+                self._refill(prompt, size, keys)
+                return path
+
+        # Cold prompt: render one variant now (counted as a miss).
+        self.cache.get(keys[0])
+        src = self._inner(prompt, size)
+        self.cache.put_file(keys[0], src)
+        self._refill(prompt, size, keys)
+        return src
+
+    def warm(self, prompt: str, size: str = "1024x1024") -> None:
+        """Render all missing variants of `prompt` in the background."""
+        self._refill(prompt, size, self._variant_keys(prompt, size))
+
+    def _refill(self, prompt: str, size: str, keys: List[str]) -> None:
+        for k in keys:
+            if self.cache.contains(k):
+                continue
+            with self._lock:
+                if k in self._pending:
+                    continue
+                self._pending.add(k)
+            self._worker.submit(self._render, prompt, size, k)
+
+    def _render(self, prompt: str, size: str, key: str) -> Tuple[str, bool]:
+        try:
+            src = self._inner(prompt, size)
+            try:
+                self.cache.put_file(key, src)
+            finally:
+                os.remove(src)
+            return key, True
+        except Exception as e:  # background work must not crash the worker
+            log.warning("Image pool render failed: %s", e)
+            return key, False
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the background renderer."""
+        self._worker.shutdown(wait=wait)
+
+
+def build_cached_image_gen(inner):
+    """
+    Wrap `inner` with the disk cache + variant pool from settings (or return
+    it unchanged when the cache is disabled).
+    """
+    if not settings.image_cache_enabled:
+        return inner
+    cache = DiskLRU(
+        "image",
+        settings.image_cache_dir,
+        max_bytes=settings.image_cache_max_bytes,
+        suffix=".png",
+        out_dir=get_media_store().kind_dir("images"),
+    )
+    return CachedImageGen(inner, cache, pool_size=settings.image_pool_size)
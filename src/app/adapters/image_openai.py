@@ -1,21 +1,28 @@
 # src/app/adapters/image_openai.py
 import base64
-import uuid
+
 from openai import OpenAI
 from ..config.settings import settings
+from .media_store import get_media_store
+from .openai_clients import get_openai_clients
 
 
-def build_image_gen():
+def build_image_gen(client: OpenAI | None = None):
     """
     Build an OpenAI image generation client.
 
+    Parameters
+    ----------
+    client : OpenAI | None
+        Client to use (default: the shared pooled client with the image timeout).
+
     Returns
     -------
     Callable[[str, str], str]
         A function `_generate(prompt, size)` that generates an image from a text prompt
         using the configured OpenAI image model and returns the saved image path.
     """
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    client = client or get_openai_clients().for_op("image")
 
     def _generate(prompt: str, size: str = "1024x1024") -> str:
         """
@@ -31,21 +38,22 @@ def build_image_gen():
         Returns
         -------
         str
-            Local file path of the generated PNG image.
+            Local file path of the generated PNG image (a temp file the
+            caller deletes once sent).
         """
         response = client.images.generate(
             model=settings.openai_image_model,
             prompt=prompt,
             size=size,
-            quality="high",
+            quality=settings.openai_image_quality,
         )
 
         # Decode base64 → bytes → PNG
         image_b64 = response.data[0].b64_json
         image_bytes = base64.b64decode(image_b64)
 
-        # Save image to disk with UUID filename
-        file_path = f"{uuid.uuid4()}.png"
+        # Save image to a unique path in the managed media directory
+        file_path = get_media_store().temp_path("images", ".png")
         with open(file_path, "wb") as f:
             f.write(image_bytes)
 
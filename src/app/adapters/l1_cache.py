@@ -0,0 +1,197 @@
+# src/app/adapters/l1_cache.py
+"""
+In-process L1 caches in front of the durable summary (Postgres) and the
+exact-match Q&A cache (Redis).
+
+- `CachedDurableStore` wraps `PgDurableStore`: `get_summary` is served from
+  memory after the first read (including "no summary"), `set_summary`
+  refreshes the local entry. The summarizer's read-modify-write reads
+  through with `get_summary_uncached`, so it never folds new messages into
+  a summary another replica has already replaced.
+- `CachedQAStore` wraps `RedisMemoryStore`: `qa_get` hits are served from
+  memory, `qa_set` refreshes the local entry.
+
+Every other attribute is delegated to the wrapped store. With several
+replicas, pass a `RedisInvalidationBus` so writes on one replica evict the
+key everywhere else.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+from typing import Any, Dict, Hashable, Optional
+
+from ..config.settings import settings
+from ..utils.lru import MISSING, LRUTTLCache
+
+log = logging.getLogger(__name__)
+
+
+class RedisInvalidationBus:
+    """
+    Cross-replica invalidation over Redis pub/sub.
+
+    Messages are `{"origin", "cache", "key"}` JSON; a replica ignores its own
+    messages and deletes `key` from the registered cache named `cache`.
+    """
+
+    def __init__(self, client, channel: Optional[str] = None) -> None:
+        """
+        Parameters
+        ----------
+        client : redis.Redis
+            Client used to publish and subscribe.
+        channel : Optional[str]
+            Pub/sub channel (default: settings.l1_invalidation_channel).
+        """
+        self.client = client
+        self.channel = channel or settings.l1_invalidation_channel
+        self.origin = uuid.uuid4().hex
+        self._caches: Dict[str, LRUTTLCache] = {}
+        self._pubsub = None
+        self._thread = None
+
+    def register(self, cache: LRUTTLCache) -> None:
+        """Receive invalidations for `cache.name`."""
+        self._caches[cache.name] = cache
+
+    def publish(self, cache: str, key: Hashable) -> None:
+        """Tell other replicas to drop `key` (errors are logged, not raised)."""
+        try:
+            self.client.publish(
+                self.channel, json.dumps({"origin": self.origin, "cache": cache, "key": key})
+            )
+        except Exception as e:  # keep writes working if pub/sub is down
+            log.warning("L1 invalidation publish failed: %s", e)
+
+    def handle(self, message: Dict[str, Any]) -> None:
+        """Apply one pub/sub message to the local caches."""
+        try:
+            data = json.loads(message["data"])
+        except Exception:
+            return
+        if data.get("origin") == self.origin:
+            return
+        cache = self._caches.get(data.get("cache"))
+        if cache is not None:
+            cache.delete(data.get("key"))
+
+    def start(self) -> "RedisInvalidationBus":
+        """Subscribe on a daemon thread (returns self for chaining)."""
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self.channel: self.handle})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        return self
+
+    def stop(self) -> None:
+        """Stop the subscriber thread."""
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+
+
+class _L1Wrapper:
+    """Delegation + invalidation plumbing shared by the wrappers."""
+
+    def __init__(self, inner, cache: LRUTTLCache, bus: Optional[RedisInvalidationBus]) -> None:
+        self._inner = inner
+        self.l1 = cache
+        self._bus = bus
+        if bus is not None:
+            bus.register(cache)
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        self.l1.set(key, value)
+        if self._bus is not None:
+            self._bus.publish(self.l1.name, key)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+
+class CachedDurableStore(_L1Wrapper):
+    """
+    `PgDurableStore` with an L1 cache for `get_summary`.
+    """
+
+    def get_summary(self, chat_id: int) -> Optional[str]:
+        """Return the summary from L1, falling back to Postgres."""
+        val = self.l1.get(chat_id)
+        if val is MISSING:
+            val = self._inner.get_summary(chat_id)
+            self.l1.set(chat_id, val)
+        return val
+
+    def get_summary_uncached(self, chat_id: int) -> Optional[str]:
+        """Read the summary from Postgres (refreshing L1), for read-modify-write."""
+        val = self._inner.get_summary(chat_id)
+        self.l1.set(chat_id, val)
+        return val
+
+    def set_summary(self, chat_id: int, text: str, **kwargs: Any) -> None:
+        """Write through to Postgres, then refresh L1 and notify replicas."""
+        self._inner.set_summary(chat_id, text, **kwargs)
+        self._put(chat_id, text)
+
+
+class CachedQAStore(_L1Wrapper):
+    """
+    Short-term memory store with an L1 cache for `qa_get`.
+
+    Only hits are cached locally; misses always go to Redis so an answer
+    stored by another replica is picked up immediately.
+    """
+
+    def _key(self, **kw) -> str:
+        return self._inner._qa_key(**kw)
+
+    def qa_get(self, *, model: str, system_prompt: Optional[str], last_user_text: str) -> Optional[str]:
+        """Return a cached answer from L1, falling back to Redis."""
+        key = self._key(model=model, system_prompt=system_prompt, last_user_text=last_user_text)
+        val = self.l1.get(key)
+        if val is not MISSING:
+            return val
+        val = self._inner.qa_get(model=model, system_prompt=system_prompt, last_user_text=last_user_text)
+        if val is not None:
+            self.l1.set(key, val)
+        return val
+
+    def qa_set(self, *, model: str, system_prompt: Optional[str], last_user_text: str, answer: str) -> None:
+        """Write through to Redis, then refresh L1 and notify replicas."""
+        self._inner.qa_set(
+            model=model, system_prompt=system_prompt, last_user_text=last_user_text, answer=answer
+        )
+        if self._inner._qa_cacheable(last_user_text):
+            self._put(self._key(model=model, system_prompt=system_prompt, last_user_text=last_user_text), answer)
+
+
+def wrap_with_l1(short_mem, durable_mem, *, bus: Optional[RedisInvalidationBus] = None):
+    """
+    Wrap the Q&A store and durable store with L1 caches per settings.
+
+    Parameters
+    ----------
+    short_mem, durable_mem
+        Stores to wrap (`RedisMemoryStore`, `PgDurableStore`).
+    bus : Optional[RedisInvalidationBus]
+        Started here once both caches are registered.
+
+    Returns
+    -------
+    tuple
+        `(short_mem, durable_mem)`, unchanged when `l1_cache_enabled` is off.
+    """
+    if not settings.l1_cache_enabled:
+        return short_mem, durable_mem
+    summaries = LRUTTLCache(
+        "summary", max_bytes=settings.l1_cache_max_bytes, ttl_seconds=settings.l1_summary_ttl_seconds
+    )
+    answers = LRUTTLCache(
+        "qa", max_bytes=settings.l1_cache_max_bytes, ttl_seconds=settings.l1_qa_ttl_seconds
+    )
+    wrapped = CachedQAStore(short_mem, answers, bus), CachedDurableStore(durable_mem, summaries, bus)
+    if bus is not None:
+        bus.start()
+    return wrapped
@@ -1,11 +1,12 @@
 # src/app/adapters/llm_openai.py
 import time
-from typing import Any, Sequence
+from typing import Any, Iterator, Optional, Sequence
 
 from langchain_openai import ChatOpenAI
 
 from ..config.settings import settings
-from ..metrics import LLM_CALLS, LLM_LAT
+from .openai_clients import OpenAIClients, get_openai_clients
+from ..metrics import LLM_CALLS, LLM_LAT, LLM_TOKENS_PER_SEC, LLM_TTFT, observe
 from ..telemetry import get_tracer
 
 
@@ -13,8 +14,9 @@ class LLMWithMetrics:
     """
     Thin wrapper around `ChatOpenAI` that adds tracing and Prometheus metrics.
 
-    Only `.invoke()` is used by the graph; all other attributes/methods are
-    transparently proxied to the inner LLM instance.
+    The graph uses `.invoke()`, or `.stream()` when a caller wants partial
+    output; all other attributes/methods are transparently proxied to the
+    inner LLM instance.
     """
 
     def __init__(self, inner: ChatOpenAI, model: str) -> None:
@@ -62,6 +64,54 @@ class LLMWithMetrics:
         LLM_CALLS.labels(self._model, status).inc()
         return out
 
+    def stream(self, messages: Sequence[Any]) -> Iterator[Any]:
+        """
+        Stream the completion chunk by chunk with tracing and streaming metrics.
+
+        Records time-to-first-token and output tokens/sec in addition to the
+        usual latency/call metrics. Token counts come from usage metadata when
+        the provider sends it, otherwise one token per non-empty chunk.
+
+        Parameters
+        ----------
+        messages : Sequence[Any]
+            LangChain-compatible message sequence.
+
+        Yields
+        ------
+        Any
+            Message chunks (typically `AIMessageChunk`).
+        """
+        t0 = time.perf_counter()
+        first: float = 0.0
+        tokens = 0
+        usage_tokens = 0
+        with self._tracer.start_as_current_span(
+            "llm.stream",
+            attributes={"llm.model": self._model},
+        ) as span:
+            try:
+                for chunk in self._inner.stream(messages):
+                    if getattr(chunk, "content", ""):
+                        if not first:
+                            first = time.perf_counter()
+                            observe(LLM_TTFT, first - t0, model=self._model)
+                        tokens += 1
+                    usage = getattr(chunk, "usage_metadata", None) or {}
+                    usage_tokens = usage.get("output_tokens", usage_tokens)
+                    yield chunk
+            except Exception:
+                LLM_CALLS.labels(self._model, "error").inc()
+                raise
+            end = time.perf_counter()
+            tokens = usage_tokens or tokens
+            if first and end > first:
+                observe(LLM_TOKENS_PER_SEC, tokens / (end - first), model=self._model)
+            if span is not None and hasattr(span, "set_attribute"):
+                span.set_attribute("llm.output_tokens", tokens)
+        LLM_LAT.labels(self._model).observe(end - t0)
+        LLM_CALLS.labels(self._model, "ok").inc()
+
     def __getattr__(self, name: str) -> Any:
         """
         Delegate unknown attribute/method access to the inner LLM.
@@ -69,16 +119,29 @@ class LLMWithMetrics:
         return getattr(self._inner, name)
 
 
-def build_llm() -> LLMWithMetrics:
+def build_llm(clients: Optional[OpenAIClients] = None, model: Optional[str] = None) -> LLMWithMetrics:
     """
     Construct the traced/metricized LLM instance using settings.
 
+    Parameters
+    ----------
+    clients : Optional[OpenAIClients]
+        Shared connection pools (default: the process-wide clients).
+    model : Optional[str]
+        Model name (default: settings.openai_model).
+
     Returns
     -------
     LLMWithMetrics
         Wrapper around `ChatOpenAI` with tracing & Prometheus metrics.
     """
-    model = settings.openai_model
-    timeout = getattr(settings, "openai_timeout_sec", 30)
-    base = ChatOpenAI(model=model, timeout=timeout)
+    clients = clients or get_openai_clients()
+    model = model or settings.openai_model
+    base = ChatOpenAI(
+        model=model,
+        timeout=clients.timeout_for("chat"),
+        stream_usage=True,
+        http_client=clients.http,
+        http_async_client=clients.ahttp,
+    )
     return LLMWithMetrics(base, model)
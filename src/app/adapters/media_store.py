@@ -0,0 +1,213 @@
+# src/app/adapters/media_store.py
+"""
+Managed local storage for media files (downloads, synthesized audio,
+generated images).
+
+- Every file gets a unique path under `<media_dir>/<kind>/`, so concurrent
+  updates never clobber each other (no more fixed `voice.ogg`).
+- `temp_file()` deletes the file when the block exits.
+- A janitor thread removes files older than `media_max_age_seconds` and then
+  the oldest files until the directory fits in `media_max_bytes`. It catches
+  files leaked by crashes or by a send that never happened.
+- Disk usage per kind is exported as gauges after every janitor pass.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from ..config.settings import settings
+from ..metrics import MEDIA_DISK_BYTES, MEDIA_FILES, MEDIA_FILES_REMOVED
+
+log = logging.getLogger(__name__)
+
+
+class MediaStore:
+    """
+    Unique temp paths plus size/age-bounded cleanup for a media directory.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        *,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[int] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        root : Optional[str]
+            Media directory (default: settings.media_dir).
+        max_bytes : Optional[int]
+            Size cap enforced by the janitor (default: settings).
+        max_age_seconds : Optional[int]
+            Files older than this are removed by the janitor (default: settings).
+        """
+        self.root = root or settings.media_dir
+        self.max_bytes = max_bytes if max_bytes is not None else settings.media_max_bytes
+        self.max_age = max_age_seconds if max_age_seconds is not None else settings.media_max_age_seconds
+        os.makedirs(self.root, exist_ok=True)
+
+    # ------- paths -------
+
+    def kind_dir(self, kind: str) -> str:
+        """Directory for one media kind (created on demand)."""
+        d = os.path.join(self.root, kind)
+        os.makedirs(d, exist_ok=True)
+        return d
+
+    def temp_path(self, kind: str, suffix: str = "") -> str:
+        """Return a fresh, unique path for a `kind` file (not created)."""
+        return os.path.join(self.kind_dir(kind), f"{uuid.uuid4().hex}{suffix}")
+
+    @contextmanager
+    def temp_file(self, kind: str, suffix: str = "") -> Iterator[str]:
+        """Yield a unique path and delete the file (if any) afterwards."""
+        path = self.temp_path(kind, suffix)
+        try:
+            yield path
+        finally:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # ------- janitor -------
+
+    def _files(self):
+        for kind in os.scandir(self.root):
+            if not kind.is_dir():
+                continue
+            for f in os.scandir(kind.path):
+                if f.is_file():
+                    try:
+                        st = f.stat()
+                    except FileNotFoundError:   # a sender or `temp_file` just deleted it
+                        continue
+                    yield kind.name, f.path, st.st_size, st.st_mtime
+
+    def usage(self) -> Dict[str, Tuple[int, int]]:
+        """Return `{kind: (files, bytes)}` and refresh the disk gauges."""
+        out: Dict[str, Tuple[int, int]] = {}
+        for kind, _, size, _ in self._files():
+            n, b = out.get(kind, (0, 0))
+            out[kind] = (n + 1, b + size)
+        for kind in (d.name for d in os.scandir(self.root) if d.is_dir()):
+            n, b = out.get(kind, (0, 0))
+            MEDIA_FILES.labels(kind=kind).set(n)
+            MEDIA_DISK_BYTES.labels(kind=kind).set(b)
+        return out
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Remove expired files, then the oldest ones until under the size cap.
+
+        Parameters
+        ----------
+        now : Optional[float]
+            Reference UNIX time (default: current time; handy for tests).
+
+        Returns
+        -------
+        int
+            Number of files removed.
+        """
+        now = now if now is not None else time.time()
+        files = sorted(self._files(), key=lambda f: f[3])
+        removed = 0
+        keep = []
+        for kind, path, size, mtime in files:
+            if self.max_age and now - mtime > self.max_age and self._remove(path):
+                MEDIA_FILES_REMOVED.labels(reason="age").inc()
+                removed += 1
+            else:
+                keep.append((path, size))
+
+        total = sum(size for _, size in keep)
+        for path, size in keep:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                MEDIA_FILES_REMOVED.labels(reason="size").inc()
+                removed += 1
+                total -= size
+
+        self.usage()
+        if removed:
+            log.info("Media janitor removed %d file(s); %d bytes kept.", removed, total)
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+class MediaJanitor:
+    """
+    Daemon thread that runs `MediaStore.sweep()` periodically.
+    """
+
+    def __init__(self, store: MediaStore, interval_seconds: float) -> None:
+        self.store = store
+        self.interval = interval_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="media-janitor", daemon=True)
+
+    def start(self) -> "MediaJanitor":
+        """Start the background loop (returns self for chaining)."""
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Signal the loop to exit and wait for it."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.store.sweep()
+            except Exception as e:  # pragma: no cover (keep the janitor alive)
+                log.warning("Media janitor run failed: %s", e)
+
+
+_store: Optional[MediaStore] = None
+_store_lock = threading.Lock()
+
+
+def get_media_store() -> MediaStore:
+    """
+    Return the process-wide media store, creating it on first use.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MediaStore()
+    return _store
+
+
+def start_media_janitor(interval_seconds: Optional[float] = None) -> Optional[MediaJanitor]:
+    """
+    Start periodic cleanup of the media directory (None when the interval is 0).
+    """
+    interval = (
+        interval_seconds if interval_seconds is not None else settings.media_janitor_interval_seconds
+    )
+    if not interval or interval <= 0:
+        return None
+    store = get_media_store()
+    store.sweep()
+    log.info("Media janitor scheduled every %ss for %s.", interval, store.root)
+    return MediaJanitor(store, interval).start()
@@ -1,9 +1,75 @@
 # src/app/adapters/memory_postgres.py
-from typing import Iterable, Optional, Tuple
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
 
-from sqlalchemy import insert, select, update
+from sqlalchemy import JSON, String, cast, func, insert, literal, or_, select, update
 
+from ..config.settings import settings
 from ..db import Chat, ChatMemory, ChatMessage, SessionLocal, User
+from ..utils.lru import LRUTTLCache
+
+
+def _dialect_insert(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert
+
+
+def _bump_cursor(dialect: str, flags, covered: int):
+    """
+    `flags` with `summary_cursor` advanced by `covered`, as a SQL expression
+    over the stored row (so concurrent writers never lose an increment).
+    """
+    cursor = func.coalesce(flags["summary_cursor"].as_integer(), 0) + covered
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import JSONB
+
+        merged = func.coalesce(cast(flags, JSONB), cast(literal("{}", String), JSONB)).op("||")(
+            func.jsonb_build_object("summary_cursor", cursor)
+        )
+        return cast(merged, JSON)
+    return func.json_set(func.coalesce(flags, literal("{}", String)), "$.summary_cursor", cursor)
+
+
+def _upsert(s, model, key: str, values: Dict[str, Any], *, only_if_changed: bool = True) -> None:
+    """
+    Insert-or-update one row in a single statement.
+
+    On Postgres/SQLite this is `INSERT ... ON CONFLICT (key) DO UPDATE ...
+    WHERE <any field IS DISTINCT FROM the new value>`, so an unchanged row is
+    not rewritten (no dead tuple, no trigger). Pass `only_if_changed=False`
+    for rows that always change (or hold JSON, which has no equality in
+    Postgres). Other dialects fall back to SELECT + UPDATE/INSERT.
+
+    Columns with an `onupdate` default (e.g., `updated_at`) are refreshed on
+    the conflict path too; `ON CONFLICT DO UPDATE` does not apply them.
+    """
+    table = model.__table__
+    dialect = s.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = _dialect_insert(dialect)(table).values(**values)
+        fields = [c for c in values if c != key]
+        changed = or_(*(table.c[c].is_distinct_from(stmt.excluded[c]) for c in fields))
+        touched = {
+            c.name: c.onupdate.arg
+            for c in table.columns
+            if c.name not in values and c.onupdate is not None and c.onupdate.is_clause_element
+        }
+        s.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c[key]],
+                set_={**{c: stmt.excluded[c] for c in fields}, **touched},
+                where=changed if only_if_changed else None,
+            )
+        )
+        return
+
+    pk = table.c[key]
+    if s.execute(select(pk).where(pk == values[key])).first() is not None:
+        s.execute(update(table).where(pk == values[key]).values(**values))
+    else:
+        s.execute(insert(table).values(**values))
 
 
 class PgDurableStore:
@@ -12,8 +78,37 @@ class PgDurableStore:
 
     Uses SQLAlchemy sessions from `SessionLocal` with short-lived context
     managers to keep connections tidy and commits explicit.
+
+    Identity upserts are fronted by an in-process cache of the last profile
+    written per user/chat: a returning user with unchanged fields costs no
+    database round-trip at all.
     """
 
+    def __init__(self, session_factory=SessionLocal) -> None:
+        """
+        Parameters
+        ----------
+        session_factory : sessionmaker
+            Session factory (default: the shared `db.SessionLocal`).
+        """
+        self._session = session_factory
+        self._identity = (
+            LRUTTLCache(
+                "identity",
+                max_bytes=settings.identity_cache_max_bytes,
+                ttl_seconds=settings.identity_cache_ttl_seconds,
+            )
+            if settings.identity_cache_enabled
+            else None
+        )
+
+    def _identity_unchanged(self, key: Hashable, values: Dict[str, Any]) -> bool:
+        return self._identity is not None and self._identity.get(key) == values
+
+    def _remember_identity(self, key: Hashable, values: Dict[str, Any]) -> None:
+        if self._identity is not None:
+            self._identity.set(key, values)
+
     # ------- identity -------
 
     def ensure_user(
@@ -25,7 +120,7 @@ class PgDurableStore:
         username: Optional[str],
     ) -> None:
         """
-        Upsert a user by `user_id`.
+        Upsert a user by `user_id` (skipped when the profile is unchanged).
 
         Parameters
         ----------
@@ -34,31 +129,14 @@ class PgDurableStore:
         first_name, last_name, username : Optional[str]
             Latest user profile fields to persist.
         """
-        with SessionLocal() as s:
-            row = s.execute(
-                select(User).where(User.user_id == user_id)
-            ).scalar_one_or_none()
-
-            if row:
-                s.execute(
-                    update(User)
-                    .where(User.user_id == user_id)
-                    .values(
-                        first_name=first_name,
-                        last_name=last_name,
-                        username=username,
-                    )
-                )
-            else:
-                s.execute(
-                    insert(User).values(
-                        user_id=user_id,
-                        first_name=first_name,
-                        last_name=last_name,
-                        username=username,
-                    )
-                )
+        values = {"user_id": user_id, "first_name": first_name, "last_name": last_name, "username": username}
+        key = ("user", user_id)
+        if self._identity_unchanged(key, values):
+            return
+        with self._session() as s:
+            _upsert(s, User, "user_id", values)
             s.commit()
+        self._remember_identity(key, values)
 
     def ensure_chat(
         self,
@@ -69,7 +147,7 @@ class PgDurableStore:
         user_id: Optional[int],
     ) -> None:
         """
-        Upsert a chat by `chat_id`.
+        Upsert a chat by `chat_id` (skipped when nothing changed).
 
         Parameters
         ----------
@@ -82,56 +160,65 @@ class PgDurableStore:
         user_id : Optional[int]
             Owner/peer id for private chats.
         """
-        with SessionLocal() as s:
-            row = s.execute(
-                select(Chat).where(Chat.chat_id == chat_id)
-            ).scalar_one_or_none()
-
-            if row:
-                s.execute(
-                    update(Chat)
-                    .where(Chat.chat_id == chat_id)
-                    .values(
-                        chat_type=chat_type,
-                        title=title,
-                        user_id=user_id,
-                    )
-                )
-            else:
-                s.execute(
-                    insert(Chat).values(
-                        chat_id=chat_id,
-                        chat_type=chat_type,
-                        title=title,
-                        user_id=user_id,
-                    )
-                )
+        values = {"chat_id": chat_id, "chat_type": chat_type, "title": title, "user_id": user_id}
+        key = ("chat", chat_id)
+        if self._identity_unchanged(key, values):
+            return
+        with self._session() as s:
+            _upsert(s, Chat, "chat_id", values)
             s.commit()
+        self._remember_identity(key, values)
 
     # ------- durable summary -------
 
-    def set_summary(self, chat_id: int, text: str) -> None:
+    def set_summary(self, chat_id: int, text: str, *, covered: int = 0) -> None:
         """
         Set or update the latest conversation summary for a chat.
-        """
-        with SessionLocal() as s:
-            row = s.execute(
-                select(ChatMemory).where(ChatMemory.chat_id == chat_id)
-            ).scalar_one_or_none()
 
-            if row:
-                s.execute(
-                    update(ChatMemory)
-                    .where(ChatMemory.chat_id == chat_id)
-                    .values(last_summary=text)
+        Also stamps `last_summary_at` and advances `flags["summary_cursor"]`,
+        a running count of messages folded into the summary (for inspection).
+
+        Parameters
+        ----------
+        chat_id : int
+            Chat id.
+        text : str
+            The new summary.
+        covered : int
+            New messages this summary folds in.
+        """
+        with self._session() as s:
+            table = ChatMemory.__table__
+            dialect = s.get_bind().dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                # One statement: the cursor is incremented on the stored row.
+                stmt = _dialect_insert(dialect)(table).values(
+                    chat_id=chat_id, last_summary=text, last_summary_at=func.now(),
+                    flags={"summary_cursor": covered},
                 )
-            else:
                 s.execute(
-                    insert(ChatMemory).values(
-                        chat_id=chat_id,
-                        last_summary=text,
+                    stmt.on_conflict_do_update(
+                        index_elements=[table.c.chat_id],
+                        set_={
+                            "last_summary": stmt.excluded.last_summary,
+                            "last_summary_at": stmt.excluded.last_summary_at,
+                            "updated_at": func.now(),
+                            "flags": _bump_cursor(dialect, table.c.flags, covered),
+                        },
                     )
                 )
+            else:
+                flags = s.execute(
+                    select(ChatMemory.flags).where(ChatMemory.chat_id == chat_id).with_for_update()
+                ).scalar_one_or_none() or {}
+                flags = {**flags, "summary_cursor": int(flags.get("summary_cursor", 0)) + covered}
+                _upsert(
+                    s,
+                    ChatMemory,
+                    "chat_id",
+                    {"chat_id": chat_id, "last_summary": text, "last_summary_at": func.now(), "flags": flags},
+                    only_if_changed=False,
+                )
             s.commit()
 
     def get_summary(self, chat_id: int) -> Optional[str]:
@@ -143,7 +230,7 @@ class PgDurableStore:
         Optional[str]
             The summary text if present; otherwise None.
         """
-        with SessionLocal() as s:
+        with self._session() as s:
             return s.execute(
                 select(ChatMemory.last_summary).where(ChatMemory.chat_id == chat_id)
             ).scalar_one_or_none()
@@ -163,7 +250,7 @@ class PgDurableStore:
         content : str
             Raw message text.
         """
-        with SessionLocal() as s:
+        with self._session() as s:
             s.execute(
                 insert(ChatMessage).values(
                     chat_id=chat_id,
@@ -196,6 +283,6 @@ class PgDurableStore:
         if not payload:
             return
 
-        with SessionLocal() as s:
+        with self._session() as s:
             s.execute(insert(ChatMessage), payload)
             s.commit()
@@ -0,0 +1,88 @@
+# src/app/adapters/memory_postgres_async.py
+"""
+Async twin of `PgDurableStore` on an async psycopg connection pool.
+
+Used off the reply path (the history write-behind queue) so Postgres writes
+never hold a worker thread. Same tables as `db.py`; plain SQL keeps it free
+of SQLAlchemy's async extension (which needs greenlet).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Optional, Tuple
+
+from ..config.settings import settings
+from ..db import ChatMessage
+
+log = logging.getLogger(__name__)
+
+_MESSAGES = ChatMessage.__tablename__
+
+
+def _conninfo() -> str:
+    """SQLAlchemy URL -> libpq URL (drop the "+psycopg" driver suffix)."""
+    from sqlalchemy.engine import make_url
+
+    return make_url(settings.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class AsyncPgDurableStore:
+    """
+    Durable message history with awaitable methods (summaries stay on the
+    sync `PgDurableStore`, which the summary worker already runs off-loop).
+    """
+
+    def __init__(self, pool) -> None:
+        """
+        Parameters
+        ----------
+        pool : psycopg_pool.AsyncConnectionPool
+            Open async connection pool (autocommit off; one commit per call).
+        """
+        self.pool = pool
+
+    @classmethod
+    async def open(cls, conninfo: Optional[str] = None) -> "AsyncPgDurableStore":
+        """
+        Open a pool and return the store. Must be awaited inside the running
+        event loop (e.g., PTB `post_init`); release it with `close()`.
+        """
+        from psycopg_pool import AsyncConnectionPool
+
+        pool = AsyncConnectionPool(
+            conninfo or _conninfo(),
+            min_size=1,
+            max_size=settings.durable_async_pool_max_size,
+            kwargs={"prepare_threshold": 0},
+            open=False,
+        )
+        await pool.open()
+        log.info("Async durable store ready (pool max=%s).", settings.durable_async_pool_max_size)
+        return cls(pool)
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        await self.pool.close()
+
+    # ------- durable messages (history) -------
+
+    async def add_messages_bulk(self, *, chat_id: int, turns: Iterable[Tuple[str, str]]) -> None:
+        """
+        Insert several messages in one round-trip and one commit.
+
+        Parameters
+        ----------
+        chat_id : int
+            Chat id for all messages.
+        turns : Iterable[Tuple[str, str]]
+            Iterable of (role, content).
+        """
+        rows = [(chat_id, role, content) for role, content in turns]
+        if not rows:
+            return
+        async with self.pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.executemany(
+                    f"INSERT INTO {_MESSAGES} (chat_id, role, content) VALUES (%s, %s, %s)", rows
+                )
@@ -3,9 +3,12 @@ from __future__ import annotations
 
 import hashlib
 import json
-from typing import List, Optional
+import threading
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import redis
+import redis.asyncio as aioredis
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
 from ..config.settings import settings
@@ -16,44 +19,182 @@ def _sha256(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
 
-class RedisMemoryStore:
+# ---------------- Shared connection pools ----------------
+
+_POOLS: Dict[Tuple[bool, int], object] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _pool_kwargs(db: int) -> dict:
+    """Connection settings shared by the sync and async pools."""
+    return dict(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=db,
+        max_connections=settings.redis_max_connections,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+        health_check_interval=settings.redis_health_check_interval,
+    )
+
+
+def connection_pool(db: int) -> redis.ConnectionPool:
     """
-    Short-term chat memory + global Q&A cache backed by Redis.
+    Return the process-wide sync pool for a Redis DB index (created once).
+    """
+    with _POOLS_LOCK:
+        pool = _POOLS.get((False, db))
+        if pool is None:
+            pool = _POOLS[(False, db)] = redis.ConnectionPool(**_pool_kwargs(db))
+        return pool
 
-    - Conversation window is stored in Redis DB 0 under:
-      `karan:chat:{chat_id}:window`
-    - Q&A cache lives in a separate Redis DB (settings.redis_cache_db),
-      with a “folder-like” namespace: `cache:qa:<hash>`.
+
+def async_connection_pool(db: int) -> aioredis.ConnectionPool:
     """
+    Return the process-wide asyncio pool for a Redis DB index (created once).
 
-    def __init__(self) -> None:
-        # --- Chat window (short-term) ---
-        self.r = redis.Redis(
-            host=settings.redis_host,
-            port=settings.redis_port,
-            db=0,
-        )
+    Connections are opened lazily on the event loop that first uses them.
+    """
+    with _POOLS_LOCK:
+        pool = _POOLS.get((True, db))
+        if pool is None:
+            pool = _POOLS[(True, db)] = aioredis.ConnectionPool(**_pool_kwargs(db))
+        return pool
+
+
+# Swap the summarized part of a window for its summary in one atomic step.
+# The list is newest-first and every entry carries a unique id, so the
+# summarized span is found exactly: take occurrences of its newest message
+# from the tail (oldest end), check the entries after it are the rest of the
+# span (the oldest may have been trimmed off), then drop it and everything
+# older and append the replacement there. Turns pushed while the summary was
+# being written stay.
+# ARGV: ttl, n, the n summarized messages (newest first), replacement (newest first).
+_COMPACT_LUA = """
+local n = tonumber(ARGV[2])
+local hits = redis.call('LPOS', KEYS[1], ARGV[3], 'RANK', -1, 'COUNT', 0)
+for _, pos in ipairs(hits) do
+  local span = redis.call('LRANGE', KEYS[1], pos, pos + n - 1)
+  local same = true
+  for i = 1, #span do
+    if span[i] ~= ARGV[2 + i] then same = false break end
+  end
+  if same then
+    if pos > 0 then
+      redis.call('LTRIM', KEYS[1], 0, pos - 1)
+    else
+      redis.call('DEL', KEYS[1])
+    end
+    for i = 3 + n, #ARGV do redis.call('RPUSH', KEYS[1], ARGV[i]) end
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+    return 1
+  end
+end
+return 0
+"""
+
+
+class _RedisMemoryBase:
+    """
+    Key layout, serialization and config shared by the sync and async stores.
+    """
+
+    def _configure(self) -> None:
         self.ttl = settings.redis_ttl_seconds
         self.window = settings.window_size
-
-        # --- “cache/qa” folder (separate DB) ---
-        self.r_cache = redis.Redis(
-            host=settings.redis_host,
-            port=settings.redis_port,
-            db=settings.redis_cache_db,
-        )
         self.qa_enabled = settings.qa_cache_enabled
         self.qa_ttl = settings.qa_cache_ttl_seconds
         self.qa_ns = settings.qa_cache_namespace.rstrip(":")  # e.g., "cache:qa"
         self.qa_min = settings.qa_cache_min_chars
         self.qa_inc_sys = settings.qa_cache_include_system_prompt
 
-    # ---------------- Conversation window ----------------
-
     def _k(self, chat_id: int) -> str:
         """Return Redis key for the chat’s rolling window."""
         return f"karan:chat:{chat_id}:window"
 
+    @staticmethod
+    def _encode(msg: BaseMessage, stamp: bool = True) -> str:
+        """
+        Serialize a message for the Redis list, with its id (a fresh one if
+        it has none and `stamp` is set), so equal texts stay distinct entries.
+        """
+        mid = msg.id or (uuid.uuid4().hex if stamp else None)
+        body = {"type": msg.type, "content": msg.content}
+        return json.dumps({"id": mid, **body} if mid else body)
+
+    @staticmethod
+    def _decode(raw: List[bytes]) -> List[BaseMessage]:
+        """Decode LRANGE output (newest first) into chronological messages."""
+        out: List[BaseMessage] = []
+        for b in raw[::-1]:
+            p = json.loads(b)
+            t, c, mid = p.get("type"), p.get("content", ""), p.get("id")
+            out.append(
+                HumanMessage(content=c, id=mid) if t == "human"
+                else AIMessage(content=c, id=mid) if t == "ai"
+                else SystemMessage(content=c, id=mid)
+            )
+        return out
+
+    def _queue_append(self, pipe, chat_id: int, msgs: Sequence[BaseMessage], fetch: Optional[int]) -> None:
+        """Queue LPUSH/LTRIM/EXPIRE(/LRANGE) for one turn on a pipeline."""
+        key = self._k(chat_id)
+        if msgs:
+            pipe.lpush(key, *[self._encode(m) for m in msgs])
+        pipe.ltrim(key, 0, self.window - 1)
+        pipe.expire(key, self.ttl)
+        if fetch:
+            pipe.lrange(key, 0, fetch - 1)
+
+    def _queue_replace(self, pipe, chat_id: int, msgs: Sequence[BaseMessage]) -> None:
+        """Queue DEL + LPUSH/EXPIRE replacing a window on a pipeline."""
+        key = self._k(chat_id)
+        pipe.delete(key)
+        if msgs:
+            pipe.lpush(key, *[self._encode(m) for m in msgs])
+            pipe.expire(key, self.ttl)
+
+    def _qa_key(self, *, model: str, system_prompt: Optional[str], last_user_text: str) -> str:
+        """
+        Build a stable key for the global Q&A cache.
+
+        Key shape: `cache:qa:<sha256(model||user_text||system_prompt?)>`
+        """
+        base = model.strip()
+        u = last_user_text.strip().lower()
+        parts = [base, u]
+        if self.qa_inc_sys and system_prompt:
+            parts.append(system_prompt.strip())
+        raw = "||".join(parts)
+        return f"{self.qa_ns}:{_sha256(raw)}"  # e.g., cache:qa:1a2b3c...
+
+    def _qa_cacheable(self, last_user_text: str) -> bool:
+        """True if the cache is on and the question is long enough to key on."""
+        return self.qa_enabled and len(last_user_text.strip()) >= self.qa_min
+
+
+class RedisMemoryStore(_RedisMemoryBase):
+    """
+    Short-term chat memory + global Q&A cache backed by Redis.
+
+    - Conversation window is stored in Redis DB 0 under:
+      `karan:chat:{chat_id}:window`
+    - Q&A cache lives in a separate Redis DB (settings.redis_cache_db),
+      with a “folder-like” namespace: `cache:qa:<hash>`.
+
+    Both clients draw from shared, bounded connection pools.
+    """
+
+    def __init__(self) -> None:
+        self._configure()
+        # --- Chat window (short-term) ---
+        self.r = redis.Redis(connection_pool=connection_pool(0))
+        # --- “cache/qa” folder (separate DB) ---
+        self.r_cache = redis.Redis(connection_pool=connection_pool(settings.redis_cache_db))
+        self._compact = None  # Lua script, registered on first use
+
+    # ---------------- Conversation window ----------------
+
     def append_message(self, chat_id: int, msg: BaseMessage) -> None:
         """
         Append a single message to the rolling window, trim, and set TTL.
@@ -65,11 +206,73 @@ class RedisMemoryStore:
         msg : BaseMessage
             LangChain message (`HumanMessage`, `AIMessage`, or `SystemMessage`).
         """
-        payload = {"type": msg.type, "content": msg.content}
-        key = self._k(chat_id)
-        self.r.lpush(key, json.dumps(payload))
-        self.r.ltrim(key, 0, self.window - 1)
-        self.r.expire(key, self.ttl)
+        self.append_turn(chat_id, [msg])
+
+    def append_turn(
+        self,
+        chat_id: int,
+        msgs: Sequence[BaseMessage],
+        fetch: Optional[int] = None,
+    ) -> List[BaseMessage]:
+        """
+        Append a whole turn, trim, refresh TTL and optionally read the window
+        back, all in a single MULTI/EXEC round-trip.
+
+        Parameters
+        ----------
+        chat_id : int
+            Chat identifier.
+        msgs : Sequence[BaseMessage]
+            Messages in chronological order (e.g., [user, assistant]).
+        fetch : Optional[int]
+            If set, also return up to this many recent messages.
+
+        Returns
+        -------
+        List[BaseMessage]
+            The window after the update (oldest → newest) if `fetch` is set;
+            otherwise an empty list.
+        """
+        pipe = self.r.pipeline(transaction=True)
+        self._queue_append(pipe, chat_id, msgs, fetch)
+        res = pipe.execute()
+        return self._decode(res[-1]) if fetch else []
+
+    def replace_window(self, chat_id: int, msgs: Sequence[BaseMessage]) -> None:
+        """
+        Atomically replace the whole window (e.g., with a summary) in one round-trip.
+        """
+        pipe = self.r.pipeline(transaction=True)
+        self._queue_replace(pipe, chat_id, msgs)
+        pipe.execute()
+
+    def compact_window(
+        self,
+        chat_id: int,
+        summarized: Sequence[BaseMessage],
+        replacement: Sequence[BaseMessage],
+    ) -> bool:
+        """
+        Atomically replace the `summarized` messages with `replacement`.
+
+        Messages appended after `summarized` was read are kept (unlike
+        `replace_window`), so a background summary never drops a turn.
+        `summarized` must come from this store's window (its messages carry
+        the ids that identify their entries).
+
+        Returns
+        -------
+        bool
+            False if the summarized messages are no longer in the window
+            (e.g., it was cleared); nothing is changed then.
+        """
+        if not summarized:
+            return False
+        if self._compact is None:
+            self._compact = self.r.register_script(_COMPACT_LUA)
+        span = [self._encode(m, stamp=False) for m in reversed(summarized)]
+        args = [self.ttl, len(span), *span, *(self._encode(m) for m in reversed(replacement))]
+        return bool(self._compact(keys=[self._k(chat_id)], args=args))
 
     def get_window(self, chat_id: int, k: Optional[int] = None) -> List[BaseMessage]:
         """
@@ -89,18 +292,7 @@ class RedisMemoryStore:
         """
         key = self._k(chat_id)
         limit = k or self.window
-        raw = self.r.lrange(key, 0, limit - 1)[::-1]
-
-        out: List[BaseMessage] = []
-        for b in raw:
-            p = json.loads(b)
-            t, c = p.get("type"), p.get("content", "")
-            out.append(
-                HumanMessage(content=c) if t == "human"
-                else AIMessage(content=c) if t == "ai"
-                else SystemMessage(content=c)
-            )
-        return out
+        return self._decode(self.r.lrange(key, 0, limit - 1))
 
     def clear(self, chat_id: int) -> None:
         """
@@ -110,20 +302,6 @@ class RedisMemoryStore:
 
     # ---------------- Q&A cache (cache/qa/*) ----------------
 
-    def _qa_key(self, *, model: str, system_prompt: Optional[str], last_user_text: str) -> str:
-        """
-        Build a stable key for the global Q&A cache.
-
-        Key shape: `cache:qa:<sha256(model||user_text||system_prompt?)>`
-        """
-        base = model.strip()
-        u = last_user_text.strip().lower()
-        parts = [base, u]
-        if self.qa_inc_sys and system_prompt:
-            parts.append(system_prompt.strip())
-        raw = "||".join(parts)
-        return f"{self.qa_ns}:{_sha256(raw)}"  # e.g., cache:qa:1a2b3c...
-
     def qa_get(self, *, model: str, system_prompt: Optional[str], last_user_text: str) -> Optional[str]:
         """
         Fetch a cached answer for the last user text (exact match).
@@ -133,7 +311,7 @@ class RedisMemoryStore:
         Optional[str]
             Cached answer if present and cache is enabled; else None.
         """
-        if not self.qa_enabled or len(last_user_text.strip()) < self.qa_min:
+        if not self._qa_cacheable(last_user_text):
             return None
         key = self._qa_key(model=model, system_prompt=system_prompt, last_user_text=last_user_text)
         val = self.r_cache.get(key)
@@ -143,7 +321,7 @@ class RedisMemoryStore:
         """
         Store an answer for the last user text with TTL.
         """
-        if not self.qa_enabled or len(last_user_text.strip()) < self.qa_min:
+        if not self._qa_cacheable(last_user_text):
             return
         key = self._qa_key(model=model, system_prompt=system_prompt, last_user_text=last_user_text)
         self.r_cache.setex(key, self.qa_ttl, answer)
@@ -201,3 +379,76 @@ class RedisMemoryStore:
             if i + 1 >= limit:
                 break
         return out
+
+
+class AsyncRedisMemoryStore(_RedisMemoryBase):
+    """
+    `redis.asyncio` twin of `RedisMemoryStore` (same keys, same semantics).
+
+    Every method is a coroutine, so handlers can await window and cache
+    operations concurrently with Postgres writes instead of parking a worker
+    thread on each Redis round-trip. Clients share the process-wide async
+    connection pools configured in settings.
+    """
+
+    def __init__(self) -> None:
+        self._configure()
+        self.r = aioredis.Redis(connection_pool=async_connection_pool(0))
+        self.r_cache = aioredis.Redis(connection_pool=async_connection_pool(settings.redis_cache_db))
+
+    # ---------------- Conversation window ----------------
+
+    async def append_message(self, chat_id: int, msg: BaseMessage) -> None:
+        """Append a single message to the rolling window, trim, and set TTL."""
+        await self.append_turn(chat_id, [msg])
+
+    async def append_turn(
+        self,
+        chat_id: int,
+        msgs: Sequence[BaseMessage],
+        fetch: Optional[int] = None,
+    ) -> List[BaseMessage]:
+        """
+        Append a whole turn (and optionally read the window) in one MULTI/EXEC.
+        """
+        async with self.r.pipeline(transaction=True) as pipe:
+            self._queue_append(pipe, chat_id, msgs, fetch)
+            res = await pipe.execute()
+        return self._decode(res[-1]) if fetch else []
+
+    async def replace_window(self, chat_id: int, msgs: Sequence[BaseMessage]) -> None:
+        """Atomically replace the whole window in one round-trip."""
+        async with self.r.pipeline(transaction=True) as pipe:
+            self._queue_replace(pipe, chat_id, msgs)
+            await pipe.execute()
+
+    async def get_window(self, chat_id: int, k: Optional[int] = None) -> List[BaseMessage]:
+        """Read the last `k` messages (oldest → newest)."""
+        limit = k or self.window
+        return self._decode(await self.r.lrange(self._k(chat_id), 0, limit - 1))
+
+    async def clear(self, chat_id: int) -> None:
+        """Delete the chat’s window entirely."""
+        await self.r.delete(self._k(chat_id))
+
+    # ---------------- Q&A cache (cache/qa/*) ----------------
+
+    async def qa_get(self, *, model: str, system_prompt: Optional[str], last_user_text: str) -> Optional[str]:
+        """Fetch a cached answer for the last user text (exact match)."""
+        if not self._qa_cacheable(last_user_text):
+            return None
+        key = self._qa_key(model=model, system_prompt=system_prompt, last_user_text=last_user_text)
+        val = await self.r_cache.get(key)
+        return val.decode("utf-8") if val else None
+
+    async def qa_set(self, *, model: str, system_prompt: Optional[str], last_user_text: str, answer: str) -> None:
+        """Store an answer for the last user text with TTL."""
+        if not self._qa_cacheable(last_user_text):
+            return
+        key = self._qa_key(model=model, system_prompt=system_prompt, last_user_text=last_user_text)
+        await self.r_cache.setex(key, self.qa_ttl, answer)
+
+    async def aclose(self) -> None:
+        """Release this store's clients (the shared pools stay open)."""
+        await self.r.aclose()
+        await self.r_cache.aclose()
@@ -0,0 +1,127 @@
+# src/app/adapters/openai_clients.py
+"""
+Shared OpenAI clients with pooled, keep-alive HTTP connections.
+
+One sync and one async httpx client back every OpenAI call in the process:
+chat (via `ChatOpenAI`), embeddings, Whisper, vision and image generation.
+Connections stay warm between updates instead of paying a TLS handshake per
+message. HTTP/2 is negotiated when the `h2` package is installed.
+
+Per-operation timeouts are applied with `with_options()`, which returns a
+lightweight copy that shares the same connection pool.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import threading
+from typing import Dict, Optional
+
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+try:  # newer SDKs are built on httpx2
+    import httpx2 as httpx
+except ImportError:  # pragma: no cover
+    import httpx
+
+from ..config.settings import settings
+
+log = logging.getLogger(__name__)
+
+
+def _op_timeouts() -> Dict[str, float]:
+    """Read timeout (seconds) per OpenAI operation."""
+    return {
+        "chat": settings.openai_timeout_sec,
+        "embed": settings.openai_timeout_sec,
+        "transcribe": settings.openai_transcribe_timeout_sec,
+        "vision": settings.openai_vision_timeout_sec,
+        "image": settings.openai_image_timeout_sec,
+    }
+
+
+def http2_available() -> bool:
+    """True if HTTP/2 is enabled in settings and `h2` is importable."""
+    return settings.openai_http2 and importlib.util.find_spec("h2") is not None
+
+
+class OpenAIClients:
+    """
+    Process-wide pooled OpenAI clients (sync + async).
+
+    Attributes
+    ----------
+    http, ahttp : httpx.Client, httpx.AsyncClient
+        The shared connection pools (also handed to LangChain).
+    sync, aio : OpenAI, AsyncOpenAI
+        SDK clients built on those pools.
+    """
+
+    def __init__(self, api_key: Optional[str] = None) -> None:
+        """
+        Parameters
+        ----------
+        api_key : Optional[str]
+            OpenAI API key (default: settings.OPENAI_API_KEY).
+        """
+        api_key = api_key or settings.OPENAI_API_KEY
+        limits = httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive,
+            keepalive_expiry=settings.openai_keepalive_expiry_sec,
+        )
+        timeout = httpx.Timeout(settings.openai_timeout_sec, connect=settings.openai_connect_timeout_sec)
+        self.http2 = http2_available()
+        self.http = DefaultHttpxClient(limits=limits, timeout=timeout, http2=self.http2)
+        self.ahttp = DefaultAsyncHttpxClient(limits=limits, timeout=timeout, http2=self.http2)
+        self.sync = OpenAI(api_key=api_key, http_client=self.http, timeout=timeout)
+        self.aio = AsyncOpenAI(api_key=api_key, http_client=self.ahttp, timeout=timeout)
+        self._ops: Dict[str, OpenAI] = {}
+        self._aops: Dict[str, AsyncOpenAI] = {}
+        log.info(
+            "OpenAI clients ready (http2=%s, max_connections=%d).", self.http2, settings.openai_max_connections
+        )
+
+    def timeout_for(self, op: str) -> httpx.Timeout:
+        """Timeout for one operation ("chat", "transcribe", "vision", "image", "embed")."""
+        return httpx.Timeout(_op_timeouts()[op], connect=settings.openai_connect_timeout_sec)
+
+    def for_op(self, op: str) -> OpenAI:
+        """Sync client with the timeout for `op` (same connection pool)."""
+        client = self._ops.get(op)
+        if client is None:
+            client = self._ops[op] = self.sync.with_options(timeout=self.timeout_for(op))
+        return client
+
+    def afor_op(self, op: str) -> AsyncOpenAI:
+        """Async client with the timeout for `op` (same connection pool)."""
+        client = self._aops.get(op)
+        if client is None:
+            client = self._aops[op] = self.aio.with_options(timeout=self.timeout_for(op))
+        return client
+
+    def close(self) -> None:
+        """Close the sync pool (the async one is closed by `aclose()`)."""
+        self.http.close()
+
+    async def aclose(self) -> None:
+        """Close both connection pools."""
+        self.http.close()
+        await self.ahttp.aclose()
+
+
+_clients: Optional[OpenAIClients] = None
+_clients_lock = threading.Lock()
+
+
+def get_openai_clients() -> OpenAIClients:
+    """
+    Return the process-wide OpenAI clients, creating them on first use.
+    """
+    global _clients
+    if _clients is None:
+        with _clients_lock:
+            if _clients is None:
+                _clients = OpenAIClients()
+    return _clients
@@ -0,0 +1,185 @@
+# src/app/adapters/retrieval.py
+"""
+Time-boxed, cached retrieval over the `karan_bio` vector store.
+
+The graph's `retrieve` node calls `Retriever.retrieve(question)` only for
+questions the router flags as needing Karan's facts. Two in-process caches
+keep repeat questions off the network:
+
+- `CachedQueryEmbeddings` memoizes `embed_query()` (shared by the vector
+  store and the semantic Q&A cache, so one question costs one embedding).
+- `Retriever` memoizes the top-k snippets per normalized question.
+
+Each search runs on a small thread pool and is awaited for at most
+`retrieval_timeout_seconds`; past that the reply goes ahead without facts.
+A timed-out search keeps running and still fills the cache, so the next
+ask of the same question is a hit.
+
+Outcomes are counted in `retrieval_requests_total{result}`:
+- hit     -> answered from the result cache
+- miss    -> searched within the budget
+- timeout -> budget exceeded, answered without facts
+- error   -> the search raised, answered without facts
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ..config.settings import settings
+from ..metrics import RETRIEVAL_DOCS, RETRIEVAL_LAT, RETRIEVAL_REQUESTS, inc, observe
+from ..utils.lru import MISSING, LRUTTLCache
+
+log = logging.getLogger(__name__)
+
+
+def _normalize(text: str) -> str:
+    """Case- and whitespace-insensitive cache key for a question."""
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+class CachedQueryEmbeddings:
+    """
+    Embeddings wrapper that memoizes `embed_query()` in an LRU + TTL cache.
+
+    `embed_documents()` (ingestion) passes straight through.
+    """
+
+    def __init__(self, inner, cache: Optional[LRUTTLCache] = None) -> None:
+        """
+        Parameters
+        ----------
+        inner : Embeddings
+            Wrapped embeddings client (e.g., `OpenAIEmbeddings`).
+        cache : Optional[LRUTTLCache]
+            Vector cache (default: sized from settings).
+        """
+        self.inner = inner
+        self.cache = cache or LRUTTLCache(
+            "query_embedding",
+            max_bytes=settings.query_embedding_cache_max_bytes,
+            ttl_seconds=settings.query_embedding_cache_ttl_seconds,
+        )
+
+    def embed_query(self, text: str) -> List[float]:
+        key = _normalize(text)
+        vec = self.cache.get(key)
+        if vec is MISSING:
+            # float32 array: compact, and its buffer is counted in the cache size
+            vec = np.asarray(self.inner.embed_query(text), dtype=np.float32)
+            self.cache.set(key, vec)
+        return vec.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+class Retriever:
+    """
+    Top-k fact lookup with a result cache and a latency budget.
+    """
+
+    _pool: Optional[ThreadPoolExecutor] = None
+    _pool_lock = threading.Lock()
+
+    def __init__(
+        self,
+        vector,
+        *,
+        k: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        cache: Optional[LRUTTLCache] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        vector : VSAdapter
+            Anything with `search(query, k) -> list[Document]`.
+        k : Optional[int]
+            Snippets per question (default: settings.retrieval_k).
+        timeout_seconds : Optional[float]
+            Latency budget per uncached search (default: settings).
+        cache : Optional[LRUTTLCache]
+            Result cache (default: sized from settings).
+        """
+        self.vector = vector
+        self.k = k or settings.retrieval_k
+        self.timeout = timeout_seconds if timeout_seconds is not None else settings.retrieval_timeout_seconds
+        self.cache = cache or LRUTTLCache(
+            "retrieval",
+            max_bytes=settings.retrieval_cache_max_bytes,
+            ttl_seconds=settings.retrieval_cache_ttl_seconds,
+        )
+
+    @classmethod
+    def _executor(cls) -> ThreadPoolExecutor:
+        # Shared across instances; searches are short and mostly wait on I/O.
+        if cls._pool is None:
+            with cls._pool_lock:        # concurrent first retrievals create one pool
+                if cls._pool is None:
+                    cls._pool = ThreadPoolExecutor(
+                        max_workers=settings.retrieval_max_workers, thread_name_prefix="retrieval"
+                    )
+        return cls._pool
+
+    def _search(self, query: str, key: str) -> Sequence[str]:
+        docs = self.vector.search(query, k=self.k) or []
+        snippets = tuple(
+            s for s in (str(getattr(d, "page_content", d)).strip() for d in docs) if s
+        )
+        self.cache.set(key, snippets)
+        return snippets
+
+    def retrieve(self, query: str) -> Optional[List[str]]:
+        """
+        Return up to `k` fact snippets for `query`.
+
+        Returns
+        -------
+        Optional[list[str]]
+            Snippets (possibly empty), or None when the search timed out or
+            failed, i.e. the answer will be given without facts.
+        """
+        key = _normalize(query)
+        if not key:
+            return []
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            inc(RETRIEVAL_REQUESTS, result="hit")
+            observe(RETRIEVAL_DOCS, len(cached))
+            return list(cached)
+
+        t0 = time.perf_counter()
+        fut: Future = self._executor().submit(self._search, query, key)
+        try:
+            snippets = fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            inc(RETRIEVAL_REQUESTS, result="timeout")
+            log.warning("Retrieval exceeded %.2fs; answering without facts.", self.timeout)
+            return None
+        except Exception as e:
+            inc(RETRIEVAL_REQUESTS, result="error")
+            log.warning("Retrieval failed (%s); answering without facts.", e)
+            return None
+        finally:
+            observe(RETRIEVAL_LAT, time.perf_counter() - t0)
+        inc(RETRIEVAL_REQUESTS, result="miss")
+        observe(RETRIEVAL_DOCS, len(snippets))
+        return list(snippets)
+
+
+def build_retriever(vector) -> Optional[Retriever]:
+    """Return a `Retriever` over `vector`, or None when retrieval is off."""
+    if vector is None or not settings.retrieval_enabled:
+        return None
+    return Retriever(vector)
@@ -0,0 +1,218 @@
+# src/app/adapters/semantic_cache.py
+"""
+Semantic Q&A cache: nearest-neighbour lookup over question embeddings.
+
+Sits between the exact-match Redis cache (`cache:qa:<hash>`) and the LLM, so
+paraphrases ("when does the keynote start?" / "what time is the keynote")
+reuse one answer. Entries live in memory as a normalized float32 matrix per
+scope (the system-prompt/summary key also used by the exact cache), so a lookup
+is a single matrix-vector product.
+
+Outcomes are counted as:
+- hit       -> best cosine similarity >= threshold (answer returned)
+- near_miss -> within `near_miss_margin` below the threshold (LLM called)
+- miss      -> anything lower, or an empty scope
+- error     -> the embedding call failed; the turn goes on to the LLM
+
+The near-miss count and the similarity histogram are what to watch when
+tuning `SEMANTIC_CACHE_THRESHOLD` against the LLM calls saved.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..config.settings import settings
+from ..core.ports import Embeddings
+from ..metrics import SEMANTIC_CACHE, SEMANTIC_CACHE_SIMILARITY, inc, observe
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class SemanticLookup:
+    """Result of a semantic cache lookup."""
+    answer: Optional[str]
+    score: float
+    vector: Optional[np.ndarray]   # reuse for `store()` to avoid a second embedding call
+
+
+class _Scope:
+    """Vectors, answers and insert times for one cache scope."""
+
+    def __init__(self, dim: int) -> None:
+        self.vecs = np.empty((0, dim), dtype=np.float32)
+        self.answers: List[str] = []
+        self.ts: List[float] = []
+
+
+class SemanticQACache:
+    """
+    In-process semantic cache keyed by question embeddings.
+
+    Thread-safe; embeddings are computed outside the lock. Fails open: an
+    embedding error is counted and treated as a miss, never raised.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        *,
+        threshold: Optional[float] = None,
+        near_miss_margin: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        min_chars: Optional[int] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        embeddings : Embeddings
+            Anything with `embed_query(text)` (e.g., `OpenAIEmbeddings`) or
+            `embed_documents([text])`.
+        threshold : Optional[float]
+            Minimum cosine similarity for a hit (default: settings).
+        near_miss_margin : Optional[float]
+            Width of the near-miss band below the threshold (default: settings).
+        max_entries : Optional[int]
+            Entries kept per scope; oldest are evicted first (default: settings).
+        ttl_seconds : Optional[int]
+            Entry lifetime; matches the exact-match cache by default.
+        min_chars : Optional[int]
+            Shorter questions are never cached (default: settings).
+        """
+        self.embeddings = embeddings
+        self.threshold = threshold if threshold is not None else settings.semantic_cache_threshold
+        self.near_miss_margin = (
+            near_miss_margin if near_miss_margin is not None else settings.semantic_cache_near_miss_margin
+        )
+        self.max_entries = max_entries or settings.semantic_cache_max_entries
+        self.ttl = ttl_seconds if ttl_seconds is not None else settings.qa_cache_ttl_seconds
+        self.min_chars = min_chars if min_chars is not None else settings.qa_cache_min_chars
+        self._scopes: Dict[str, _Scope] = {}
+        self._lock = threading.Lock()
+
+    # ------- helpers -------
+
+    @staticmethod
+    def _scope_key(scope: Optional[str]) -> str:
+        return hashlib.sha256((scope or "").encode("utf-8")).hexdigest()
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed and L2-normalize a question."""
+        text = text.strip().lower()
+        if hasattr(self.embeddings, "embed_query"):
+            raw = self.embeddings.embed_query(text)
+        else:
+            raw = self.embeddings.embed_documents([text])[0]
+        v = np.asarray(raw, dtype=np.float32)
+        n = float(np.linalg.norm(v))
+        return v / n if n else v
+
+    def _expire(self, s: _Scope, now: float) -> None:
+        """Drop entries older than the TTL (entries are in insert order)."""
+        if not self.ttl or not s.ts or now - s.ts[0] <= self.ttl:
+            return
+        keep = next((i for i, t in enumerate(s.ts) if now - t <= self.ttl), len(s.ts))
+        s.vecs, s.answers, s.ts = s.vecs[keep:], s.answers[keep:], s.ts[keep:]
+
+    def cacheable(self, text: str) -> bool:
+        """True if the question is long enough to cache."""
+        return len(text.strip()) >= self.min_chars
+
+    # ------- API -------
+
+    def lookup(self, text: str, scope: Optional[str] = None) -> SemanticLookup:
+        """
+        Return the cached answer of the most similar question, if close enough.
+
+        Parameters
+        ----------
+        text : str
+            The user's question.
+        scope : Optional[str]
+            Context key (system prompt/summary); entries never cross scopes.
+
+        Returns
+        -------
+        SemanticLookup
+            `answer` is None on a miss, near miss or error; `vector` can be
+            passed to `store()` after the LLM answers.
+        """
+        if not self.cacheable(text):
+            return SemanticLookup(None, 0.0, None)
+        try:
+            vec = self._embed(text)
+        except Exception as e:
+            log.warning("Semantic cache lookup skipped, embedding failed: %s", e)
+            inc(SEMANTIC_CACHE, result="error")
+            return SemanticLookup(None, 0.0, None)
+        key = self._scope_key(scope)
+
+        with self._lock:
+            s = self._scopes.get(key)
+            if s is not None:
+                self._expire(s, time.time())
+            if s is None or not s.answers:
+                inc(SEMANTIC_CACHE, result="miss")
+                return SemanticLookup(None, 0.0, vec)
+            sims = s.vecs @ vec
+            i = int(np.argmax(sims))
+            score, answer = float(sims[i]), s.answers[i]
+
+        observe(SEMANTIC_CACHE_SIMILARITY, score)
+        if score >= self.threshold:
+            inc(SEMANTIC_CACHE, result="hit")
+            return SemanticLookup(answer, score, vec)
+        inc(SEMANTIC_CACHE, result="near_miss" if score >= self.threshold - self.near_miss_margin else "miss")
+        return SemanticLookup(None, score, vec)
+
+    def store(
+        self,
+        text: str,
+        answer: str,
+        scope: Optional[str] = None,
+        vector: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Add a question/answer pair (embedding `text` unless `vector` is given).
+        An embedding failure is counted and the pair is not cached.
+        """
+        if not answer or not self.cacheable(text):
+            return
+        if vector is None:
+            try:
+                vector = self._embed(text)
+            except Exception as e:
+                log.warning("Semantic cache store skipped, embedding failed: %s", e)
+                inc(SEMANTIC_CACHE, result="error")
+                return
+        vec = vector
+        key = self._scope_key(scope)
+
+        with self._lock:
+            s = self._scopes.get(key)
+            if s is None or s.vecs.shape[1] != vec.shape[0]:
+                s = self._scopes[key] = _Scope(vec.shape[0])
+            s.vecs = np.vstack([s.vecs, vec[None, :]])
+            s.answers.append(answer)
+            s.ts.append(time.time())
+            if len(s.answers) > self.max_entries:
+                drop = len(s.answers) - self.max_entries
+                s.vecs, s.answers, s.ts = s.vecs[drop:], s.answers[drop:], s.ts[drop:]
+
+    def clear(self) -> None:
+        """Drop every entry in every scope."""
+        with self._lock:
+            self._scopes.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(s.answers) for s in self._scopes.values())
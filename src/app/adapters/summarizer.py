@@ -1,6 +1,10 @@
 # src/app/adapters/summarizer.py
-from typing import Sequence
-from langchain_core.messages import BaseMessage, HumanMessage
+from typing import List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from ..config.settings import settings
+from ..utils.tokens import count_tokens, fit_oldest
 
 
 def summarize_window(llm, window: Sequence[BaseMessage]) -> str:
@@ -28,3 +32,66 @@ def summarize_window(llm, window: Sequence[BaseMessage]) -> str:
     # use last ~20 turns for efficiency
     resp = llm.invoke(list(window[-20:]) + [prompt])
     return getattr(resp, "content", "").strip()
+
+
+_ROLES = {"human": "User", "ai": "Karan", "system": "System"}
+
+
+def is_summary_message(msg: BaseMessage) -> bool:
+    """True for the `(summary) ...` system messages older windows carried."""
+    return isinstance(msg, SystemMessage) and str(msg.content).startswith("(summary)")
+
+
+def summarize_incremental(
+    llm,
+    previous: Optional[str],
+    delta: Sequence[BaseMessage],
+    *,
+    max_input_tokens: Optional[int] = None,
+) -> Tuple[str, List[BaseMessage]]:
+    """
+    Fold new messages into the running summary.
+
+    The model sees the previous summary once plus only the messages added
+    since, never an older summary re-summarized, so details don't decay and
+    the cost per cycle stays flat however long the chat gets.
+
+    Parameters
+    ----------
+    llm : object
+        The language model instance supporting `.invoke(messages)`.
+    previous : Optional[str]
+        The current summary (None for the first cycle).
+    delta : Sequence[BaseMessage]
+        Messages since the previous summary (oldest → newest).
+    max_input_tokens : Optional[int]
+        Input budget; the previous summary is clipped to half of it and the
+        oldest delta messages that fit the rest are folded in; newer ones
+        wait for the next cycle (default: settings.summary_max_input_tokens).
+
+    Returns
+    -------
+    Tuple[str, List[BaseMessage]]
+        The updated summary and the delta messages it covers (an oldest
+        prefix of `delta`, without `(summary)` entries); only those may
+        leave the window.
+    """
+    budget = max_input_tokens or settings.summary_max_input_tokens
+    previous = (previous or "").strip()
+    if count_tokens(previous) > budget // 2:
+        previous = previous[-(budget // 2) * 4:]  # keep the most recent part
+    folded = fit_oldest([m for m in delta if not is_summary_message(m)], budget - count_tokens(previous))
+    # a single message over the whole budget is folded in clipped
+    lines = "\n".join(f"{_ROLES.get(m.type, m.type)}: {str(m.content)[:budget * 4]}" for m in folded)
+
+    prompt = HumanMessage(
+        content=(
+            f"Current summary of the conversation:\n{previous or '(none yet)'}\n\n"
+            f"New messages:\n{lines}\n\n"
+            "Rewrite the summary so it also covers the new messages. Keep it to "
+            "at most 5 concise lines, preserving names, entities, facts, "
+            "decisions and open questions from both."
+        )
+    )
+    resp = llm.invoke([prompt])
+    return getattr(resp, "content", "").strip(), folded
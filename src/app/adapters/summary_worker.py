@@ -0,0 +1,85 @@
+# src/app/adapters/summary_worker.py
+"""
+Background summarization jobs, off the reply path.
+
+Handlers `submit()` a job once a chat's window is long enough and return
+immediately; the job runs later on the shared worker pool.
+
+- One job per chat at a time: a submit for a chat that already has a job
+  queued or running is dropped (the next turn resubmits if still needed).
+- At most `summary_max_concurrency` jobs run at once, so a burst of long
+  chats cannot starve the worker pool of threads for live turns.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from ..concurrency import run_blocking
+from ..config.settings import settings
+from ..metrics import SUMMARY_JOBS, SUMMARY_LAT, SUMMARY_PENDING, observe
+
+log = logging.getLogger(__name__)
+
+
+class SummaryWorker:
+    """
+    Deduplicating, concurrency-capped runner for blocking summary jobs.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None) -> None:
+        """
+        Parameters
+        ----------
+        max_concurrency : Optional[int]
+            Jobs allowed to run at once (default: settings.summary_max_concurrency).
+        """
+        self.max_concurrency = max_concurrency or settings.summary_max_concurrency
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        self._active: Dict[Hashable, asyncio.Task] = {}
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> bool:
+        """
+        Schedule `fn(*args)` unless a job for `key` is already pending.
+
+        Must be called from the event loop.
+
+        Returns
+        -------
+        bool
+            True if scheduled, False if deduplicated.
+        """
+        if key in self._active:
+            SUMMARY_JOBS.labels(result="deduped").inc()
+            return False
+        task = asyncio.get_running_loop().create_task(self._run(key, fn, args))
+        self._active[key] = task
+        SUMMARY_PENDING.set(len(self._active))
+        return True
+
+    def pending(self, key: Hashable) -> bool:
+        """True while a job for `key` is queued or running."""
+        return key in self._active
+
+    async def _run(self, key: Hashable, fn: Callable[..., Any], args: tuple) -> None:
+        try:
+            async with self._sem:
+                t0 = time.perf_counter()
+                await run_blocking("summarize", fn, *args)
+                observe(SUMMARY_LAT, time.perf_counter() - t0)
+            SUMMARY_JOBS.labels(result="ok").inc()
+        except Exception as e:
+            SUMMARY_JOBS.labels(result="error").inc()
+            log.warning("Summary job %s failed: %s", key, e)
+        finally:
+            self._active.pop(key, None)
+            SUMMARY_PENDING.set(len(self._active))
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait for queued and running jobs (e.g., on shutdown)."""
+        tasks = list(self._active.values())
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
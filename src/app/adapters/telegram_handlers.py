@@ -1,22 +1,28 @@
 # src/app/adapters/telegram_handlers.py
 from __future__ import annotations
 
+import asyncio
 import base64
 import logging
 import os
 import time
-from typing import Any, Dict, Optional
+from contextlib import asynccontextmanager
+from io import BytesIO
+from typing import IO, Any, AsyncIterator, Dict, Optional
 
-from openai import OpenAI
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 from telegram import Update
 from telegram.ext import ContextTypes
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
+from ..concurrency import chat_lock, run_blocking
 from ..config.settings import settings
 from ..metrics import GRAPH_LAT, TG_UPDATES, observe
 from ..telemetry import get_tracer
-from ..adapters.summarizer import summarize_window
+from ..adapters.media_store import get_media_store
+from ..adapters.openai_clients import get_openai_clients
+from ..adapters.summarizer import is_summary_message, summarize_incremental
+from ..adapters.telegram_streaming import ProgressiveReply
 
 log = logging.getLogger(__name__)
 _tracer = get_tracer("handlers")
@@ -59,38 +65,117 @@ def _ensure_identity(container, update: Update) -> None:
     )
 
 
-def _build_context(container, chat_id: int, user_msg: str) -> list:
+def _compose_context(summary: Optional[str], window: list, user_msg: str) -> list:
     """
-    Build model context: (summary?) + rolling window + current user message.
+    Assemble (summary?) + rolling window + current user message.
     """
     ctx: list = []
-    summary = container.durable_mem.get_summary(chat_id)
     if summary:
         ctx.append(SystemMessage(content=f"(summary) {summary}"))
-    window = container.short_mem.get_window(chat_id)
     ctx.extend(window)
     ctx.append(HumanMessage(content=user_msg))
     return ctx
 
 
+def _build_context(container, chat_id: int, user_msg: str) -> list:
+    """
+    Build model context: (summary?) + rolling window + current user message.
+    """
+    summary = container.durable_mem.get_summary(chat_id)
+    window = container.short_mem.get_window(chat_id)
+    return _compose_context(summary, window, user_msg)
+
+
+def _build_payload(container, chat_id: int, user_msg: str) -> Dict[str, Any]:
+    """
+    Build the graph input for one turn.
+
+    Only the new user message goes into `messages` (the checkpoint reducer
+    appends it); prior context travels separately in `history` so it is never
+    re-appended to the LangGraph thread.
+    """
+    if settings.context_mode == "checkpoint":
+        summary = container.durable_mem.get_summary(chat_id)
+        history = [SystemMessage(content=f"(summary) {summary}")] if summary else []
+        return {"messages": [HumanMessage(content=user_msg)], "history": history}
+
+    ctx = _build_context(container, chat_id, user_msg)
+    return {"messages": ctx[-1:], "history": ctx[:-1]}
+
+
+def _append_turn(container, chat_id: int, user_msg: str, ai_msg: str) -> list:
+    """
+    Append the new turn to short-term memory and return the updated window.
+    """
+    # Short-term window: append both messages and read back in one round-trip
+    return container.short_mem.append_turn(
+        chat_id,
+        [HumanMessage(content=user_msg), AIMessage(content=ai_msg)],
+        fetch=settings.window_size + 5,
+    )
+
+
 def _after_reply(container, chat_id: int, user_msg: str, ai_msg: str) -> None:
     """
-    Append new turn to short-term memory and summarize if the window is long.
+    Append new turn to short-term memory and summarize inline if the window is long.
     """
-    # Short-term window
-    container.short_mem.append_message(chat_id, HumanMessage(content=user_msg))
-    container.short_mem.append_message(chat_id, AIMessage(content=ai_msg))
+    _maybe_summarize(container, chat_id, _append_turn(container, chat_id, user_msg, ai_msg))
 
-    # Summarize if long
-    window = container.short_mem.get_window(chat_id, k=settings.window_size + 5)
-    if len(window) >= settings.window_size:
-        try:
-            summ = summarize_window(container.llm, window)
-            container.durable_mem.set_summary(chat_id, summ)
-            container.short_mem.clear(chat_id)
-            container.short_mem.append_message(chat_id, SystemMessage(content=f"(summary) {summ}"))
-        except Exception as e:  # pragma: no cover (best-effort summary)
-            log.warning("Failed to summarize chat %s: %s", chat_id, e)
+
+def _summarize_window(container, chat_id: int, window: list) -> None:
+    """
+    Summarize and swap the window for the summary once it is long enough.
+
+    The summary is incremental: the stored summary plus the messages added
+    since go in, the updated summary comes out and replaces the old one in
+    durable memory (which is where `_compose_context` reads it from). The
+    summarized messages then leave the window; messages that did not fit the
+    summary's input budget, and (with a store that supports
+    `compact_window`) turns added while the summary was being written, stay.
+    Uses the cheaper `summary_llm` when the container has one.
+
+    Errors propagate, so the summary worker can count failed jobs.
+    """
+    if len(window) < settings.window_size:
+        return
+    llm = getattr(container, "summary_llm", None) or container.llm
+    # The summary about to be rewritten must be current, not an L1 copy.
+    read = getattr(container.durable_mem, "get_summary_uncached", container.durable_mem.get_summary)
+    previous = read(chat_id)
+    delta = [m for m in window if not is_summary_message(m)]
+    summ, folded = summarize_incremental(llm, previous, delta)
+    container.durable_mem.set_summary(chat_id, summ, covered=len(folded))
+    done = len(window)                 # window prefix the summary now covers
+    if folded:
+        done = max(i for i, m in enumerate(window) if m is folded[-1]) + 1
+    if hasattr(container.short_mem, "compact_window"):
+        container.short_mem.compact_window(chat_id, window[:done], [])
+    else:
+        container.short_mem.replace_window(chat_id, window[done:])
+
+
+def _maybe_summarize(container, chat_id: int, window: list) -> None:
+    """
+    Best-effort `_summarize_window` for the inline path (failures are logged).
+    """
+    try:
+        _summarize_window(container, chat_id, window)
+    except Exception as e:  # pragma: no cover (best-effort summary)
+        log.warning("Failed to summarize chat %s: %s", chat_id, e)
+
+
+async def _schedule_summary(container, chat_id: int, window: list) -> None:
+    """
+    Summarize a long window: as a background job when the container has a
+    summary worker (the reply does not wait), otherwise inline.
+    """
+    if len(window) < settings.window_size:
+        return
+    worker = getattr(container, "summary_worker", None)
+    if worker is not None:
+        worker.submit(chat_id, _summarize_window, container, chat_id, window)
+    else:
+        await run_blocking("summarize", _maybe_summarize, container, chat_id, window)
 
 
 def _persist_exchange(container, chat_id: int, user_text: str, ai_text: str) -> None:
@@ -101,6 +186,50 @@ def _persist_exchange(container, chat_id: int, user_text: str, ai_text: str) ->
     container.durable_mem.add_message(chat_id=chat_id, role="assistant", content=ai_text)
 
 
+# ---------- Async memory path ----------
+
+async def _build_payload_async(container, chat_id: int, user_msg: str) -> Dict[str, Any]:
+    """
+    `_build_payload` with the summary (Postgres) and window (async Redis)
+    fetched concurrently; falls back to the worker pool without an async store.
+    """
+    am = getattr(container, "short_mem_async", None)
+    if am is None or settings.context_mode == "checkpoint":
+        return await run_blocking("context", _build_payload, container, chat_id, user_msg)
+
+    summary, window = await asyncio.gather(
+        run_blocking("summary", container.durable_mem.get_summary, chat_id),
+        am.get_window(chat_id),
+    )
+    ctx = _compose_context(summary, window, user_msg)
+    return {"messages": ctx[-1:], "history": ctx[:-1]}
+
+
+async def _after_turn(container, chat_id: int, user_msg: str, ai_text: str) -> None:
+    """
+    Persist the exchange and update short-term memory concurrently.
+
+    With a history write-behind queue the exchange is only enqueued; the
+    Postgres insert happens in a later batch.
+    """
+    writer = getattr(container, "history_writer", None)
+    if writer is not None:
+        persist = writer.put(chat_id, [("user", user_msg), ("assistant", ai_text)])
+    else:
+        persist = run_blocking("persist", _persist_exchange, container, chat_id, user_msg, ai_text)
+    am = getattr(container, "short_mem_async", None)
+    if am is None:
+        append = run_blocking("after_reply", _append_turn, container, chat_id, user_msg, ai_text)
+    else:
+        append = am.append_turn(
+            chat_id,
+            [HumanMessage(content=user_msg), AIMessage(content=ai_text)],
+            fetch=settings.window_size + 5,
+        )
+    _, window = await asyncio.gather(persist, append)
+    await _schedule_summary(container, chat_id, window)
+
+
 # ---------- Graph wrapper ----------
 
 @retry(
@@ -122,6 +251,212 @@ def _graph_invoke_timed(graph, payload: Dict[str, Any], thread_id: str) -> Dict[
     return out
 
 
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=1, max=8),
+    retry=retry_if_exception_type(Exception),
+    reraise=True,
+)
+async def _graph_ainvoke_timed(graph, payload: Dict[str, Any], thread_id: str) -> Dict[str, Any]:
+    """
+    Async twin of `_graph_invoke_timed` for graphs on an async checkpointer.
+    """
+    t0 = time.perf_counter()
+    with _tracer.start_as_current_span("graph.invoke", attributes={"thread_id": thread_id}):
+        out = await graph.ainvoke(payload, {"configurable": {"thread_id": thread_id}})
+    observe(GRAPH_LAT, time.perf_counter() - t0)
+    return out
+
+
+async def _graph_run(graph, payload: Dict[str, Any], thread_id: str) -> Dict[str, Any]:
+    """
+    Retried, non-streaming graph run: awaited on an async checkpointer,
+    otherwise on the worker pool.
+    """
+    if getattr(graph, "async_checkpointer", False):
+        return await _graph_ainvoke_timed(graph, payload, thread_id=thread_id)
+    return await run_blocking("graph", _graph_invoke_timed, graph, payload, thread_id=thread_id)
+
+
+_STREAM_DONE = object()
+_FAILED_REPLY = "Sorry, I couldn't finish that answer. Please try again."
+
+
+async def _graph_stream_timed(graph, payload: Dict[str, Any], thread_id: str, on_delta) -> Dict[str, Any]:
+    """
+    Run the graph with `stream_text` on, awaiting `on_delta(text)` for every
+    streamed LLM delta; returns the final state like `_graph_invoke_timed`.
+
+    Not retried itself: `_run_turn` falls back to `_graph_run` (which is)
+    when this raises. An error raised by `on_delta` stops the deltas but
+    not the graph run, so the final state is always returned.
+    """
+    cfg = {"configurable": {"thread_id": thread_id, "stream_text": True}}
+    modes = ["custom", "values"]
+    t0 = time.perf_counter()
+    out: Dict[str, Any] = {}
+    forwarding = True
+
+    async def _forward(delta: str) -> None:
+        nonlocal forwarding
+        if not forwarding:
+            return
+        try:
+            await on_delta(delta)
+        except Exception as e:
+            log.warning("Dropping streamed deltas for %s: %s", thread_id, e)
+            forwarding = False
+
+    with _tracer.start_as_current_span("graph.stream", attributes={"thread_id": thread_id}):
+        if getattr(graph, "async_checkpointer", False):
+            async for mode, chunk in graph.astream(payload, cfg, stream_mode=modes):
+                if mode == "custom":
+                    await _forward(chunk.get("delta", ""))
+                else:
+                    out = chunk
+        else:
+            # Sync graph on a worker thread; deltas hop back onto the loop.
+            loop = asyncio.get_running_loop()
+            q: asyncio.Queue = asyncio.Queue()
+
+            def _produce() -> Dict[str, Any]:
+                last: Dict[str, Any] = {}
+                try:
+                    for mode, chunk in graph.stream(payload, cfg, stream_mode=modes):
+                        if mode == "custom":
+                            loop.call_soon_threadsafe(q.put_nowait, chunk.get("delta", ""))
+                        else:
+                            last = chunk
+                finally:
+                    loop.call_soon_threadsafe(q.put_nowait, _STREAM_DONE)
+                return last
+
+            task = asyncio.ensure_future(run_blocking("graph", _produce))
+            while (delta := await q.get()) is not _STREAM_DONE:
+                await _forward(delta)
+            out = await task
+    observe(GRAPH_LAT, time.perf_counter() - t0)
+    return out
+
+
+# ---------- Telegram downloads ----------
+
+@asynccontextmanager
+async def _downloaded(
+    context: ContextTypes.DEFAULT_TYPE, file_id: str, file_size: Optional[int], kind: str, suffix: str
+) -> AsyncIterator[IO[bytes]]:
+    """
+    Download a Telegram file and yield it as a readable binary file object.
+
+    Files up to `media_inline_max_bytes` stay in memory (BytesIO); larger
+    ones (or those of unknown size) go to a unique path in the media store
+    that is deleted when the block exits. Concurrent updates never share a
+    path.
+    """
+    file = await context.bot.get_file(file_id)
+    size = file_size if file_size is not None else getattr(file, "file_size", None)
+    if size is not None and size <= settings.media_inline_max_bytes:
+        buf = BytesIO()
+        await file.download_to_memory(out=buf)
+        buf.seek(0)
+        buf.name = f"{kind}{suffix}"  # OpenAI infers the format from the name
+        yield buf
+        return
+    with get_media_store().temp_file(kind, suffix) as path:
+        await file.download_to_drive(path)
+        with open(path, "rb") as f:
+            yield f
+
+
+# ---------- OpenAI helpers (blocking; run on the worker pool) ----------
+
+def _openai_for(container, op: str):
+    """Pooled OpenAI client for `op` from the container (or the process-wide one)."""
+    clients = getattr(container, "openai", None) or get_openai_clients()
+    return clients.for_op(op)
+
+
+def _transcribe(openai_client, audio: IO[bytes]) -> str:
+    """
+    Transcribe a downloaded voice note with Whisper.
+    """
+    tr = openai_client.audio.transcriptions.create(file=audio, model="whisper-1")
+    return tr.text or ""
+
+
+def _describe_image(openai_client, img: IO[bytes]) -> str:
+    """
+    Briefly describe a downloaded photo with a vision call.
+    """
+    b64 = base64.b64encode(img.read()).decode("utf-8")
+    vis = openai_client.chat.completions.create(
+        model=settings.openai_model,
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "Describe the picture briefly."},
+                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}},
+                ],
+            }
+        ],
+    )
+    return (vis.choices[0].message.content or "").strip()
+
+
+# ---------- Turn pipeline ----------
+
+async def _run_turn(graph, container, update: Update, context: ContextTypes.DEFAULT_TYPE, user_msg: str) -> None:
+    """
+    Run one conversational turn: build context, invoke graph, reply, persist.
+
+    Every blocking stage runs on the shared worker pool so the event loop keeps
+    taking updates from other chats; the per-chat lock keeps turns of the same
+    chat in order. A failed streamed run is retried without streaming; if that
+    fails too, a posted placeholder is edited to an apology.
+    """
+    chat_id = update.effective_chat.id
+    async with chat_lock(chat_id):
+        payload = await _build_payload_async(container, chat_id, user_msg)
+        # Stream into a progressively edited message when the graph supports it.
+        streaming = settings.llm_streaming and hasattr(graph, "stream")
+        reply = ProgressiveReply(update.message) if streaming else None
+        if reply is None:
+            out = await _graph_run(graph, payload, str(chat_id))
+        else:
+            try:
+                out = await _graph_stream_timed(graph, payload, str(chat_id), reply.feed)
+            except Exception as e:
+                # The stream is not retried; the plain run is. Its answer
+                # replaces any partial text already on screen.
+                log.warning("Streamed turn failed for chat %s (%s); retrying without streaming.", chat_id, e)
+                try:
+                    out = await _graph_run(graph, payload, str(chat_id))
+                except Exception:
+                    if reply.posted:
+                        await reply.finish(_FAILED_REPLY)
+                    raise
+
+        last = out.get("messages", [])[-1] if out.get("messages") else None
+        ai_text = getattr(last, "content", "") if last else ""
+        if reply is not None and reply.posted:
+            await reply.finish(ai_text)
+        else:
+            await _send_response(
+                update,
+                context,
+                {
+                    "response_type": out.get("response_type") or "text",
+                    "messages": [AIMessage(content=ai_text)],
+                    "audio_buffer": out.get("audio_buffer"),
+                    "audio_path": out.get("audio_path"),
+                    "image_path": out.get("image_path"),
+                },
+            )
+
+        await _after_turn(container, chat_id, user_msg, ai_text)
+
+
 # ---------- Handlers ----------
 
 async def handle_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -138,28 +473,10 @@ async def handle_text(graph, update: Update, context: ContextTypes.DEFAULT_TYPE)
     """
     TG_UPDATES.labels("text").inc()
     c = _container_from_ctx(context)
-    chat_id = update.effective_chat.id
     user_msg = update.message.text or ""
-    _ensure_identity(c, update)
-
-    full_ctx = _build_context(c, chat_id, user_msg)
-    out = _graph_invoke_timed(graph, {"messages": full_ctx}, thread_id=str(chat_id))
-
-    last = out.get("messages", [])[-1] if out.get("messages") else None
-    ai_text = getattr(last, "content", "") if last else ""
-    await _send_response(
-        update,
-        context,
-        {
-            "response_type": out.get("response_type") or "text",
-            "messages": [AIMessage(content=ai_text)],
-            "audio_buffer": out.get("audio_buffer"),
-            "image_path": out.get("image_path"),
-        },
-    )
+    await run_blocking("identity", _ensure_identity, c, update)
 
-    _persist_exchange(c, chat_id, user_msg, ai_text)
-    _after_reply(c, chat_id, user_msg, ai_text)
+    await _run_turn(graph, c, update, context, user_msg)
 
 
 async def handle_voice(graph, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -168,42 +485,14 @@ async def handle_voice(graph, update: Update, context: ContextTypes.DEFAULT_TYPE
     """
     TG_UPDATES.labels("voice").inc()
     c = _container_from_ctx(context)
-    chat_id = update.effective_chat.id
-    _ensure_identity(c, update)
+    await run_blocking("identity", _ensure_identity, c, update)
 
-    openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    openai_client = _openai_for(c, "transcribe")
     v = update.message.voice
-    file = await context.bot.get_file(v.file_id)
-    p = "voice.ogg"
-    await file.download_to_drive(p)
-    try:
-        with open(p, "rb") as f:
-            tr = openai_client.audio.transcriptions.create(file=f, model="whisper-1")
-    finally:
-        try:
-            os.remove(p)
-        except Exception:  # pragma: no cover
-            pass
-
-    user_msg = tr.text or ""
-    full_ctx = _build_context(c, chat_id, user_msg)
-    out = _graph_invoke_timed(graph, {"messages": full_ctx}, thread_id=str(chat_id))
-
-    last = out.get("messages", [])[-1] if out.get("messages") else None
-    ai_text = getattr(last, "content", "") if last else ""
-    await _send_response(
-        update,
-        context,
-        {
-            "response_type": out.get("response_type") or "text",
-            "messages": [AIMessage(content=ai_text)],
-            "audio_buffer": out.get("audio_buffer"),
-            "image_path": out.get("image_path"),
-        },
-    )
+    async with _downloaded(context, v.file_id, v.file_size, "voice", ".ogg") as audio:
+        user_msg = await run_blocking("transcribe", _transcribe, openai_client, audio)
 
-    _persist_exchange(c, chat_id, user_msg, ai_text)
-    _after_reply(c, chat_id, user_msg, ai_text)
+    await _run_turn(graph, c, update, context, user_msg)
 
 
 async def handle_photo(graph, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -212,61 +501,29 @@ async def handle_photo(graph, update: Update, context: ContextTypes.DEFAULT_TYPE
     """
     TG_UPDATES.labels("photo").inc()
     c = _container_from_ctx(context)
-    chat_id = update.effective_chat.id
-    _ensure_identity(c, update)
+    await run_blocking("identity", _ensure_identity, c, update)
 
-    openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    openai_client = _openai_for(c, "vision")
     ph = update.message.photo[-1]
-    file = await context.bot.get_file(ph.file_id)
-    p = "image.jpg"
-    await file.download_to_drive(p)
-    try:
-        with open(p, "rb") as img:
-            b64 = base64.b64encode(img.read()).decode("utf-8")
-    finally:
-        try:
-            os.remove(p)
-        except Exception:  # pragma: no cover
-            pass
+    async with _downloaded(context, ph.file_id, ph.file_size, "photos", ".jpg") as img:
+        desc = await run_blocking("vision", _describe_image, openai_client, img)
 
-    vis = openai_client.chat.completions.create(
-        model=settings.openai_model,
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": "Describe the picture briefly."},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}},
-                ],
-            }
-        ],
-    )
-    desc = (vis.choices[0].message.content or "").strip()
     cap = update.message.caption or ""
     user_msg = f"{cap} [IMAGE_ANALYSIS] {desc}".strip()
 
-    full_ctx = _build_context(c, chat_id, user_msg)
-    out = _graph_invoke_timed(graph, {"messages": full_ctx}, thread_id=str(chat_id))
-
-    last = out.get("messages", [])[-1] if out.get("messages") else None
-    ai_text = getattr(last, "content", "") if last else ""
-    await _send_response(
-        update,
-        context,
-        {
-            "response_type": out.get("response_type") or "text",
-            "messages": [AIMessage(content=ai_text)],
-            "audio_buffer": out.get("audio_buffer"),
-            "image_path": out.get("image_path"),
-        },
-    )
-
-    _persist_exchange(c, chat_id, user_msg, ai_text)
-    _after_reply(c, chat_id, user_msg, ai_text)
+    await _run_turn(graph, c, update, context, user_msg)
 
 
 # ---------- response ----------
 
+def _remove_quietly(path: str) -> None:
+    """Delete a temp file, ignoring errors."""
+    try:
+        os.remove(path)
+    except OSError:  # pragma: no cover
+        pass
+
+
 async def _send_response(update: Update, context: ContextTypes.DEFAULT_TYPE, resp: Dict[str, Any]) -> None:
     """
     Send the appropriate response type to Telegram based on the graph output.
@@ -278,16 +535,27 @@ async def _send_response(update: Update, context: ContextTypes.DEFAULT_TYPE, res
     if t == "text":
         await update.message.reply_text(content or "…")
     elif t == "audio":
+        audio_path = resp.get("audio_path")
         audio = resp.get("audio_buffer")
-        if audio:
+        if audio_path and os.path.exists(audio_path):
+            # PTB uploads straight from the file handle; remove it afterwards.
+            try:
+                with open(audio_path, "rb") as f:
+                    await update.message.reply_voice(voice=f)
+            finally:
+                _remove_quietly(audio_path)
+        elif audio:
             await update.message.reply_voice(voice=audio)
         else:
             await update.message.reply_text("Audio not available.")
     elif t == "image":
         path = resp.get("image_path")
         if path and os.path.exists(path):
-            with open(path, "rb") as f:
-                await update.message.reply_photo(photo=f)
+            try:
+                with open(path, "rb") as f:
+                    await update.message.reply_photo(photo=f)
+            finally:
+                _remove_quietly(path)
         else:
             await update.message.reply_text("Image not available.")
     else:
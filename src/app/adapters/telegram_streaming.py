@@ -0,0 +1,166 @@
+# src/app/adapters/telegram_streaming.py
+"""
+Progressive Telegram replies for streamed LLM output.
+
+`ProgressiveReply` posts the first streamed text as a new message (the
+placeholder, with a cursor) and then edits it as more text arrives, at most
+once per `tg_stream_edit_interval_seconds` and only after at least
+`tg_stream_min_chars` new characters. That keeps a chat well under Telegram's
+edit flood limits; a `RetryAfter` pauses edits instead of failing the turn.
+Any other send/edit error (timeouts, network errors, a rejected edit) stops
+further edits for the reply, but the stream keeps draining.
+`finish()` writes the final text and spills anything over Telegram's
+4096-character limit into follow-up messages; if the placeholder cannot be
+edited, the final text is sent as new messages instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dtm
+import logging
+import time
+from typing import Callable, List, Optional
+
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest, RetryAfter, TelegramError
+
+from ..config.settings import settings
+
+log = logging.getLogger(__name__)
+
+CURSOR = " ▌"
+MAX_LEN = MessageLimit.MAX_TEXT_LENGTH
+
+
+def split_message(text: str, limit: int = MAX_LEN) -> List[str]:
+    """
+    Split text into Telegram-sized chunks, preferring newline boundaries.
+    """
+    chunks: List[str] = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        cut = cut if cut > limit // 2 else limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+class ProgressiveReply:
+    """
+    Throttled placeholder-and-edit sender for one streamed reply.
+    """
+
+    def __init__(
+        self,
+        message,
+        *,
+        min_interval: Optional[float] = None,
+        min_chars: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        message : telegram.Message
+            The user's message; the reply is posted with `reply_text`.
+        min_interval : Optional[float]
+            Minimum seconds between edits (default: settings).
+        min_chars : Optional[int]
+            Minimum new characters before an edit (default: settings).
+        clock : Callable[[], float]
+            Time source (injectable for tests).
+        """
+        self._message = message
+        self.min_interval = (
+            min_interval if min_interval is not None else settings.tg_stream_edit_interval_seconds
+        )
+        self.min_chars = min_chars if min_chars is not None else settings.tg_stream_min_chars
+        self._clock = clock
+        self.text = ""
+        self.sent: Optional[object] = None   # the placeholder message once posted
+        self.edits = 0
+        self._shown = ""
+        self._last_edit = 0.0
+        self._paused_until = 0.0
+        self._failed = False                 # a send/edit failed: stop editing
+
+    @property
+    def posted(self) -> bool:
+        """True once the placeholder message exists."""
+        return self.sent is not None
+
+    async def feed(self, delta: str) -> None:
+        """
+        Add streamed text; post or edit the reply if the throttle allows.
+        """
+        self.text += delta
+        if self._failed or not self.text.strip():
+            return
+        if self.sent is None:
+            try:
+                self.sent = await self._message.reply_text(self.text[: MAX_LEN - len(CURSOR)] + CURSOR)
+            except TelegramError as e:
+                log.warning("Streaming placeholder not sent (%s); replying once at the end.", e)
+                self._failed = True
+                return
+            self._shown = self.text
+            self._last_edit = self._clock()
+            return
+
+        now = self._clock()
+        if (
+            now < self._paused_until
+            or now - self._last_edit < self.min_interval
+            or len(self.text) - len(self._shown) < self.min_chars
+            or len(self._shown) >= MAX_LEN - len(CURSOR)
+        ):
+            return
+        await self._edit(self.text[: MAX_LEN - len(CURSOR)] + CURSOR)
+        self._shown = self.text
+
+    async def finish(self, final_text: Optional[str] = None) -> None:
+        """
+        Replace the placeholder with the final text (overflow as new messages).
+        """
+        text = final_text if final_text is not None else self.text
+        chunks = split_message(text) or [""]
+        if self.sent is not None and await self._edit(chunks[0], final=True):
+            chunks = chunks[1:]
+        for c in chunks:
+            await self._message.reply_text(c)
+
+    async def _edit(self, text: str, final: bool = False) -> bool:
+        """
+        Edit the placeholder, tolerating flood control and no-op edits.
+
+        Returns False (and disables further edits) if the edit failed.
+        """
+        try:
+            try:
+                await self.sent.edit_text(text)
+                self.edits += 1
+            except RetryAfter as e:
+                wait = e.retry_after
+                wait = wait.total_seconds() if isinstance(wait, dtm.timedelta) else float(wait)
+                log.info("Telegram flood control: pausing edits for %.1fs", wait)
+                self._paused_until = self._clock() + wait
+                if final:
+                    # The final text must land; wait out the limit once.
+                    await asyncio.sleep(wait)
+                    await self.sent.edit_text(text)
+                    self.edits += 1
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                return self._fail(e)
+        except TelegramError as e:
+            return self._fail(e)
+        self._last_edit = self._clock()
+        return True
+
+    def _fail(self, e: Exception) -> bool:
+        log.warning("Streaming edit failed (%s); no further edits for this reply.", e)
+        self._failed = True
+        return False
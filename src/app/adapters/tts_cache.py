@@ -0,0 +1,86 @@
+# src/app/adapters/tts_cache.py
+"""
+Content-addressed cache in front of the TTS adapter.
+
+Greetings, fallbacks and answers served from the Q&A cache repeat often;
+`CachedTTS` stores their audio on disk keyed by
+sha256(voice_id, model_id, text), so a repeat costs a file link instead of
+an ElevenLabs call. Size is capped with LRU eviction (see `DiskLRU`), and
+hit ratio / bytes saved are exported as `blob_cache_*{cache="tts"}`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from ..config.settings import settings
+from ..utils.disk_cache import DiskLRU
+from .media_store import get_media_store
+
+
+def tts_cache_key(text: str, voice_id: str, model_id: str) -> str:
+    """Return the content address for one synthesized clip."""
+    raw = "\x00".join((voice_id, model_id, text.strip()))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CachedTTS:
+    """
+    TTS wrapper that serves repeated texts from a disk cache.
+
+    Exposes the same interface as `ElevenLabsTTS`: `tts(text) -> bytes` and
+    `tts.to_file(text) -> path` (the returned file belongs to the caller).
+    """
+
+    def __init__(self, inner, cache: DiskLRU) -> None:
+        """
+        Parameters
+        ----------
+        inner : TTS
+            The real synthesizer (`to_file` is used when available).
+        cache : DiskLRU
+            Blob store for audio clips.
+        """
+        self._inner = inner
+        self.cache = cache
+
+    def _key(self, text: str) -> str:
+        return tts_cache_key(text, settings.elevenlabs_voice_id, settings.elevenlabs_model_id)
+
+    def __call__(self, text: str) -> bytes:
+        """Return audio bytes for `text`, synthesizing only on a miss."""
+        key = self._key(text)
+        data = self.cache.read(key)
+        if data is None:
+            data = self._inner(text)
+            self.cache.put_bytes(key, data)
+        return data
+
+    def to_file(self, text: str) -> str:
+        """Return a private audio file for `text`, synthesizing only on a miss."""
+        key = self._key(text)
+        path = self.cache.checkout(key)
+        if path is not None:
+            return path
+        if not hasattr(self._inner, "to_file"):
+            return self.cache.handout(self.cache.put_bytes(key, self._inner(text)))
+        path = self._inner.to_file(text)
+        self.cache.put_file(key, path)
+        return path
+
+
+def build_cached_tts(inner):
+    """
+    Wrap `inner` with the disk cache configured in settings (or return it
+    unchanged when the cache is disabled).
+    """
+    if not settings.tts_cache_enabled:
+        return inner
+    cache = DiskLRU(
+        "tts",
+        settings.tts_cache_dir,
+        max_bytes=settings.tts_cache_max_bytes,
+        suffix=".mp3",
+        out_dir=get_media_store().kind_dir("tts"),
+    )
+    return CachedTTS(inner, cache)
@@ -1,23 +1,42 @@
-# src/app/adapters/tts_elevenlabs.py
 from __future__ import annotations
 
+import os
+from typing import Iterator
+
 from elevenlabs.client import ElevenLabs
 from ..config.settings import settings
+from .media_store import get_media_store
 
 
-def build_tts():
+class ElevenLabsTTS:
     """
-    Build a text-to-speech (TTS) synthesizer using the ElevenLabs API.
+    ElevenLabs text-to-speech with a streaming file path.
 
-    Returns
-    -------
-    Callable[[str], bytes]
-        A `_synth(text)` function that converts input text to speech audio
-        and returns it as raw byte data (for Telegram or file saving).
+    - `to_file(text)` writes audio chunks to a temporary file as they arrive
+      and returns its path, so a voice note never sits in RAM (or in graph
+      state) as one big `bytes` object. The caller owns and deletes the file.
+    - Calling the instance (`tts(text) -> bytes`) keeps the original
+      in-memory behaviour for callers that need raw bytes.
     """
-    client = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
 
-    def _synth(text: str) -> bytes:
+    def __init__(self, client) -> None:
+        """
+        Parameters
+        ----------
+        client : ElevenLabs
+            Configured ElevenLabs client.
+        """
+        self.client = client
+
+    def _stream(self, text: str) -> Iterator[bytes]:
+        """Yield audio chunks from ElevenLabs for `text`."""
+        return self.client.text_to_speech.convert(
+            text=text,
+            voice_id=settings.elevenlabs_voice_id,
+            model_id=settings.elevenlabs_model_id,
+        )
+
+    def __call__(self, text: str) -> bytes:
         """
         Convert the given text into spoken audio using ElevenLabs.
 
@@ -31,11 +50,42 @@ def build_tts():
         bytes
             The full audio byte stream (concatenated from ElevenLabs chunks).
         """
-        stream = client.text_to_speech.convert(
-            text=text,
-            voice_id=settings.elevenlabs_voice_id,
-            model_id=settings.elevenlabs_model_id,
-        )
-        return b"".join(stream)
+        return b"".join(self._stream(text))
 
-    return _synth
+    def to_file(self, text: str) -> str:
+        """
+        Stream synthesized audio into a temporary file.
+
+        Parameters
+        ----------
+        text : str
+            The text content to synthesize.
+
+        Returns
+        -------
+        str
+            Path of the audio file (MP3). Delete it once it has been sent.
+        """
+        path = get_media_store().temp_path("tts", ".mp3")
+        try:
+            with open(path, "wb") as f:
+                for chunk in self._stream(text):
+                    f.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path
+
+
+def build_tts() -> ElevenLabsTTS:
+    """
+    Build a text-to-speech (TTS) synthesizer using the ElevenLabs API.
+
+    Returns
+    -------
+    ElevenLabsTTS
+        Callable as `tts(text) -> bytes`; prefer `tts.to_file(text) -> path`
+        to stream audio to disk instead of buffering it.
+    """
+    client = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
+    return ElevenLabsTTS(client)
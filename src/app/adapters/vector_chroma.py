@@ -4,9 +4,29 @@ from __future__ import annotations
 from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from ..config.settings import settings
+from .embedding_cache import build_cached_embeddings
+from .openai_clients import get_openai_clients
 
 
-def build_vectorstore(collection: str = "karan_bio") -> Chroma:
+def build_embeddings():
+    """
+    Return the OpenAI embeddings client configured in settings.
+
+    Shared by the vector store, the semantic Q&A cache and ingestion;
+    requests go through the process-wide OpenAI connection pool, and
+    vectors already computed are served from the persistent embedding
+    cache (see `embedding_cache.py`).
+    """
+    clients = get_openai_clients()
+    return build_cached_embeddings(OpenAIEmbeddings(
+        model=settings.openai_embed_model,
+        timeout=clients.timeout_for("embed"),
+        http_client=clients.http,
+        http_async_client=clients.ahttp,
+    ))
+
+
+def build_vectorstore(collection: str = "karan_bio", embeddings=None) -> Chroma:
     """
     Build and return a persistent Chroma vector store using OpenAI embeddings.
 
@@ -14,13 +34,16 @@ def build_vectorstore(collection: str = "karan_bio") -> Chroma:
     ----------
     collection : str, optional
         The collection name to use within the vector store (default: "karan_bio").
+    embeddings : Optional[Embeddings]
+        Embedding function to use (default: `build_embeddings()`); pass the
+        shared cached wrapper so retrieval reuses query embeddings.
 
     Returns
     -------
     Chroma
         A persistent Chroma instance configured with OpenAI embeddings.
     """
-    embeddings = OpenAIEmbeddings(model=settings.openai_embed_model)
+    embeddings = embeddings or build_embeddings()
     vectorstore = Chroma(
         collection_name=collection,
         embedding_function=embeddings,
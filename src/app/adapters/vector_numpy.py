@@ -0,0 +1,311 @@
+# src/app/adapters/vector_numpy.py
+"""
+In-process exact vector index for small collections (a few thousand chunks).
+
+An alternative to Chroma behind the same `VectorStore` port
+(`VECTOR_BACKEND=numpy`). All vectors live in one contiguous float32 matrix,
+L2-normalized on insert. A query is then one matrix-vector product plus an
+`argpartition` top-k, with no persistence layer on the read path.
+
+Persistence (one directory per collection):
+- `vectors.<generation>.f32` -> the live rows, in insertion order, as a raw float32
+                                matrix; memory-mapped read-only
+- `meta.json`                -> generation number, ids, texts and metadata
+
+A vectors file is never modified after it is written. Each write batch
+writes the next generation's matrix to a new file, then swaps `meta.json`
+atomically, then removes older generations. A process that has the old
+generation mapped keeps reading consistent rows until it reloads. Every
+read and write first checks `meta.json` and reloads if another process
+(e.g., `karan-bot-ingest`) has moved it on. Writers, in any process, are
+serialized by an advisory `flock` on `write.lock`, held from that reload to
+the swap (POSIX only; elsewhere keep to one writing process). A batch
+rewrites the whole
+matrix. That is fine at this size (a few thousand chunks, a few MB) and
+ingestion writes in large batches.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: no cross-process writer lock
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+_VECTORS = "vectors.{generation}.f32"
+_LEGACY_VECTORS = "vectors.f32"     # pre-generation layout: one file rewritten in place
+_META = "meta.json"
+_WRITE_LOCK = "write.lock"
+
+
+def metadata_matches(meta: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """Equality filter; a list value means "any of" (e.g., {"source": ["a.md", "b.md"]})."""
+    for key, want in where.items():
+        have = meta.get(key)
+        if isinstance(want, (list, tuple, set)):
+            if have not in want:
+                return False
+        elif have != want:
+            return False
+    return True
+
+
+class NumpyVectorStore:
+    """
+    Exact cosine top-k over a memory-mapped float32 matrix.
+
+    Thread-safe; writes and searches share one lock (searches take
+    microseconds to a few milliseconds at this size).
+    """
+
+    def __init__(self, directory: str, embeddings) -> None:
+        """
+        Parameters
+        ----------
+        directory : str
+            Index directory (created if missing; reopened if it exists).
+        embeddings : Embeddings
+            Used for `embed_query` on search and `embed_documents` in `add_texts`.
+        """
+        self.dir = directory
+        self.embeddings = embeddings
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._dim = 0
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metas: List[Dict[str, Any]] = []
+        self._pos: Dict[str, int] = {}
+        self._mat: Optional[np.ndarray] = None
+        self._meta_stamp: Optional[Tuple[int, int, int]] = None
+        self._refresh()
+
+    # ------- persistence -------
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.dir, _META)
+
+    def _vec_path(self, generation: int) -> str:
+        return os.path.join(self.dir, _VECTORS.format(generation=generation))
+
+    def _stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Identity of the current `meta.json` (os.replace gives it a new inode)."""
+        try:
+            st = os.stat(self._meta_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _refresh(self) -> None:
+        """Reload if `meta.json` changed since it was last read (call under the lock)."""
+        stamp = self._stamp()
+        if stamp is None or stamp == self._meta_stamp:
+            return
+        for _ in range(3):
+            try:
+                self._load()
+                return
+            except FileNotFoundError:   # a writer removed that generation; meta has moved on
+                continue
+        raise RuntimeError(f"Numpy vector index in {self.dir} keeps changing while loading.")
+
+    def _load(self) -> None:
+        stamp = self._stamp()
+        with open(self._meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        generation = meta.get("generation", 0)
+        dim, rows = meta["dim"], len(meta["ids"])
+        mat = None
+        if dim and rows:
+            path = self._vec_path(generation) if generation else os.path.join(self.dir, _LEGACY_VECTORS)
+            mat = np.memmap(path, dtype=np.float32, mode="r", shape=(rows, dim))
+        self._generation, self._dim, self._mat = generation, dim, mat
+        self._ids, self._texts, self._metas = meta["ids"], meta["texts"], meta["metadatas"]
+        self._pos = {i: n for n, i in enumerate(self._ids)}
+        self._meta_stamp = stamp
+        log.info("Numpy vector index loaded: %d vectors (generation %d) from %s.",
+                 len(self._ids), generation, self.dir)
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Hold the write lock for this index: `_lock` for threads here, an
+        exclusive `flock` for other processes (and other instances here).
+        """
+        with self._lock, open(os.path.join(self.dir, _WRITE_LOCK), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)     # released when the file is closed
+            yield
+
+    def _commit(self, ids: List[str], texts: List[str], metas: List[Dict[str, Any]], mat: np.ndarray) -> None:
+        """Publish a new generation: vectors file, then `meta.json`, then drop older files."""
+        generation = self._generation + 1
+        path = self._vec_path(generation)
+        if len(ids):
+            tmp = f"{path}.{uuid.uuid4().hex}.part"
+            np.ascontiguousarray(mat, dtype=np.float32).tofile(tmp)
+            os.replace(tmp, path)
+        meta = {
+            "generation": generation,
+            "dim": int(mat.shape[1]) if mat.ndim == 2 else self._dim,
+            "ids": ids,
+            "texts": texts,
+            "metadatas": metas,
+        }
+        tmp = f"{self._meta_path}.{uuid.uuid4().hex}.part"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path)
+        self._load()
+        self._remove_old_generations()
+
+    def _remove_old_generations(self) -> None:
+        keep = os.path.basename(self._vec_path(self._generation))
+        for name in os.listdir(self.dir):
+            if name.startswith("vectors.") and name.endswith(".f32") and name != keep:
+                try:
+                    os.remove(os.path.join(self.dir, name))   # mappings of it stay valid
+                except OSError as e:
+                    log.debug("Could not remove old vectors file %s: %s", name, e)
+
+    # ------- writes -------
+
+    def upsert(self, ids, texts, vectors, metadatas=None) -> None:
+        """Insert or replace rows with precomputed embeddings."""
+        if not ids:
+            return
+        vecs = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        vecs = vecs / np.where(norms == 0, 1, norms)
+        metadatas = metadatas or [{} for _ in ids]
+        with self._writing():
+            self._refresh()
+            if self._dim and vecs.shape[1] != self._dim:
+                raise ValueError(f"Vector dimension {vecs.shape[1]} does not match the index ({self._dim}).")
+            new_ids, new_texts, new_metas = list(self._ids), list(self._texts), list(self._metas)
+            pos = dict(self._pos)
+            rows: List[int] = []
+            for i, text, meta in zip(ids, texts, metadatas):
+                n = pos.get(i)
+                if n is None:
+                    n = pos[i] = len(new_ids)
+                    new_ids.append(i)
+                    new_texts.append(text)
+                    new_metas.append(dict(meta or {}))
+                else:
+                    new_texts[n], new_metas[n] = text, dict(meta or {})
+                rows.append(n)
+            mat = np.empty((len(new_ids), vecs.shape[1]), dtype=np.float32)
+            if self._mat is not None:
+                mat[:len(self._ids)] = self._mat
+            mat[rows] = vecs
+            self._commit(new_ids, new_texts, new_metas, mat)
+
+    def add_texts(self, texts, metadatas=None) -> List[str]:
+        """Embed and insert texts; returns the new ids."""
+        texts = list(texts)
+        ids = [uuid.uuid4().hex for _ in texts]
+        self.upsert(ids, texts, self.embeddings.embed_documents(texts), metadatas)
+        return ids
+
+    def delete(self, ids) -> None:
+        """Remove rows by id (unknown ids are ignored)."""
+        with self._writing():
+            self._refresh()
+            drop = {n for i in ids if (n := self._pos.get(i)) is not None}
+            if not drop:
+                return
+            keep = [n for n in range(len(self._ids)) if n not in drop]
+            self._commit(
+                [self._ids[n] for n in keep],
+                [self._texts[n] for n in keep],
+                [self._metas[n] for n in keep],
+                self._mat[keep] if self._mat is not None else np.empty((0, self._dim), dtype=np.float32),
+            )
+
+    # ------- reads -------
+
+    def ids(self, where: Optional[Dict[str, Any]] = None) -> List[str]:
+        with self._lock:
+            self._refresh()
+            if where:
+                return [i for i, m in zip(self._ids, self._metas) if metadata_matches(m, where)]
+            return list(self._ids)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by live vectors."""
+        return len(self._ids) * self._dim * 4
+
+    def search_by_vector(self, vector, k: int = 3, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Top-k documents by cosine similarity to `vector`, optionally metadata-filtered."""
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        with self._lock:
+            self._refresh()
+            n = len(self._ids)
+            if not n or k <= 0:
+                return []
+            scores = np.asarray(self._mat) @ q
+            if filter:
+                mask = np.fromiter((metadata_matches(m, filter) for m in self._metas), dtype=bool, count=n)
+                scores = np.where(mask, scores, -np.inf)
+                k = min(k, int(mask.sum()))
+                if not k:
+                    return []
+            k = min(k, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                Document(
+                    id=self._ids[t],
+                    page_content=self._texts[t],
+                    metadata={**self._metas[t], "score": float(scores[t])},
+                )
+                for t in top
+            ]
+
+    def search(self, query: str, k: int = 3, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Top-k documents for `query` (embedded with `embed_query`)."""
+        return self.search_by_vector(self.embeddings.embed_query(query), k=k, filter=filter)
+
+    def as_retriever(self, k: int = 3) -> BaseRetriever:
+        return SearchRetriever(store=self, k=k)
+
+    def documents(self, ids) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield `(id, text, metadata)` for the given ids that exist."""
+        with self._lock:
+            self._refresh()
+            rows = [(i, self._texts[n], self._metas[n]) for i in ids if (n := self._pos.get(i)) is not None]
+        yield from rows
+
+
+class SearchRetriever(BaseRetriever):
+    """LangChain retriever over any store with `search(query, k)`."""
+    store: Any
+    k: int = 3
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.store.search(query, k=self.k)
@@ -0,0 +1,273 @@
+# src/app/adapters/write_behind.py
+"""
+Write-behind queue for durable chat history.
+
+Handlers enqueue a finished exchange and return; a background task flushes
+`chat_messages` inserts through `add_messages_bulk` once `batch_size` rows
+are pending or `flush_interval` seconds have passed, whichever comes first.
+Postgres latency (and short outages) stay off the reply path.
+
+- Rows of one chat keep their order; each flush writes one bulk insert per
+  chat, and a chat whose insert fails does not hold up the others.
+- A failed chat keeps its rows at the head of the queue and is retried with
+  exponential backoff. A row that has failed `max_attempts` times is written
+  on its own once more; if that fails too it is quarantined (logged and
+  dropped) so one bad row cannot block its chat forever.
+- `close()` flushes everything that is still pending (call it on shutdown).
+- When `max_pending` rows are waiting, `put()` waits up to `put_timeout`
+  seconds for a flush to free room, then drops the new rows (backpressure
+  instead of unbounded memory, without stalling the reply path).
+- Dropped rows are counted in `history_rows_dropped_total{reason}`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..concurrency import run_blocking
+from ..config.settings import settings
+from ..metrics import (
+    HISTORY_FLUSH_ROWS,
+    HISTORY_FLUSHES,
+    HISTORY_QUEUE_DEPTH,
+    HISTORY_QUEUE_LAG,
+    HISTORY_ROWS_DROPPED,
+    observe,
+)
+
+log = logging.getLogger(__name__)
+
+# (enqueued_at, chat_id, role, content, failed attempts)
+_Row = Tuple[float, int, str, str, int]
+_MAX_BACKOFF = 30.0
+Sink = Callable[[int, List[Tuple[str, str]]], Awaitable[None]]
+
+
+class WriteBehindQueue:
+    """
+    Batches history rows in memory and flushes them in the background.
+    """
+
+    def __init__(
+        self,
+        sink: Sink,
+        *,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        put_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        sink : Callable[[int, list[tuple[str, str]]], Awaitable[None]]
+            `await sink(chat_id, [(role, content), ...])` writes one chat's rows.
+        batch_size : Optional[int]
+            Rows that trigger an early flush (default: settings).
+        flush_interval : Optional[float]
+            Maximum seconds a row waits before being flushed (default: settings).
+        max_pending : Optional[int]
+            Rows held before `put()` applies backpressure (default: settings).
+        put_timeout : Optional[float]
+            Seconds `put()` waits for room before dropping rows (default: settings).
+        max_attempts : Optional[int]
+            Failed writes before a row is quarantined (default: settings).
+        clock : Callable[[], float]
+            Monotonic clock (injectable for tests).
+        """
+        self._sink = sink
+        self.batch_size = batch_size or settings.history_flush_batch_size
+        self.flush_interval = flush_interval or settings.history_flush_interval_seconds
+        self.max_pending = max_pending or settings.history_max_pending
+        self.put_timeout = put_timeout if put_timeout is not None else settings.history_put_timeout_seconds
+        self.max_attempts = max_attempts or settings.history_max_attempts
+        self._clock = clock
+        self._rows: List[_Row] = []
+        self._retry_at: Dict[int, float] = {}
+        self._wake = asyncio.Event()
+        self._flushed = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.on_close: Optional[Callable[[], Awaitable[None]]] = None
+
+    # ------- producer side -------
+
+    async def put(self, chat_id: int, turns: Sequence[Tuple[str, str]]) -> None:
+        """
+        Enqueue `(role, content)` rows for a chat; returns without touching the DB.
+
+        If the queue stays full for `put_timeout` seconds the rows are dropped
+        (and counted) rather than stalling the caller.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.put_timeout
+        while len(self._rows) >= self.max_pending and self._task is not None and not self._closing:
+            remaining = deadline - loop.time()
+            self._flushed.clear()
+            self._wake.set()
+            try:
+                await asyncio.wait_for(self._flushed.wait(), max(remaining, 0))
+            except asyncio.TimeoutError:
+                HISTORY_ROWS_DROPPED.labels(reason="backpressure").inc(len(turns))
+                log.warning("History queue full (%d rows); dropped %d row(s) of chat %s.",
+                            len(self._rows), len(turns), chat_id)
+                return
+        now = self._clock()
+        self._rows.extend((now, chat_id, role, content, 0) for role, content in turns)
+        HISTORY_QUEUE_DEPTH.set(len(self._rows))
+        if len(self._rows) >= self.batch_size:
+            self._wake.set()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ------- consumer side -------
+
+    def start(self) -> "WriteBehindQueue":
+        """Start the background flusher on the running loop (returns self)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="history-write-behind")
+        return self
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self, force: bool = False) -> int:
+        """
+        Write pending rows now, one bulk insert per chat.
+
+        Parameters
+        ----------
+        force : bool
+            Also retry chats that are still backing off after a failure.
+
+        Returns
+        -------
+        int
+            Rows written (failed chats keep their rows queued).
+        """
+        async with self._lock:
+            rows, self._rows = self._rows, []
+            try:
+                return await self._flush_rows(rows, force)
+            finally:
+                HISTORY_QUEUE_DEPTH.set(len(self._rows))
+                self._flushed.set()
+
+    async def _flush_rows(self, rows: List[_Row], force: bool) -> int:
+        if not rows:
+            return 0
+        now = self._clock()
+        by_chat: Dict[int, List[_Row]] = {}
+        for r in rows:
+            by_chat.setdefault(r[1], []).append(r)
+        keep: List[_Row] = []
+        written, failed, oldest = 0, False, None
+        for chat_id, chat_rows in by_chat.items():
+            if not force and self._retry_at.get(chat_id, 0.0) > now:
+                keep.extend(chat_rows)
+                continue
+            try:
+                await self._sink(chat_id, [(role, content) for _, _, role, content, _ in chat_rows])
+            except Exception as e:
+                failed = True
+                log.warning("History flush failed for chat %s (%d rows kept): %s", chat_id, len(chat_rows), e)
+                n, retry = await self._retry_later(chat_id, chat_rows, now)
+                written += n
+                keep.extend(retry)
+                continue
+            self._retry_at.pop(chat_id, None)
+            written += len(chat_rows)
+            oldest = chat_rows[0][0] if oldest is None else min(oldest, chat_rows[0][0])
+        # keep what failed, ahead of anything enqueued meanwhile
+        self._rows = keep + self._rows
+        if oldest is not None:
+            observe(HISTORY_QUEUE_LAG, now - oldest)
+        if written:
+            observe(HISTORY_FLUSH_ROWS, written)
+        HISTORY_FLUSHES.labels(result="error" if failed else "ok").inc()
+        return written
+
+    async def _retry_later(self, chat_id: int, rows: List[_Row], now: float) -> Tuple[int, List[_Row]]:
+        """
+        Count a failed attempt for a chat's rows and schedule the retry.
+
+        Rows out of attempts (always the oldest, since rows only join at
+        the tail) are written one at a time; a row that still fails alone is
+        quarantined. Returns `(rows written, rows to requeue)`.
+        """
+        rows = [(t, c, role, content, n + 1) for t, c, role, content, n in rows]
+        spent = sum(1 for r in rows if r[4] >= self.max_attempts)
+        written = 0
+        for t, c, role, content, n in rows[:spent]:
+            try:
+                await self._sink(chat_id, [(role, content)])
+                written += 1
+            except Exception as e:
+                HISTORY_ROWS_DROPPED.labels(reason="quarantined").inc()
+                log.error(
+                    "Quarantined a %s row of chat %s (%d chars) after %d failed writes: %s",
+                    role, chat_id, len(content), n, e,
+                )
+        retry = rows[spent:]
+        if retry:
+            self._retry_at[chat_id] = now + min(self.flush_interval * 2 ** retry[0][4], _MAX_BACKOFF)
+        else:
+            self._retry_at.pop(chat_id, None)
+        return written, retry
+
+    async def close(self) -> None:
+        """
+        Stop the flusher and write everything still pending.
+        """
+        self._closing = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush(force=True)
+        if self._rows:
+            log.error("History write-behind closed with %d unwritten rows.", len(self._rows))
+        if self.on_close is not None:
+            await self.on_close()
+
+
+async def open_history_writer(durable_mem) -> WriteBehindQueue:
+    """
+    Build and start the history write-behind queue.
+
+    With `durable_async_enabled` rows go through `AsyncPgDurableStore` on an
+    async psycopg pool; otherwise `durable_mem.add_messages_bulk` runs on the
+    shared worker pool. Must be awaited inside the running event loop.
+    """
+    store = None
+    if settings.durable_async_enabled:
+        from .memory_postgres_async import AsyncPgDurableStore
+
+        store = await AsyncPgDurableStore.open()
+
+    async def sink(chat_id: int, turns: List[Tuple[str, str]]) -> None:
+        if store is not None:
+            await store.add_messages_bulk(chat_id=chat_id, turns=turns)
+        else:
+            await run_blocking("persist", durable_mem.add_messages_bulk, chat_id=chat_id, turns=turns)
+
+    q = WriteBehindQueue(sink)
+    if store is not None:
+        q.on_close = store.close
+    log.info(
+        "History write-behind started (batch=%d, interval=%ss).", q.batch_size, q.flush_interval
+    )
+    return q.start()
@@ -0,0 +1,131 @@
+"""
+Bounded worker pool for blocking work called from async Telegram handlers.
+
+The graph, Redis, Postgres and OpenAI SDK clients are synchronous. Running
+them directly inside a PTB coroutine stalls the event loop for every chat, so
+handlers hand them to a shared, bounded thread pool instead:
+
+- run_blocking(stage, fn, *args, **kwargs): await `fn` on a worker thread
+- chat_lock(chat_id): per-chat asyncio lock that keeps turns of one chat ordered
+
+Queue depth, in-flight count and queue wait time are exported to Prometheus.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .config.settings import settings
+from .metrics import BLOCKING_INFLIGHT, BLOCKING_QUEUE_DEPTH, BLOCKING_WAIT, observe
+
+T = TypeVar("T")
+
+
+class BlockingPool:
+    """
+    Thread pool with a hard concurrency limit and queue metrics.
+
+    At most `max_workers` blocking calls run at once; further calls queue up
+    (visible in `BLOCKING_QUEUE_DEPTH`) while the event loop keeps serving
+    other updates.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        """
+        Parameters
+        ----------
+        max_workers : int
+            Maximum number of blocking calls executing concurrently.
+        """
+        self.max_workers = max(1, int(max_workers))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="karan-blocking"
+        )
+
+    async def run(self, stage: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run `fn(*args, **kwargs)` on a worker thread and await its result.
+
+        The caller's contextvars (e.g., the active OpenTelemetry span) are
+        propagated to the worker thread.
+
+        Parameters
+        ----------
+        stage : str
+            Short label for metrics (e.g., "graph", "persist").
+        fn : Callable[..., T]
+            Blocking callable.
+
+        Returns
+        -------
+        T
+            Whatever `fn` returns; exceptions are re-raised in the caller.
+        """
+        ctx = contextvars.copy_context()
+        t_submit = time.perf_counter()
+
+        def _call() -> T:
+            BLOCKING_QUEUE_DEPTH.dec()
+            BLOCKING_INFLIGHT.inc()
+            observe(BLOCKING_WAIT, time.perf_counter() - t_submit, stage=stage)
+            try:
+                return ctx.run(fn, *args, **kwargs)
+            finally:
+                BLOCKING_INFLIGHT.dec()
+
+        BLOCKING_QUEUE_DEPTH.inc()
+        cf: Future = self._executor.submit(_call)
+        # A call cancelled before it started never reaches `_call`.
+        cf.add_done_callback(lambda f: f.cancelled() and BLOCKING_QUEUE_DEPTH.dec())
+        return await asyncio.wrap_future(cf)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and optionally wait for running calls."""
+        self._executor.shutdown(wait=wait)
+
+
+_pool: Optional[BlockingPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> BlockingPool:
+    """
+    Return the process-wide pool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BlockingPool(settings.blocking_pool_size)
+    return _pool
+
+
+async def run_blocking(stage: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Await a blocking callable on the shared worker pool.
+    """
+    return await get_pool().run(stage, fn, *args, **kwargs)
+
+
+_chat_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def chat_lock(chat_id: int) -> asyncio.Lock:
+    """
+    Return the asyncio lock serializing turns of a single chat.
+
+    Different chats run concurrently; two messages from the same chat are
+    processed in arrival order so they don't race on the same graph thread
+    and memory window. Unused locks are garbage-collected.
+    """
+    lock = _chat_locks.get(chat_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _chat_locks[chat_id] = lock
+    return lock
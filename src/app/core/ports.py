@@ -1,7 +1,7 @@
 # src/app/core/ports.py
 from __future__ import annotations
 
-from typing import Any, List, Optional, Protocol, Sequence
+from typing import Any, Iterator, List, Optional, Protocol, Sequence
 
 
 class LLM(Protocol):
@@ -26,29 +26,59 @@ class Embeddings(Protocol):
         """Embed a list of texts and return a list of vectors."""
         ...
 
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a single query text."""
+        ...
+
 
 class VectorStore(Protocol):
     """
     Vector database interface with simple add/search APIs.
 
-    This aligns with the small adapter we wrap around Chroma:
+    This aligns with the small adapter we wrap around Chroma (and with
+    `NumpyVectorStore`):
     - `add_texts(texts, metadatas)`
-    - `search(query, k)`
+    - `search(query, k, filter)`
     - `as_retriever(k)`
+    - `ids()`, `upsert(...)`, `delete(ids)`, `documents(ids)` for ingestion
     """
 
     def add_texts(self, texts: list[str], metadatas: Optional[list[dict]] = None) -> None:
         """Insert multiple documents (and optional metadata) into the store."""
         ...
 
-    def search(self, query: str, k: int = 3) -> list[Any]:
-        """Return the top-k nearest results for the query."""
+    def search(self, query: str, k: int = 3, filter: Optional[dict] = None) -> list[Any]:
+        """Return the top-k nearest results for the query (optionally metadata-filtered)."""
         ...
 
     def as_retriever(self, k: int = 3):
         """Return a retriever object configured to fetch top-k results."""
         ...
 
+    # Used by ingestion (`workflows/ingestion.py`) for incremental updates.
+
+    def ids(self, where: Optional[dict] = None) -> list[str]:
+        """Return the ids of all stored documents (or those whose metadata matches `where`)."""
+        ...
+
+    def upsert(
+        self,
+        ids: list[str],
+        texts: list[str],
+        vectors: list[list[float]],
+        metadatas: Optional[list[dict]] = None,
+    ) -> None:
+        """Insert or replace documents with precomputed embeddings."""
+        ...
+
+    def delete(self, ids: list[str]) -> None:
+        """Remove documents by id."""
+        ...
+
+    def documents(self, ids: list[str]) -> Iterator[tuple[str, str, dict]]:
+        """Yield `(id, text, metadata)` for stored documents (index backfills)."""
+        ...
+
 
 class TTS(Protocol):
     """
@@ -61,6 +91,8 @@ class TTS(Protocol):
         """Synthesize speech audio for the given text and return raw bytes."""
         ...
 
+    # Optional: `to_file(text) -> path` streams audio to a temp file instead.
+
 
 class ImageGen(Protocol):
     """
@@ -70,7 +102,7 @@ class ImageGen(Protocol):
     """
 
     def __call__(self, prompt: str, size: str = "1024x1024") -> str:
-        """Generate an image and return the saved file path."""
+        """Generate an image and return the saved file path (owned by the caller)."""
         ...
 
 
@@ -83,6 +115,18 @@ class ShortTermMemory(Protocol):
         """Append a message to the rolling window for a chat."""
         ...
 
+    def append_turn(self, chat_id: int, msgs: Sequence[Any], fetch: Optional[int] = None) -> List[Any]:
+        """Append several messages in one round-trip; optionally return the window."""
+        ...
+
+    def replace_window(self, chat_id: int, msgs: Sequence[Any]) -> None:
+        """Atomically replace the chat’s window with `msgs`."""
+        ...
+
+    def compact_window(self, chat_id: int, summarized: Sequence[Any], replacement: Sequence[Any]) -> bool:
+        """Atomically swap the `summarized` messages for `replacement`, keeping newer ones."""
+        ...
+
     def get_window(self, chat_id: int, k: int = 30) -> List[Any]:
         """Fetch up to `k` recent messages for a chat (oldest → newest)."""
         ...
@@ -92,13 +136,39 @@ class ShortTermMemory(Protocol):
         ...
 
 
+class AsyncShortTermMemory(Protocol):
+    """
+    Awaitable variant of `ShortTermMemory` (e.g., `redis.asyncio` window).
+    """
+
+    async def append_message(self, chat_id: int, msg: Any) -> None:
+        """Append a message to the rolling window for a chat."""
+        ...
+
+    async def append_turn(self, chat_id: int, msgs: Sequence[Any], fetch: Optional[int] = None) -> List[Any]:
+        """Append several messages in one round-trip; optionally return the window."""
+        ...
+
+    async def replace_window(self, chat_id: int, msgs: Sequence[Any]) -> None:
+        """Atomically replace the chat’s window with `msgs`."""
+        ...
+
+    async def get_window(self, chat_id: int, k: int = 30) -> List[Any]:
+        """Fetch up to `k` recent messages for a chat (oldest → newest)."""
+        ...
+
+    async def clear(self, chat_id: int) -> None:
+        """Clear the chat’s rolling window."""
+        ...
+
+
 class DurableMemory(Protocol):
     """
     Durable memory (e.g., Postgres) for summaries and history.
     """
 
-    def set_summary(self, chat_id: int, text: str) -> None:
-        """Set or update the latest summary for a chat."""
+    def set_summary(self, chat_id: int, text: str, *, covered: int = 0) -> None:
+        """Set or update the latest summary for a chat, which folds in `covered` new messages."""
         ...
 
     def get_summary(self, chat_id: int) -> Optional[str]:
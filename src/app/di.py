@@ -1,11 +1,25 @@
 # src/app/di.py
+import os
 from dataclasses import dataclass
+
+import redis
+
+from .config.settings import settings
 from .adapters.llm_openai import build_llm
-from .adapters.vector_chroma import build_vectorstore
+from .adapters.openai_clients import get_openai_clients
+from .adapters.vector_chroma import build_embeddings, build_vectorstore
+from .adapters.vector_numpy import NumpyVectorStore
+from .adapters.hybrid_search import build_hybrid
 from .adapters.tts_elevenlabs import build_tts
+from .adapters.tts_cache import build_cached_tts
 from .adapters.image_openai import build_image_gen
-from .adapters.memory_redis import RedisMemoryStore
+from .adapters.image_cache import build_cached_image_gen
+from .adapters.l1_cache import RedisInvalidationBus, wrap_with_l1
+from .adapters.memory_redis import AsyncRedisMemoryStore, RedisMemoryStore, connection_pool
 from .adapters.memory_postgres import PgDurableStore
+from .adapters.semantic_cache import SemanticQACache
+from .adapters.retrieval import CachedQueryEmbeddings, build_retriever
+from .adapters.summary_worker import SummaryWorker
 
 class VSAdapter:
     """Small adapter to present a stable VectorStore interface."""
@@ -13,10 +27,43 @@ class VSAdapter:
         self._vs = vs
     def add_texts(self, texts, metadatas=None):
         return self._vs.add_texts(texts=texts, metadatas=metadatas)
-    def search(self, query: str, k: int = 3):
-        return self._vs.similarity_search(query, k=k)
+    def search(self, query: str, k: int = 3, filter=None):
+        return self._vs.similarity_search(query, k=k, filter=_chroma_where(filter))
     def as_retriever(self, k: int = 3):
         return self._vs.as_retriever(search_kwargs={"k": k})
+    @property
+    def embeddings(self):
+        return self._vs.embeddings
+    def ids(self, where=None):
+        return self._vs.get(where=_chroma_where(where), include=[])["ids"]
+    def upsert(self, ids, texts, vectors, metadatas=None):
+        self._vs._collection.upsert(ids=ids, documents=texts, embeddings=vectors, metadatas=metadatas)
+    def delete(self, ids):
+        self._vs.delete(ids=list(ids))
+    def documents(self, ids):
+        got = self._vs.get(ids=list(ids), include=["documents", "metadatas"])
+        yield from zip(got["ids"], got["documents"], [m or {} for m in got["metadatas"]])
+
+def _chroma_where(filter):
+    """Port filter ({"k": v} / {"k": [v, ...]}) -> Chroma `where` syntax."""
+    if not filter:
+        return None
+    clauses = [{k: {"$in": list(v)} if isinstance(v, (list, tuple, set)) else v} for k, v in filter.items()]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def build_vector(collection: str = "karan_bio", embeddings=None):
+    """
+    Return the `VectorStore` for `settings.vector_backend`: Chroma behind
+    `VSAdapter`, or the in-process `NumpyVectorStore` for small collections,
+    wrapped with hybrid BM25 search when enabled.
+    """
+    embeddings = embeddings or build_embeddings()
+    if settings.vector_backend == "numpy":
+        vector = NumpyVectorStore(os.path.join(settings.numpy_index_dir, collection), embeddings)
+    else:
+        vector = VSAdapter(build_vectorstore(collection, embeddings=embeddings))
+    # BM25 over the same chunks, fused with vector results (RRF)
+    return build_hybrid(vector, collection)
 
 @dataclass
 class Container:
@@ -26,13 +73,38 @@ class Container:
     image_gen: object
     short_mem: object
     durable_mem: object
+    short_mem_async: object = None   # optional awaitable twin of short_mem
+    semantic_cache: object = None    # optional SemanticQACache (after exact-match cache)
+    openai: object = None            # shared pooled OpenAI clients (OpenAIClients)
+    history_writer: object = None    # WriteBehindQueue for chat history (opened in post_init)
+    summary_llm: object = None       # cheaper model for window summaries (default: llm)
+    summary_worker: object = None    # SummaryWorker running summaries off the reply path
+    retriever: object = None         # Retriever over `vector` (cached, time-boxed)
 
 def build_container():
+    # In-process L1 in front of Redis Q&A reads and Postgres summary reads
+    bus = (
+        RedisInvalidationBus(redis.Redis(connection_pool=connection_pool(0)))
+        if settings.l1_invalidation_pubsub else None
+    )
+    short_mem, durable_mem = wrap_with_l1(RedisMemoryStore(), PgDurableStore(), bus=bus)
+    # One pooled OpenAI client pair for chat, embeddings, Whisper, vision and images
+    openai_clients = get_openai_clients()
+    # Query embeddings are memoized and shared: retrieval and the semantic
+    # cache embed the same question once.
+    embeddings = CachedQueryEmbeddings(build_embeddings())
+    vector = build_vector(embeddings=embeddings)
     return Container(
-        llm=build_llm(),
-        vector=VSAdapter(build_vectorstore()),
-        tts=build_tts(),           # callable: tts(text) -> bytes
-        image_gen=build_image_gen(),  # callable: image_gen(prompt) -> path
-        short_mem=RedisMemoryStore(),
-        durable_mem=PgDurableStore(),
+        llm=build_llm(openai_clients),
+        vector=vector,
+        tts=build_cached_tts(build_tts()),  # tts(text) -> bytes; tts.to_file(text) -> path
+        image_gen=build_cached_image_gen(build_image_gen(openai_clients.for_op("image"))),  # -> path
+        short_mem=short_mem,
+        durable_mem=durable_mem,
+        short_mem_async=AsyncRedisMemoryStore() if settings.redis_async_enabled else None,
+        semantic_cache=SemanticQACache(embeddings) if settings.semantic_cache_enabled else None,
+        openai=openai_clients,
+        summary_llm=build_llm(openai_clients, model=settings.summary_model),
+        summary_worker=SummaryWorker() if settings.summary_background_enabled else None,
+        retriever=build_retriever(vector),
     )
@@ -0,0 +1,74 @@
+"""
+CLI for checkpoint retention: `karan-bot-checkpoints`.
+
+Runs one maintenance pass (prune old checkpoints, expire idle threads,
+compact) against the SQLite checkpoint DB, or keeps running on an interval
+with `--watch`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sqlite3
+import time
+
+from dotenv import load_dotenv
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from ..config.logging import configure_logging
+from ..config.settings import settings
+from ..workflows.checkpoint_retention import CheckpointRetention
+from ..workflows.karan_graph import DB_URL
+
+load_dotenv()
+
+log = logging.getLogger("app.checkpoints")
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Prune and compact the LangGraph checkpoint DB.")
+    p.add_argument("--db", default=DB_URL, help="SQLite path or file: URI (default: SHORT_TERM_DB_URL)")
+    p.add_argument("--keep-last", type=int, default=settings.checkpoint_keep_last,
+                   help="checkpoints to keep per thread")
+    p.add_argument("--idle-ttl", type=int, default=settings.checkpoint_idle_ttl_seconds,
+                   help="delete threads idle for more than this many seconds (0 = never)")
+    p.add_argument("--vacuum", action="store_true", help="always VACUUM after pruning")
+    p.add_argument("--watch", action="store_true", help="keep running on an interval")
+    p.add_argument("--interval", type=int, default=settings.checkpoint_maintenance_interval_seconds or 900,
+                   help="seconds between runs with --watch")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    """
+    Entry point: run retention once (or periodically with --watch).
+    """
+    configure_logging()
+    args = _parse_args(argv)
+
+    conn = sqlite3.connect(args.db, check_same_thread=False, uri=args.db.startswith("file:"))
+    retention = CheckpointRetention(
+        SqliteSaver(conn),
+        keep_last=args.keep_last,
+        idle_ttl_seconds=args.idle_ttl,
+    )
+    try:
+        while True:
+            r = retention.run_once(force_vacuum=args.vacuum)
+            print(
+                f"pruned={r.checkpoints_pruned} expired_threads={r.threads_expired} "
+                f"vacuumed={r.vacuumed} db_bytes={r.db_bytes} "
+                f"checkpoints={r.checkpoint_rows} writes={r.write_rows}"
+            )
+            if not args.watch:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
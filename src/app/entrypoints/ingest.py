@@ -0,0 +1,64 @@
+"""
+CLI for loading the summit knowledge base: `karan-bot-ingest`.
+
+Chunks every text file under `DATA_DIR` (or `--data-dir`), embeds only the
+chunks the `karan_bio` collection does not already hold, and prunes chunks
+of that directory whose source text changed or disappeared. Chunks from
+anywhere else (other directories, `add_texts`) are never pruned.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from dotenv import load_dotenv
+
+from ..config.logging import configure_logging
+from ..config.settings import settings
+from ..di import build_vector
+from ..workflows.ingestion import Ingestor, corpus_name, iter_files
+
+load_dotenv()
+
+log = logging.getLogger("app.ingest")
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Chunk, embed and upsert documents into the vector store.")
+    p.add_argument("--data-dir", default=settings.data_dir, help="directory to ingest (default: DATA_DIR)")
+    p.add_argument("--collection", default="karan_bio", help="collection name")
+    p.add_argument("--batch-size", type=int, default=settings.ingest_batch_size,
+                   help="texts per embedding call")
+    p.add_argument("--concurrency", type=int, default=settings.ingest_concurrency,
+                   help="embedding calls in flight")
+    p.add_argument("--no-prune", action="store_true",
+                   help="keep this directory's chunks that no file produces any more (partial ingest)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    """
+    Entry point: ingest `--data-dir` once and print a summary.
+    """
+    configure_logging()
+    args = _parse_args(argv)
+
+    vector = build_vector(args.collection)
+    ingestor = Ingestor(
+        vector,
+        vector.embeddings,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+    )
+    r = ingestor.run(iter_files(args.data_dir), corpus=corpus_name(args.data_dir), prune=not args.no_prune)
+    print(
+        f"files={r.files} chunks={r.chunks} embedded={r.embedded} unchanged={r.unchanged} "
+        f"duplicates={r.duplicates} pruned={r.pruned} embed_calls={r.embed_calls} "
+        f"embed_calls_saved={r.embed_calls_saved} seconds={r.seconds:.2f} "
+        f"chunks_per_sec={r.chunks_per_sec:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
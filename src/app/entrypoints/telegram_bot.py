@@ -14,17 +14,23 @@ from telegram.ext import (
     filters,
 )
 
+from ..adapters.media_store import start_media_janitor
 from ..adapters.telegram_handlers import (
     handle_photo,
     handle_start,
     handle_text,
     handle_voice,
 )
+from ..adapters.write_behind import open_history_writer
 from ..config.logging import configure_logging
 from ..config.settings import settings
+from ..constants import IMAGE_PROMPT
 from ..di import build_container
 from ..metrics import HANDLER_LAT, TG_UPDATES, inc, observe
 from ..telemetry import init_telemetry
+from ..utils.tokens import warm_encoding
+from ..workflows.checkpoint_retention import start_retention_scheduler
+from ..workflows.checkpointers import close_async_checkpointer, open_async_checkpointer
 from ..workflows.karan_graph import build_graph
 
 # Load environment variables as early as possible.
@@ -60,18 +66,55 @@ def _wrap_simple(name: str, fn: Callable[..., Any]):
 def _wrap_with_graph(name: str, fn: Callable[..., Any], graph: Any):
     """
     Wrap a graph-dependent handler with Prometheus timing + count.
+
+    If `graph` is None it is resolved from `bot_data["graph"]` per update
+    (graphs on an async checkpointer are compiled in `post_init`).
     """
     async def _inner(update: "Update", context: ContextTypes.DEFAULT_TYPE):
         inc(TG_UPDATES, type=name)
         t0 = time.perf_counter()
+        g = graph if graph is not None else context.application.bot_data["graph"]
         try:
-            return await fn(graph, update, context)
+            return await fn(g, update, context)
         finally:
             observe(HANDLER_LAT, time.perf_counter() - t0, handler=name)
 
     return _inner
 
 
+# ---------- lifecycle hooks (run inside PTB's event loop) ----------
+
+async def _post_init(app: Application) -> None:
+    """
+    Open loop-bound resources before polling starts.
+    """
+    container = app.bot_data["container"]
+    if settings.history_write_behind_enabled:
+        container.history_writer = await open_history_writer(container.durable_mem)
+    if app.bot_data.get("graph") is None and settings.checkpointer_backend == "postgres_async":
+        saver = await open_async_checkpointer()
+        app.bot_data["graph"] = build_graph(app.bot_data["container"], checkpointer=saver)
+
+
+async def _post_shutdown(app: Application) -> None:
+    """
+    Release loop-bound resources after polling stops.
+    """
+    container = app.bot_data.get("container")
+    summaries = getattr(container, "summary_worker", None)
+    if summaries is not None:
+        await summaries.drain(timeout=30)
+    writer = getattr(container, "history_writer", None)
+    if writer is not None:
+        await writer.close()  # flush pending chat history
+    graph = app.bot_data.get("graph")
+    if graph is not None and getattr(graph, "async_checkpointer", False):
+        await close_async_checkpointer(graph.checkpointer)
+    openai_clients = getattr(app.bot_data.get("container"), "openai", None)
+    if openai_clients is not None:
+        await openai_clients.aclose()
+
+
 # --------------------------------------------------------
 
 def build_app(graph: Any) -> Application:
@@ -81,14 +124,23 @@ def build_app(graph: Any) -> Application:
     Parameters
     ----------
     graph : Any
-        The compiled LangGraph instance.
+        The compiled LangGraph instance, or None to compile it in `post_init`
+        (async checkpointer backends).
 
     Returns
     -------
     Application
         A fully configured python-telegram-bot Application.
     """
-    app = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
+    # Process updates concurrently; blocking work is bounded by the worker pool.
+    app = (
+        Application.builder()
+        .token(settings.TELEGRAM_BOT_TOKEN)
+        .concurrent_updates(settings.tg_concurrent_updates)
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
 
     # /start (no graph needed)
     app.add_handler(CommandHandler("start", _wrap_simple("start", handle_start)))
@@ -118,13 +170,21 @@ def main() -> None:
     init_telemetry()
     log.info("env=%s debug=%s", settings.env, settings.debug)
 
-    # Build DI container and graph
+    # Build DI container and graph (async checkpointers are opened in post_init)
     container = build_container()
-    graph = build_graph(container)
-
-    # Expose container to handlers via bot_data
+    warm_encoding()
+    start_media_janitor()
+    if settings.image_pool_warm_on_start and hasattr(container.image_gen, "warm"):
+        container.image_gen.warm(IMAGE_PROMPT)
+    graph = None
+    if settings.checkpointer_backend != "postgres_async":
+        graph = build_graph(container)
+        start_retention_scheduler(graph.checkpointer)
+
+    # Expose container (and graph) to handlers via bot_data
     app = build_app(graph)
     app.bot_data["container"] = container
+    app.bot_data["graph"] = graph
 
     log.info("Starting Telegram polling")
     app.run_polling(allowed_updates=["message"])  # blocking call
@@ -30,11 +30,150 @@ NS = settings.metrics_namespace
 TG_UPDATES = Counter(f"{NS}_tg_updates_total", "Total Telegram updates", ["type"])
 LLM_CALLS = Counter(f"{NS}_llm_calls_total", "Total LLM calls", ["model", "status"])
 LLM_LAT = Histogram(f"{NS}_llm_latency_seconds", "LLM latency seconds", ["model"])
+LLM_TTFT = Histogram(
+    f"{NS}_llm_time_to_first_token_seconds",
+    "Time from request to first streamed token",
+    ["model"],
+    buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+LLM_TOKENS_PER_SEC = Histogram(
+    f"{NS}_llm_tokens_per_second",
+    "Streamed output tokens per second after the first token",
+    ["model"],
+    buckets=(5, 10, 20, 40, 60, 80, 100, 150, 200, 400),
+)
 GRAPH_LAT = Histogram(f"{NS}_graph_latency_seconds", "Graph invoke latency")
 HANDLER_LAT = Histogram(
     f"{NS}_handler_latency_seconds", "Handler latency seconds", ["handler"]
 )
 
+# ---------------- Blocking worker pool ----------------
+
+BLOCKING_QUEUE_DEPTH = Gauge(
+    f"{NS}_blocking_queue_depth", "Blocking calls waiting for a worker thread"
+)
+BLOCKING_INFLIGHT = Gauge(
+    f"{NS}_blocking_inflight", "Blocking calls currently running on a worker thread"
+)
+BLOCKING_WAIT = Histogram(
+    f"{NS}_blocking_wait_seconds", "Time a blocking call waited for a worker", ["stage"]
+)
+
+# ---------------- Checkpoint store ----------------
+
+CHECKPOINT_DB_BYTES = Gauge(f"{NS}_checkpoint_db_bytes", "Checkpoint database size in bytes")
+CHECKPOINT_ROWS = Gauge(f"{NS}_checkpoint_rows", "Rows in the checkpoint tables", ["table"])
+CHECKPOINTS_PRUNED = Counter(
+    f"{NS}_checkpoints_pruned_total", "Checkpoints/threads removed by retention", ["reason"]
+)
+
+# ---------------- Semantic Q&A cache ----------------
+
+SEMANTIC_CACHE = Counter(
+    f"{NS}_semantic_cache_total", "Semantic cache lookups", ["result"]  # hit | near_miss | miss | error
+)
+SEMANTIC_CACHE_SIMILARITY = Histogram(
+    f"{NS}_semantic_cache_similarity",
+    "Best cosine similarity per semantic cache lookup",
+    buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.88, 0.9, 0.92, 0.94, 0.96, 0.98, 1.0),
+)
+
+QA_SINGLEFLIGHT = Counter(
+    f"{NS}_qa_singleflight_total",
+    "Q&A cache misses that waited on an identical in-flight request",
+    ["result"],  # shared | timeout | leader_error
+)
+
+# ---------------- In-process L1 caches ----------------
+
+L1_CACHE_REQUESTS = Counter(
+    f"{NS}_l1_cache_requests_total", "L1 cache lookups", ["cache", "result"]  # hit | miss
+)
+L1_CACHE_HIT_RATIO = Gauge(f"{NS}_l1_cache_hit_ratio", "L1 cache hit ratio since start", ["cache"])
+L1_CACHE_BYTES = Gauge(f"{NS}_l1_cache_bytes", "Estimated L1 cache size in bytes", ["cache"])
+
+# ---------------- Disk blob caches (TTS audio, images) ----------------
+
+BLOB_CACHE_REQUESTS = Counter(
+    f"{NS}_blob_cache_requests_total", "Disk blob cache lookups", ["cache", "result"]  # hit | miss | error
+)
+BLOB_CACHE_HIT_RATIO = Gauge(f"{NS}_blob_cache_hit_ratio", "Disk blob cache hit ratio since start", ["cache"])
+BLOB_CACHE_BYTES = Gauge(f"{NS}_blob_cache_bytes", "Bytes stored in the disk blob cache", ["cache"])
+BLOB_CACHE_BYTES_SAVED = Counter(
+    f"{NS}_blob_cache_bytes_saved_total", "Bytes served from cache instead of regenerated", ["cache"]
+)
+
+# ---------------- Media storage ----------------
+
+MEDIA_DISK_BYTES = Gauge(f"{NS}_media_disk_bytes", "Bytes used in the media directory", ["kind"])
+MEDIA_FILES = Gauge(f"{NS}_media_files", "Files in the media directory", ["kind"])
+MEDIA_FILES_REMOVED = Counter(
+    f"{NS}_media_files_removed_total", "Media files removed by the janitor", ["reason"]  # age | size
+)
+
+# ---------------- Prompt size ----------------
+
+PROMPT_TOKENS = Histogram(
+    f"{NS}_prompt_tokens",
+    "Input tokens per LLM prompt after budgeting",
+    ["model"],
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000),
+)
+PROMPT_TRIMMED_MESSAGES = Counter(
+    f"{NS}_prompt_trimmed_messages_total", "History messages dropped to fit the token budget", ["model"]
+)
+CONTEXT_BUILD_SECONDS = Histogram(
+    f"{NS}_context_build_seconds",
+    "Time to count and trim a prompt",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+# ---------------- Retrieval (karan_bio facts) ----------------
+
+RETRIEVAL_REQUESTS = Counter(
+    f"{NS}_retrieval_requests_total", "Fact retrievals", ["result"]  # hit | miss | timeout | error
+)
+RETRIEVAL_LAT = Histogram(
+    f"{NS}_retrieval_latency_seconds",
+    "Uncached retrieval latency (embedding + vector search, capped by the timeout)",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5),
+)
+HYBRID_SEARCHES = Counter(
+    f"{NS}_hybrid_searches_total", "Knowledge base searches by path", ["path"]  # lexical | hybrid | vector
+)
+RETRIEVAL_DOCS = Histogram(
+    f"{NS}_retrieval_docs", "Snippets returned per retrieval", buckets=(0, 1, 2, 3, 5, 8, 13)
+)
+
+# ---------------- Knowledge base ingestion ----------------
+
+INGEST_CHUNKS = Counter(
+    f"{NS}_ingest_chunks_total", "Chunks seen by ingestion", ["result"]  # embedded | unchanged | duplicate | pruned
+)
+INGEST_EMBED_CALLS = Counter(f"{NS}_ingest_embed_calls_total", "Embedding API calls made by ingestion")
+
+# ---------------- Background summarization ----------------
+
+SUMMARY_JOBS = Counter(f"{NS}_summary_jobs_total", "Summary jobs", ["result"])  # ok | error | deduped
+SUMMARY_LAT = Histogram(f"{NS}_summary_latency_seconds", "Background summary job latency")
+SUMMARY_PENDING = Gauge(f"{NS}_summary_jobs_pending", "Summary jobs queued or running")
+
+# ---------------- History write-behind ----------------
+
+HISTORY_QUEUE_DEPTH = Gauge(f"{NS}_history_queue_depth", "Chat history rows waiting to be written")
+HISTORY_QUEUE_LAG = Histogram(
+    f"{NS}_history_queue_lag_seconds",
+    "Age of the oldest row in a history flush",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 300),
+)
+HISTORY_FLUSH_ROWS = Histogram(
+    f"{NS}_history_flush_rows", "Rows written per history flush", buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500)
+)
+HISTORY_FLUSHES = Counter(f"{NS}_history_flushes_total", "History flushes", ["result"])  # ok | error
+HISTORY_ROWS_DROPPED = Counter(
+    f"{NS}_history_rows_dropped_total", "History rows never written", ["reason"]  # backpressure | quarantined
+)
+
 # Static service info (useful in Grafana filters)
 SERVICE_INFO = Gauge(
     f"{NS}_service_info",
@@ -0,0 +1,234 @@
+# src/app/utils/disk_cache.py
+"""
+Content-addressed blob cache on local disk with an LRU size cap.
+
+Blobs are stored as `<dir>/<key[:2]>/<key><suffix>`; a read refreshes the
+file's mtime, and eviction removes the oldest-mtime files until the total is
+under `max_bytes`. Writes go through a temp file + `os.replace`, so readers
+never see partial blobs and several processes can share one directory.
+
+`checkout(key)` hands out a private path (hard link, or a copy across
+filesystems) that the caller may delete after use without touching the
+cached blob.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import threading
+import uuid
+from typing import Optional
+
+from ..metrics import BLOB_CACHE_BYTES, BLOB_CACHE_BYTES_SAVED, BLOB_CACHE_HIT_RATIO, BLOB_CACHE_REQUESTS
+
+log = logging.getLogger(__name__)
+
+
+class DiskLRU:
+    """
+    Size-capped, content-addressed blob store with hit-ratio metrics.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        directory: str,
+        *,
+        max_bytes: int,
+        suffix: str = "",
+        out_dir: Optional[str] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        name : str
+            Metrics label (e.g., "tts", "image").
+        directory : str
+            Cache root (created if missing).
+        max_bytes : int
+            Total size cap; least recently used blobs are evicted beyond it.
+        suffix : str
+            File extension for stored blobs (e.g., ".mp3").
+        out_dir : Optional[str]
+            Where `checkout()` places caller-owned copies (default: `<dir>/out`).
+        """
+        self.name = name
+        self.dir = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._out = out_dir or os.path.join(directory, "out")
+        os.makedirs(directory, exist_ok=True)
+        os.makedirs(self._out, exist_ok=True)
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._bytes = self._scan_bytes()
+        BLOB_CACHE_BYTES.labels(cache=name).set(self._bytes)
+
+    # ------- paths -------
+
+    def path_for(self, key: str) -> str:
+        """Location of the blob for `key` (it may not exist)."""
+        return os.path.join(self.dir, key[:2], f"{key}{self.suffix}")
+
+    def _blobs(self):
+        for sub in os.scandir(self.dir):
+            if not sub.is_dir() or sub.name == "out":
+                continue
+            for f in os.scandir(sub.path):
+                if f.is_file() and not f.name.endswith(".part"):
+                    yield f
+
+    def _stat_blobs(self):
+        """Yield `(path, mtime, size)` per blob, skipping blobs removed mid-scan."""
+        for f in self._blobs():
+            try:
+                st = f.stat()
+            except FileNotFoundError:
+                continue
+            yield f.path, st.st_mtime, st.st_size
+
+    def _scan_bytes(self) -> int:
+        return sum(size for _, _, size in self._stat_blobs())
+
+    # ------- reads -------
+
+    def contains(self, key: str) -> bool:
+        """True if a blob exists for `key` (no metrics, no recency update)."""
+        return os.path.exists(self.path_for(key))
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached blob path (refreshing its recency) or None.
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            self._record(hit=False)
+            return None
+        self._record(hit=True, saved=size)
+        return path
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Return the cached blob contents or None."""
+        path = self.get(key)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def checkout(self, key: str) -> Optional[str]:
+        """
+        Return a private path to the cached blob that the caller may delete.
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        return self.handout(path)
+
+    def handout(self, path: str) -> str:
+        """Link (or copy) a blob to a fresh path the caller owns."""
+        out = os.path.join(self._out, f"{uuid.uuid4().hex}{self.suffix}")
+        try:
+            os.link(path, out)
+        except OSError:
+            shutil.copyfile(path, out)
+        return out
+
+    # ------- writes -------
+
+    def put_file(self, key: str, src: str) -> str:
+        """
+        Store an existing file under `key` (hard-linked when possible) and
+        return the blob path. `src` is left in place for the caller.
+        """
+        dst = self.path_for(key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        part = f"{dst}.{uuid.uuid4().hex}.part"
+        try:
+            os.link(src, part)
+        except OSError:
+            shutil.copyfile(src, part)
+        return self._commit(part, dst)
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        """Store `data` under `key` and return the blob path."""
+        dst = self.path_for(key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        part = f"{dst}.{uuid.uuid4().hex}.part"
+        with open(part, "wb") as f:
+            f.write(data)
+        return self._commit(part, dst)
+
+    def _commit(self, part: str, dst: str) -> str:
+        size = os.path.getsize(part)
+        existed = os.path.exists(dst)
+        os.replace(part, dst)
+        with self._lock:
+            if not existed:
+                self._bytes += size
+        self.evict()
+        return dst
+
+    # ------- eviction -------
+
+    def evict(self) -> int:
+        """
+        Remove least recently used blobs until under `max_bytes`.
+
+        Returns
+        -------
+        int
+            Number of blobs removed.
+        """
+        with self._lock:
+            if self._bytes <= self.max_bytes:
+                BLOB_CACHE_BYTES.labels(cache=self.name).set(self._bytes)
+                return 0
+            files = sorted(self._stat_blobs(), key=lambda f: f[1])
+            total = sum(size for _, _, size in files)
+            removed = 0
+            for path, _, size in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    total -= size
+                    continue
+                total -= size
+                removed += 1
+            self._bytes = total
+            BLOB_CACHE_BYTES.labels(cache=self.name).set(total)
+        if removed:
+            log.info("%s cache evicted %d blob(s); %d bytes kept.", self.name, removed, total)
+        return removed
+
+    # ------- metrics -------
+
+    @property
+    def hit_ratio(self) -> float:
+        """Hits / lookups since creation (0.0 before the first lookup)."""
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
+
+    @property
+    def size_bytes(self) -> int:
+        """Tracked total size of stored blobs."""
+        return self._bytes
+
+    def _record(self, *, hit: bool, saved: int = 0) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+            ratio = self.hit_ratio
+        BLOB_CACHE_REQUESTS.labels(cache=self.name, result="hit" if hit else "miss").inc()
+        BLOB_CACHE_HIT_RATIO.labels(cache=self.name).set(ratio)
+        if saved:
+            BLOB_CACHE_BYTES_SAVED.labels(cache=self.name).inc(saved)
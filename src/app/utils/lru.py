@@ -0,0 +1,136 @@
+# src/app/utils/lru.py
+"""
+Bounded in-process LRU cache with per-entry TTL and a byte budget.
+
+Used as an L1 in front of Redis/Postgres for hot keys (Q&A answers, chat
+summaries). Entries are evicted least-recently-used first once the estimated
+size exceeds `max_bytes`, and lazily on read once older than `ttl_seconds`.
+`None` is a valid cached value (e.g., "this chat has no summary yet").
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from ..metrics import L1_CACHE_BYTES, L1_CACHE_HIT_RATIO, L1_CACHE_REQUESTS
+
+MISSING = object()
+
+
+def _sizeof(key: Hashable, value: Any) -> int:
+    """Rough memory estimate of one entry."""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class LRUTTLCache:
+    """
+    Thread-safe LRU + TTL cache reporting hit ratio and size per `name`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        name : str
+            Metrics label (e.g., "summary", "qa").
+        max_bytes : int
+            Approximate memory budget for keys + values.
+        ttl_seconds : float
+            Entry lifetime; 0 disables expiry.
+        clock : Callable[[], float]
+            Time source (monotonic by default; injectable for tests).
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    # ------- API -------
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        Return the cached value or `default` (the `MISSING` sentinel).
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self.ttl and self._clock() - item[1] > self.ttl:
+                self._drop(key)
+                item = None
+            if item is None:
+                self._misses += 1
+                self._record("miss")
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            self._record("hit")
+            return item[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or replace a value, evicting LRU entries over budget."""
+        size = _sizeof(key, value)
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._data[key] = (value, self._clock(), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+            L1_CACHE_BYTES.labels(cache=self.name).set(self._bytes)
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key; returns True if it was present."""
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._drop(key)
+            L1_CACHE_BYTES.labels(cache=self.name).set(self._bytes)
+            return True
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            L1_CACHE_BYTES.labels(cache=self.name).set(0)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Hits / lookups since creation (0.0 before the first lookup)."""
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        """Current estimated size of all entries."""
+        return self._bytes
+
+    # ------- internals (lock held) -------
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _record(self, result: str) -> None:
+        L1_CACHE_REQUESTS.labels(cache=self.name, result=result).inc()
+        L1_CACHE_HIT_RATIO.labels(cache=self.name).set(self.hit_ratio)
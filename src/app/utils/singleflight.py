@@ -0,0 +1,81 @@
+# src/app/utils/singleflight.py
+"""
+Single-flight call coalescing.
+
+`SingleFlight.do(key, fn)` runs `fn` once per key at a time: the first caller
+(the leader) executes it, concurrent callers with the same key block on the
+leader's result instead of repeating the work. Used to stop a burst of
+identical questions from each calling the LLM before the Q&A cache is filled.
+
+Waiters fall back to running `fn` themselves if the leader fails or does not
+finish within `timeout` seconds, so a slow or broken leader never turns into
+an error for everyone else.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Thread-safe, in-process call coalescing keyed by any hashable.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T], timeout: Optional[float] = None) -> Tuple[T, str]:
+        """
+        Run `fn` for `key`, or wait for the in-flight call with the same key.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identity of the work (e.g., the Q&A cache key).
+        fn : Callable[[], T]
+            The work to run.
+        timeout : Optional[float]
+            Seconds a waiter blocks on the leader before running `fn` itself.
+
+        Returns
+        -------
+        Tuple[T, str]
+            The result and how it was obtained: "leader", "shared",
+            "timeout" or "leader_error".
+        """
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+
+        if not leader:
+            try:
+                return fut.result(timeout), "shared"
+            except FutureTimeout:
+                return fn(), "timeout"
+            except Exception:
+                return fn(), "leader_error"
+
+        try:
+            val = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(val)
+            return val, "leader"
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def inflight(self) -> int:
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,119 @@
+# src/app/utils/tokens.py
+"""
+Token counting for prompt budgets.
+
+Counts come from a local `tiktoken` encoding matched to the model, loaded
+once per model and cached (`warm_encoding()` loads it at startup, off the
+first reply). The count of each distinct text is memoized too, since the
+system prompt and window messages repeat on every turn; the memo is keyed
+by a digest of the text, so long pasted messages are not kept alive as
+keys. When no encoding is available (tiktoken missing, or its BPE files
+cannot be loaded offline) a ~4-characters-per-token estimate is used
+instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Tuple
+
+from ..config.settings import settings
+
+log = logging.getLogger(__name__)
+
+# role/formatting tokens the chat format adds around each message
+MESSAGE_OVERHEAD = 4
+_FALLBACK_ENCODING = "o200k_base"
+_COUNT_MEMO_SIZE = 8192
+
+
+@lru_cache(maxsize=16)
+def get_encoding(model: Optional[str] = None):
+    """
+    Return the cached tiktoken encoding for `model` (None → estimate only).
+    """
+    if settings.tokenizer != "tiktoken":
+        return None
+    try:
+        import tiktoken
+    except ImportError:  # pragma: no cover
+        log.info("tiktoken is not installed; estimating token counts.")
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model or settings.openai_model)
+        except KeyError:
+            return tiktoken.get_encoding(_FALLBACK_ENCODING)
+    except Exception as e:  # BPE file not cached and no network
+        log.warning("Could not load a tiktoken encoding (%s); estimating token counts.", e)
+        return None
+
+
+def warm_encoding(model: Optional[str] = None) -> None:
+    """Load (and, on first use, download) the encoding now instead of on a reply path."""
+    enc = get_encoding(model)
+    if enc is not None:
+        log.info("Token encoding %s ready.", enc.name)
+
+
+class _CountMemo:
+    """LRU of token counts keyed by `(text digest, model)`."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._counts: "OrderedDict[Tuple[bytes, Optional[str]], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str, model: Optional[str]) -> int:
+        key = (hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(), model)
+        with self._lock:
+            n = self._counts.get(key)
+            if n is not None:
+                self._counts.move_to_end(key)
+                return n
+        enc = get_encoding(model)
+        n = (len(text) + 3) // 4 if enc is None else len(enc.encode(text, disallowed_special=()))
+        with self._lock:
+            self._counts[key] = n
+            if len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+        return n
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+_count = _CountMemo(_COUNT_MEMO_SIZE)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Number of tokens in `text` for `model` (default: settings.openai_model)."""
+    return _count(text, model)
+
+
+def message_tokens(msg: Any, model: Optional[str] = None) -> int:
+    """Tokens one chat message costs (content + overhead)."""
+    return count_tokens(str(getattr(msg, "content", msg)), model) + MESSAGE_OVERHEAD
+
+
+def fit_oldest(messages: Sequence[Any], budget: int, model: Optional[str] = None) -> List[Any]:
+    """
+    Return the oldest prefix of `messages` whose size fits `budget`.
+
+    Always holds at least the first message (when there is one), so a
+    caller consuming messages in order makes progress.
+    """
+    kept: List[Any] = []
+    used = 0
+    for m in messages:
+        cost = message_tokens(m, model)
+        if kept and used + cost > budget:
+            break
+        kept.append(m)
+        used += cost
+    return kept
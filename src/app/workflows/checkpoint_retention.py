@@ -0,0 +1,295 @@
+"""
+Retention and compaction for the SQLite LangGraph checkpointer.
+
+`SqliteSaver` keeps every checkpoint of every thread forever. This module
+bounds that growth:
+
+1) history -> keep only the newest `keep_last` checkpoints per thread
+2) idle    -> delete threads whose latest checkpoint is older than a TTL
+3) compact -> truncate the WAL and VACUUM once enough pages are free
+
+It can be driven by the `karan-bot-checkpoints` CLI or by the in-process
+`RetentionScheduler` started from the Telegram entrypoint. Size and row-count
+gauges are refreshed after every run.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from ..config.settings import settings
+from ..metrics import CHECKPOINT_DB_BYTES, CHECKPOINT_ROWS, CHECKPOINTS_PRUNED
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionReport:
+    """Outcome of a single retention run."""
+    checkpoints_pruned: int = 0
+    threads_expired: int = 0
+    vacuumed: bool = False
+    db_bytes: int = 0
+    checkpoint_rows: int = 0
+    write_rows: int = 0
+
+
+class CheckpointRetention:
+    """
+    Prune and compact the checkpoint tables of a `SqliteSaver`.
+
+    All statements run under the saver's own lock, so maintenance is safe to
+    run from a background thread while the graph keeps writing.
+    """
+
+    def __init__(
+        self,
+        saver: SqliteSaver,
+        *,
+        keep_last: Optional[int] = None,
+        idle_ttl_seconds: Optional[int] = None,
+        vacuum_min_free_ratio: Optional[float] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        saver : SqliteSaver
+            The checkpointer whose connection should be maintained.
+        keep_last : Optional[int]
+            Checkpoints to keep per thread (default: settings).
+        idle_ttl_seconds : Optional[int]
+            Delete threads idle for longer than this; 0 disables (default: settings).
+        vacuum_min_free_ratio : Optional[float]
+            VACUUM when free pages / total pages reaches this ratio (default: settings).
+        """
+        self.saver = saver
+        self.keep_last = max(1, keep_last if keep_last is not None else settings.checkpoint_keep_last)
+        self.idle_ttl = (
+            idle_ttl_seconds if idle_ttl_seconds is not None else settings.checkpoint_idle_ttl_seconds
+        )
+        self.vacuum_min_free_ratio = (
+            vacuum_min_free_ratio
+            if vacuum_min_free_ratio is not None
+            else settings.checkpoint_vacuum_min_free_ratio
+        )
+
+    # ------- pruning -------
+
+    def prune_history(self) -> int:
+        """
+        Delete all but the newest `keep_last` checkpoints of every thread.
+
+        Checkpoint ids are time-ordered, so ordering by id is ordering by age.
+
+        Returns
+        -------
+        int
+            Number of checkpoints deleted.
+        """
+        with self.saver.lock:
+            self.saver.setup()
+            conn = self.saver.conn
+            cur = conn.execute(
+                """
+                DELETE FROM checkpoints WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                            PARTITION BY thread_id, checkpoint_ns
+                            ORDER BY checkpoint_id DESC
+                        ) AS rn
+                        FROM checkpoints
+                    ) WHERE rn > ?
+                )
+                """,
+                (self.keep_last,),
+            )
+            n = cur.rowcount
+            self._delete_orphan_writes(conn)
+            conn.commit()
+        if n:
+            CHECKPOINTS_PRUNED.labels(reason="history").inc(n)
+        return n
+
+    def prune_idle(self, now: Optional[float] = None) -> int:
+        """
+        Delete every thread whose latest checkpoint is older than the TTL.
+
+        Parameters
+        ----------
+        now : Optional[float]
+            Reference UNIX time (default: current time; handy for tests).
+
+        Returns
+        -------
+        int
+            Number of threads deleted.
+        """
+        if not self.idle_ttl or self.idle_ttl <= 0:
+            return 0
+        cutoff = (now if now is not None else time.time()) - self.idle_ttl
+
+        with self.saver.lock:
+            self.saver.setup()
+            conn = self.saver.conn
+            rows = conn.execute(
+                """
+                SELECT c.thread_id, c.type, c.checkpoint FROM checkpoints c
+                WHERE c.checkpoint_ns = '' AND c.checkpoint_id = (
+                    SELECT MAX(checkpoint_id) FROM checkpoints
+                    WHERE thread_id = c.thread_id AND checkpoint_ns = ''
+                )
+                """
+            ).fetchall()
+
+            expired = [tid for tid, typ, blob in rows if self._last_seen(typ, blob) < cutoff]
+            for tid in expired:
+                conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (tid,))
+                conn.execute("DELETE FROM writes WHERE thread_id = ?", (tid,))
+            conn.commit()
+
+        if expired:
+            CHECKPOINTS_PRUNED.labels(reason="idle").inc(len(expired))
+        return len(expired)
+
+    def _last_seen(self, typ: str, blob: bytes) -> float:
+        """Return the UNIX timestamp stored in a serialized checkpoint."""
+        try:
+            ts = self.saver.serde.loads_typed((typ, blob)).get("ts")
+            dt = datetime.fromisoformat(ts)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.timestamp()
+        except Exception:  # pragma: no cover (unreadable row → never expire)
+            return float("inf")
+
+    @staticmethod
+    def _delete_orphan_writes(conn) -> None:
+        """Drop pending writes whose checkpoint no longer exists."""
+        conn.execute(
+            """
+            DELETE FROM writes WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = writes.thread_id
+                  AND c.checkpoint_ns = writes.checkpoint_ns
+                  AND c.checkpoint_id = writes.checkpoint_id
+            )
+            """
+        )
+
+    # ------- compaction -------
+
+    def compact(self, force_vacuum: bool = False) -> bool:
+        """
+        Checkpoint/truncate the WAL and VACUUM if enough pages are free.
+
+        Returns
+        -------
+        bool
+            True if VACUUM ran.
+        """
+        with self.saver.lock:
+            self.saver.setup()
+            conn = self.saver.conn
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0] or 0
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0] or 0
+            ratio = free / page_count if page_count else 0.0
+            if not (force_vacuum or (free and ratio >= self.vacuum_min_free_ratio)):
+                return False
+            conn.commit()
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        log.info("Checkpoint DB vacuumed (free ratio was %.2f).", ratio)
+        return True
+
+    # ------- gauges -------
+
+    def refresh_gauges(self) -> RetentionReport:
+        """
+        Update size and row-count gauges and return the current numbers.
+        """
+        with self.saver.lock:
+            self.saver.setup()
+            conn = self.saver.conn
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0] or 0
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0] or 0
+            cp_rows = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            wr_rows = conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+
+        db_bytes = page_count * page_size
+        CHECKPOINT_DB_BYTES.set(db_bytes)
+        CHECKPOINT_ROWS.labels(table="checkpoints").set(cp_rows)
+        CHECKPOINT_ROWS.labels(table="writes").set(wr_rows)
+        return RetentionReport(db_bytes=db_bytes, checkpoint_rows=cp_rows, write_rows=wr_rows)
+
+    def run_once(self, force_vacuum: bool = False) -> RetentionReport:
+        """
+        Run a full maintenance pass: idle threads, history, compaction, gauges.
+        """
+        expired = self.prune_idle()
+        pruned = self.prune_history()
+        vacuumed = self.compact(force_vacuum=force_vacuum)
+        report = self.refresh_gauges()
+        report.threads_expired = expired
+        report.checkpoints_pruned = pruned
+        report.vacuumed = vacuumed
+        log.info(
+            "Checkpoint retention: pruned=%d expired_threads=%d vacuumed=%s bytes=%d rows=%d",
+            pruned, expired, vacuumed, report.db_bytes, report.checkpoint_rows,
+        )
+        return report
+
+
+class RetentionScheduler:
+    """
+    Daemon thread that runs `CheckpointRetention.run_once()` periodically.
+    """
+
+    def __init__(self, retention: CheckpointRetention, interval_seconds: float) -> None:
+        self.retention = retention
+        self.interval = interval_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop, name="checkpoint-retention", daemon=True
+        )
+
+    def start(self) -> "RetentionScheduler":
+        """Start the background loop (returns self for chaining)."""
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Signal the loop to exit and wait for it."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.retention.run_once()
+            except Exception as e:  # pragma: no cover (keep the scheduler alive)
+                log.warning("Checkpoint retention run failed: %s", e)
+
+
+def start_retention_scheduler(saver, interval_seconds: Optional[float] = None) -> Optional[RetentionScheduler]:
+    """
+    Start periodic retention for a SQLite checkpointer, if enabled.
+
+    Returns None for non-SQLite checkpointers or when the interval is 0.
+    """
+    interval = (
+        interval_seconds
+        if interval_seconds is not None
+        else settings.checkpoint_maintenance_interval_seconds
+    )
+    if not isinstance(saver, SqliteSaver) or not interval or interval <= 0:
+        return None
+    log.info("Checkpoint retention scheduled every %ss.", interval)
+    return RetentionScheduler(CheckpointRetention(saver), interval).start()
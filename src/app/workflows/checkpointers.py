@@ -0,0 +1,154 @@
+"""
+Checkpointer backends for the Karan graph.
+
+Selected with `settings.checkpointer_backend`:
+
+- "sqlite"         -> SqliteSaver on a local file (single replica; default)
+- "postgres"       -> PostgresSaver borrowing connections from the `db.py` engine pool
+- "postgres_async" -> AsyncPostgresSaver on an async psycopg pool; the graph must
+                      be driven with `ainvoke` and the saver opened inside the
+                      running event loop (see `open_async_checkpointer`)
+
+Postgres backends let several bot replicas share graph state and stop funnelling
+every checkpoint write through one SQLite file lock.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from ..config.settings import settings
+
+log = logging.getLogger(__name__)
+
+
+def _sqlite_saver(db_url: str) -> SqliteSaver:
+    """Open the SQLite file (or `file:` URI) used for checkpoints."""
+    use_uri = db_url.startswith("file:")
+    conn = sqlite3.connect(db_url, check_same_thread=False, uri=use_uri)
+    return SqliteSaver(conn)
+
+
+def _postgres_saver(engine=None):
+    """Build a PostgresSaver on top of the shared SQLAlchemy engine pool."""
+    from langgraph.checkpoint.postgres import PostgresSaver
+    from psycopg.rows import dict_row
+
+    if engine is None:
+        from ..db import engine
+
+    class EnginePostgresSaver(PostgresSaver):
+        """
+        PostgresSaver that checks a connection out of the SQLAlchemy pool per
+        operation instead of holding one connection behind a lock.
+        """
+
+        def __init__(self, engine) -> None:
+            super().__init__(conn=None)
+            self._engine = engine
+
+        @contextmanager
+        def _cursor(self, *, pipeline: bool = False) -> Iterator[Any]:
+            raw = self._engine.raw_connection()
+            try:
+                conn = raw.driver_connection
+                # The saver expects autocommit connections; restore the pool's
+                # default before the connection goes back.
+                conn.autocommit = True
+                try:
+                    if pipeline:
+                        scope = conn.pipeline() if self.supports_pipeline else conn.transaction()
+                        with scope, conn.cursor(binary=True, row_factory=dict_row) as cur:
+                            yield cur
+                    else:
+                        with conn.cursor(binary=True, row_factory=dict_row) as cur:
+                            yield cur
+                finally:
+                    conn.autocommit = False
+            finally:
+                raw.close()
+
+    saver = EnginePostgresSaver(engine)
+    saver.setup()
+    return saver
+
+
+def build_checkpointer(backend: Optional[str] = None, *, db_url: str = "short_term_memory.db"):
+    """
+    Build a synchronous checkpointer for `backend` (default: settings).
+
+    Parameters
+    ----------
+    backend : Optional[str]
+        "sqlite" or "postgres". The async backend cannot be built here; use
+        `open_async_checkpointer()` from inside the event loop.
+    db_url : str
+        SQLite path or `file:` URI (sqlite backend only).
+
+    Raises
+    ------
+    ValueError
+        For unknown or async-only backends.
+    """
+    backend = backend or settings.checkpointer_backend
+    if backend == "sqlite":
+        return _sqlite_saver(db_url)
+    if backend == "postgres":
+        return _postgres_saver()
+    if backend == "postgres_async":
+        raise ValueError("postgres_async must be opened with open_async_checkpointer() inside the event loop")
+    raise ValueError(f"Unknown checkpointer backend: {backend!r}")
+
+
+async def open_async_checkpointer(conninfo: Optional[str] = None):
+    """
+    Open an AsyncPostgresSaver backed by an async psycopg connection pool.
+
+    Must be awaited inside the running event loop (e.g., PTB `post_init`).
+    Close it with `close_async_checkpointer()`.
+    """
+    from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+    from sqlalchemy.engine import make_url
+
+    if conninfo is None:
+        # SQLAlchemy URL -> libpq URL (drop the "+psycopg" driver suffix)
+        conninfo = make_url(settings.database_url).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+    pool = AsyncConnectionPool(
+        conninfo,
+        min_size=settings.checkpointer_pool_min_size,
+        max_size=settings.checkpointer_pool_max_size,
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        open=False,
+    )
+    await pool.open()
+    saver = AsyncPostgresSaver(pool)
+    await saver.setup()
+    log.info("Async Postgres checkpointer ready (pool max=%s).", settings.checkpointer_pool_max_size)
+    return saver
+
+
+async def close_async_checkpointer(saver) -> None:
+    """Close the connection pool behind an async checkpointer."""
+    pool = getattr(saver, "conn", None)
+    if pool is not None and hasattr(pool, "close"):
+        await pool.close()
+
+
+def is_async_checkpointer(saver) -> bool:
+    """
+    Return True for checkpointers that must be driven with `graph.ainvoke`.
+    """
+    try:
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+    except ImportError:  # pragma: no cover (optional dependency)
+        return False
+    return isinstance(saver, AsyncPostgresSaver)
@@ -0,0 +1,96 @@
+# src/app/workflows/context_budget.py
+"""
+Token-budgeted prompt assembly.
+
+The prompt is `[system prompt, (summary)?, *history turns, new message]`.
+Leading system messages and the new message are always kept; history turns
+are dropped oldest-first until the whole prompt fits the model's input
+budget. If the new message alone would still not fit (a huge paste), its
+text is clipped from the front so the end of it survives.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from ..config.settings import settings
+from ..metrics import CONTEXT_BUILD_SECONDS, PROMPT_TOKENS, PROMPT_TRIMMED_MESSAGES, observe
+from ..utils.tokens import count_tokens, message_tokens
+
+
+def budget_for(model: Optional[str] = None) -> int:
+    """Input-token budget for `model` (per-model override or the default)."""
+    model = model or settings.openai_model
+    return settings.context_max_input_tokens_by_model.get(model, settings.context_max_input_tokens)
+
+
+def fit_prompt(
+    messages: Sequence[BaseMessage],
+    *,
+    model: Optional[str] = None,
+    budget: Optional[int] = None,
+) -> Tuple[List[BaseMessage], int]:
+    """
+    Trim a chat prompt to the input budget, oldest history turns first.
+
+    Parameters
+    ----------
+    messages : Sequence[BaseMessage]
+        Full prompt in order; leading `SystemMessage`s are pinned, the last
+        message is the new user turn.
+    model : Optional[str]
+        Model whose tokenizer and budget apply (default: settings.openai_model).
+    budget : Optional[int]
+        Override the budget (default: `budget_for(model)`).
+
+    Returns
+    -------
+    (list[BaseMessage], int)
+        The prompt to send and its token count.
+    """
+    t0 = time.perf_counter()
+    model = model or settings.openai_model
+    budget = budget if budget is not None else budget_for(model)
+    msgs = list(messages)
+    if not msgs:
+        return [], 0
+
+    n_pinned = 0
+    while n_pinned < len(msgs) - 1 and isinstance(msgs[n_pinned], SystemMessage):
+        n_pinned += 1
+    pinned, history, last = msgs[:n_pinned], msgs[n_pinned:-1], msgs[-1]
+
+    used = sum(message_tokens(m, model) for m in pinned) + message_tokens(last, model)
+    if used > budget:
+        last = _clip(last, budget - (used - message_tokens(last, model)), model)
+        used = sum(message_tokens(m, model) for m in pinned) + message_tokens(last, model)
+
+    kept: List[BaseMessage] = []
+    for m in reversed(history):
+        cost = message_tokens(m, model)
+        if used + cost > budget:
+            break
+        kept.append(m)
+        used += cost
+    kept.reverse()
+
+    dropped = len(history) - len(kept)
+    if dropped:
+        PROMPT_TRIMMED_MESSAGES.labels(model=model).inc(dropped)
+    observe(PROMPT_TOKENS, used, model=model)
+    observe(CONTEXT_BUILD_SECONDS, time.perf_counter() - t0)
+    return pinned + kept + [last], used
+
+
+def _clip(msg: BaseMessage, budget: int, model: str) -> BaseMessage:
+    """Keep the tail of an oversized message within `budget` tokens."""
+    text = str(msg.content)
+    room = max(budget - message_tokens("", model), 0)
+    # shrink proportionally until it fits (a couple of passes at most)
+    while text and count_tokens(text, model) > room:
+        keep = int(len(text) * room / max(count_tokens(text, model), 1) * 0.95)
+        text = text[-keep:] if keep > 0 else ""
+    return msg.model_copy(update={"content": text})
@@ -0,0 +1,263 @@
+# src/app/workflows/ingestion.py
+"""
+Bulk ingestion of the summit knowledge base into the `karan_bio` collection.
+
+Pipeline (one streaming pass over `settings.data_dir`):
+
+1) read    -> text files one at a time (`.md`, `.txt`, ...)
+2) chunk   -> paragraph-packed chunks of ~`ingest_chunk_chars`, long
+              paragraphs split with `ingest_chunk_overlap` characters of overlap
+3) dedupe  -> chunk id = sha256(embedding model + normalized text); a chunk
+              seen earlier in the run, or already in the store, is skipped
+4) embed   -> new chunks only, `ingest_batch_size` texts per API call,
+              `ingest_concurrency` calls in flight, retried with backoff
+5) upsert  -> each embedded batch is written as soon as it returns
+6) prune   -> chunks of this corpus that no file produced any more are deleted
+
+Every chunk is tagged with its `corpus` (the ingested directory) and its
+`source` file. Pruning only ever touches chunks of the corpus being ingested,
+so facts added with `add_texts` or loaded from another directory stay.
+Because ids are content hashes, re-running after a schedule edit embeds only
+the chunks whose text changed; the old versions are pruned.
+
+Driven by the `karan-bot-ingest` CLI.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from ..config.settings import settings
+from ..metrics import INGEST_CHUNKS, INGEST_EMBED_CALLS, inc
+
+log = logging.getLogger(__name__)
+
+TEXT_SUFFIXES = (".md", ".markdown", ".txt", ".rst", ".csv")
+
+
+@dataclass
+class IngestReport:
+    """Outcome of a single ingestion run."""
+    files: int = 0
+    chunks: int = 0           # chunks produced by all files
+    duplicates: int = 0       # repeated within this run
+    unchanged: int = 0        # already in the store
+    embedded: int = 0
+    pruned: int = 0
+    embed_calls: int = 0
+    embed_calls_saved: int = 0  # vs. re-embedding every chunk in full batches
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+# ---------- Read + chunk ----------
+
+def iter_files(data_dir: str, suffixes: Sequence[str] = TEXT_SUFFIXES) -> Iterator[Tuple[str, str]]:
+    """
+    Yield `(relative path, text)` for each text file under `data_dir`, one
+    file at a time, in a stable order.
+    """
+    root = Path(data_dir)
+    for path in sorted(p for p in root.rglob("*") if p.is_file() and p.suffix.lower() in suffixes):
+        try:
+            yield path.relative_to(root).as_posix(), path.read_text(encoding="utf-8", errors="replace")
+        except OSError as e:
+            log.warning("Skipping %s: %s", path, e)
+
+
+def chunk_text(text: str, chunk_chars: Optional[int] = None, overlap: Optional[int] = None) -> List[str]:
+    """
+    Split text into chunks of at most `chunk_chars` characters.
+
+    Paragraphs (blank-line separated) are packed together so a chunk
+    holds whole sections; a paragraph longer than a chunk is cut into
+    overlapping windows.
+    """
+    size = chunk_chars or settings.ingest_chunk_chars
+    overlap = min(overlap if overlap is not None else settings.ingest_chunk_overlap, size // 2)
+    chunks: List[str] = []
+    buf = ""
+    for para in (p.strip() for p in re.split(r"\n\s*\n", text)):
+        if not para:
+            continue
+        if len(para) > size:
+            if buf:
+                chunks.append(buf)
+                buf = ""
+            step = size - overlap
+            chunks.extend(para[i:i + size] for i in range(0, len(para) - overlap, step))
+            continue
+        if buf and len(buf) + 2 + len(para) > size:
+            chunks.append(buf)
+            buf = ""
+        buf = f"{buf}\n\n{para}" if buf else para
+    if buf:
+        chunks.append(buf)
+    return chunks
+
+
+def corpus_name(data_dir: str) -> str:
+    """Corpus tag for chunks ingested from `data_dir` (its resolved path)."""
+    return Path(data_dir).resolve().as_posix()
+
+
+def chunk_id(text: str, model: Optional[str] = None) -> str:
+    """Content id of a chunk; changes when the text or the embedding model does."""
+    norm = " ".join(text.split())
+    return hashlib.sha256(f"{model or settings.openai_embed_model}\0{norm}".encode("utf-8")).hexdigest()
+
+
+# ---------- Ingest ----------
+
+class Ingestor:
+    """
+    Incremental, batched loader from text files into a vector store.
+    """
+
+    def __init__(
+        self,
+        vector,
+        embeddings,
+        *,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        chunk_chars: Optional[int] = None,
+        overlap: Optional[int] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        vector : VSAdapter
+            Store with `ids(where)`, `upsert(ids, texts, vectors, metadatas)` and `delete(ids)`;
+            its `flush()`, if any, is called once at the end of a run.
+        embeddings : Embeddings
+            Used via `embed_documents(texts)`; must match the store's model.
+        batch_size : Optional[int]
+            Texts per embedding call (default: settings.ingest_batch_size).
+        concurrency : Optional[int]
+            Embedding calls in flight (default: settings.ingest_concurrency).
+        chunk_chars, overlap : Optional[int]
+            Chunking parameters (default: settings).
+        """
+        self.vector = vector
+        self.embeddings = embeddings
+        self.batch_size = batch_size or settings.ingest_batch_size
+        self.concurrency = concurrency or settings.ingest_concurrency
+        self.chunk_chars = chunk_chars
+        self.overlap = overlap
+
+    @retry(
+        stop=stop_after_attempt(5),
+        wait=wait_exponential(multiplier=1, min=1, max=30),
+        retry=retry_if_exception_type(Exception),
+        reraise=True,
+    )
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        inc(INGEST_EMBED_CALLS)
+        return self.embeddings.embed_documents(texts)
+
+    def _flush(self, pool: ThreadPoolExecutor, pending: List[Tuple[str, str, dict]], report: IngestReport) -> None:
+        """Embed `pending` in concurrent batches and upsert each batch as it completes."""
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        futures = [pool.submit(self._embed, [text for _, text, _ in b]) for b in batches]
+        for batch, fut in zip(batches, futures):
+            vectors = fut.result()
+            ids, texts, metas = (list(col) for col in zip(*batch))
+            self.vector.upsert(ids, texts, vectors, metas)
+            report.embed_calls += 1
+            report.embedded += len(batch)
+            INGEST_CHUNKS.labels(result="embedded").inc(len(batch))
+        pending.clear()
+
+    def run(
+        self,
+        files: Iterable[Tuple[str, str]],
+        *,
+        corpus: Optional[str] = None,
+        prune: bool = True,
+    ) -> IngestReport:
+        """
+        Ingest `(source, text)` pairs (e.g., from `iter_files`).
+
+        Parameters
+        ----------
+        files : Iterable[Tuple[str, str]]
+            Documents to load; consumed lazily.
+        corpus : Optional[str]
+            Name of the document set (e.g., `corpus_name(data_dir)`), stored in
+            each chunk's metadata. Pruning needs it: only chunks of this
+            corpus are ever deleted.
+        prune : bool
+            Delete chunks of `corpus` no document produced (a full sync of
+            that corpus). Turn off when ingesting a subset of it; a no-op
+            without a `corpus`.
+
+        Returns
+        -------
+        IngestReport
+        """
+        t0 = time.perf_counter()
+        report = IngestReport()
+        existing: Set[str] = set(self.vector.ids())
+        seen: Set[str] = set()
+        pending: List[Tuple[str, str, dict]] = []
+        window = self.batch_size * self.concurrency
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ingest") as pool:
+                for source, text in files:
+                    report.files += 1
+                    for i, chunk in enumerate(chunk_text(text, self.chunk_chars, self.overlap)):
+                        report.chunks += 1
+                        cid = chunk_id(chunk)
+                        if cid in seen:
+                            report.duplicates += 1
+                            inc(INGEST_CHUNKS, result="duplicate")
+                            continue
+                        seen.add(cid)
+                        if cid in existing:
+                            report.unchanged += 1
+                            inc(INGEST_CHUNKS, result="unchanged")
+                            continue
+                        meta = {"source": source, "chunk": i}
+                        if corpus:
+                            meta["corpus"] = corpus
+                        pending.append((cid, chunk, meta))
+                        if len(pending) >= window:
+                            self._flush(pool, pending, report)
+                if pending:
+                    self._flush(pool, pending, report)
+
+            if prune and corpus:
+                stale = sorted(set(self.vector.ids({"corpus": corpus})) - seen)
+                if stale:
+                    self.vector.delete(stale)
+                    report.pruned = len(stale)
+                    INGEST_CHUNKS.labels(result="pruned").inc(len(stale))
+        finally:
+            flush = getattr(self.vector, "flush", None)     # e.g., the BM25 file of a hybrid store
+            if flush:
+                flush()
+
+        report.embed_calls_saved = max(math.ceil(report.chunks / self.batch_size) - report.embed_calls, 0)
+        report.seconds = time.perf_counter() - t0
+        log.info(
+            "Ingested %d files: %d chunks (%d embedded, %d unchanged, %d duplicate, %d pruned) "
+            "in %.2fs, %.1f chunks/s, %d embedding calls saved.",
+            report.files, report.chunks, report.embedded, report.unchanged, report.duplicates,
+            report.pruned, report.seconds, report.chunks_per_sec, report.embed_calls_saved,
+        )
+        return report
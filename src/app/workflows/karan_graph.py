@@ -3,12 +3,23 @@
 Karan bot LangGraph workflow.
 
 Pipeline:
-1) router  -> decide response_type ("text" | "audio" | "image")
-2) text    -> build prompt + (optional) Redis Q&A cache; invoke LLM
-3) final   -> materialize audio/image if requested
+1) router  -> decide response_type ("text" | "audio" | "image"), look up the
+              exact Q&A cache, and decide whether the question needs Karan's
+              facts (never on an exact hit)
+2) retrieve -> (only when flagged) top-k `karan_bio` snippets, cached and
+              time-boxed; see `adapters/retrieval.py`
+3) text    -> answer an exact hit as-is, else build prompt + (optional)
+              semantic Q&A cache;
+              invoke LLM (or stream it as `{"delta": ...}` custom events when the
+              caller sets `configurable.stream_text`)
+4) final   -> materialize audio/image if requested
 
 Checkpoints:
-- Uses SQLite checkpointer for graph state; separate from Redis/Postgres.
+- Uses a pluggable checkpointer for graph state (SQLite by default, Postgres
+  for multi-replica deployments; see `checkpointers.py`).
+- Callers send only the new turn in `messages`; prior context arrives in
+  `history` (Redis window mode) or is read from the checkpoint itself
+  (checkpoint mode). `final` prunes old messages so the checkpoint stays flat.
 """
 
 from __future__ import annotations
@@ -16,15 +27,20 @@ from __future__ import annotations
 import logging
 import os
 import random
-import sqlite3
-from typing import Optional
+import re
+from typing import Any, Optional
 
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langgraph.checkpoint.sqlite import SqliteSaver
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, START, MessagesState, StateGraph
 
 from ..config.settings import settings
-from ..constants import SYSTEM_PROMPT
+from ..constants import IMAGE_PROMPT, SYSTEM_PROMPT
+from ..metrics import QA_SINGLEFLIGHT, inc
+from ..utils.singleflight import SingleFlight
+from .checkpointers import build_checkpointer, is_async_checkpointer
+from .context_budget import fit_prompt
 
 log = logging.getLogger(__name__)
 
@@ -32,19 +48,55 @@ log = logging.getLogger(__name__)
 class KaranState(MessagesState):
     """
     LangGraph state with optional materialized outputs.
+
+    `history` is per-turn input (summary + recent window) that is prepended to
+    the prompt but never appended to `messages`.
     """
+    history: Optional[list] = None
     response_type: Optional[str] = None
-    audio_buffer: Optional[bytes] = None
+    audio_buffer: Optional[bytes] = None   # only for TTS callables without `to_file`
+    audio_path: Optional[str] = None       # temp file; the sender deletes it
     image_path: Optional[str] = None
+    needs_retrieval: Optional[bool] = None
+    retrieved: Optional[list] = None       # fact snippets; None = not retrieved this turn
+    cached: Optional[str] = None           # exact Q&A cache hit found by the router
 
 
 # ---------- Router ----------
 
+# Topics answered from Karan's notes (bio, work, the summit).
+_FACT_TOPICS = re.compile(
+    r"\b(karan|summit|datahack|keynote|talk|session|speaker|workshop|agenda|schedule|"
+    r"job|work|company|role|team|project|experience|background|stud(y|ied)|college|"
+    r"university|degree|hobby|hobbies|hometown)\b"
+)
+# Personal questions ("where are you from?", "tell me about yourself").
+_ABOUT_YOU = re.compile(r"\byou(r|rs|rself)?\b")
+_QUESTION = re.compile(r"\b(what|where|who|which|when|why|tell me|how long|how many)\b")
+
+
+def _needs_retrieval(text: str) -> bool:
+    """
+    True if answering `text` should draw on Karan's facts.
+
+    Small talk ("how are you?", "thanks!") skips the vector search.
+    """
+    if _FACT_TOPICS.search(text):
+        return True
+    return bool(_ABOUT_YOU.search(text) and _QUESTION.search(text))
+
+
 def _router_node(container):
     """
-    Heuristic router that sets response_type based on user text.
+    Heuristic router that sets response_type based on user text, checks the
+    exact-match Q&A cache, and sets needs_retrieval when a retriever is
+    configured, the question asks about Karan and the cache has no answer.
     """
+    retriever = getattr(container, "retriever", None)
+
     def _fn(state: KaranState):
+        # An exact hit is answered as-is, so it never waits on the vector search.
+        cached = container.short_mem.qa_get(**_qa_key(_prompt_messages(state)))
         msgs = state.get("messages", [])
         last = msgs[-1] if msgs else None
         text = (getattr(last, "content", "") or "").lower()
@@ -57,10 +109,39 @@ def _router_node(container):
             # Mostly text; randomly return audio sometimes to add variety.
             rt = "audio" if random.random() > 0.9 else "text"
 
-        return {"response_type": rt}
+        needs = retriever is not None and not cached and rt != "image" and _needs_retrieval(text)
+        return {"response_type": rt, "needs_retrieval": needs, "retrieved": None, "cached": cached}
     return _fn
 
 
+def _route_after_router(state: KaranState) -> str:
+    """Conditional edge: retrieve facts first, or go straight to the LLM."""
+    return "retrieve" if state.get("needs_retrieval") else "text"
+
+
+# ---------- Retrieve node ----------
+
+def _retrieve_node(container):
+    """
+    Look up fact snippets for the last user message (cached; gives up after
+    `retrieval_timeout_seconds` and leaves `retrieved` as None).
+    """
+    retriever = getattr(container, "retriever", None)
+
+    def _fn(state: KaranState):
+        query = _extract_last_user_text(state.get("messages", []))
+        return {"retrieved": retriever.retrieve(query) if retriever is not None else None}
+    return _fn
+
+
+def _facts_message(snippets) -> Optional[SystemMessage]:
+    """Render retrieved snippets as a system message (None if empty)."""
+    if not snippets:
+        return None
+    facts = "\n".join(f"- {s}" for s in snippets)
+    return SystemMessage(content=f"Facts about Karan (use them if relevant):\n{facts}")
+
+
 # ---------- Helpers for cache key composition ----------
 
 def _extract_last_user_text(msgs) -> str:
@@ -83,66 +164,176 @@ def _maybe_get_system_summary(msgs) -> Optional[str]:
     return None
 
 
+def _qa_key(msgs) -> dict:
+    """
+    Keyword arguments for `qa_get`/`qa_set` for the prompt messages `msgs`.
+
+    The persisted summary is optionally part of the key, to avoid
+    cross-context leakage when chats diverge significantly.
+    """
+    system_for_key = SYSTEM_PROMPT if settings.qa_cache_include_system_prompt else None
+    summary_line = _maybe_get_system_summary(msgs)
+    if summary_line and settings.qa_cache_include_system_prompt:
+        system_for_key = f"{SYSTEM_PROMPT}\n{summary_line}"
+    return {
+        "model": settings.openai_model,
+        "system_prompt": system_for_key,
+        "last_user_text": _extract_last_user_text(msgs),
+    }
+
+
+# ---------- Context assembly ----------
+
+def _checkpoint_keep() -> int:
+    """
+    Number of trailing checkpoint messages that belong in the prompt.
+
+    In "window" mode history comes from `state["history"]`, so only the new
+    turn is read from the checkpoint; in "checkpoint" mode the checkpoint is
+    the history, bounded by the window size.
+    """
+    return 1 if settings.context_mode == "window" else settings.window_size
+
+
+def _prompt_messages(state: KaranState) -> list:
+    """
+    Return the conversation part of the prompt: history + recent messages.
+    """
+    msgs = state.get("messages", [])
+    return list(state.get("history") or []) + list(msgs[-_checkpoint_keep():])
+
+
+def _stale_messages(msgs) -> list:
+    """
+    Return RemoveMessage markers for messages the checkpoint no longer needs.
+    """
+    keep = 2 if settings.context_mode == "window" else settings.window_size
+    return [RemoveMessage(id=m.id) for m in msgs[:-keep] if getattr(m, "id", None)]
+
+
 # ---------- Text node (LLM + Q&A cache) ----------
 
+def _call_llm(llm, convo: list, stream: bool) -> AIMessage:
+    """
+    Invoke the LLM, or stream it and forward each text delta to the graph's
+    custom stream (`graph.stream(..., stream_mode="custom")`).
+    """
+    if not (stream and hasattr(llm, "stream")):
+        ai = llm.invoke(convo)
+        return ai if isinstance(ai, AIMessage) else AIMessage(content=str(ai))
+
+    writer = get_stream_writer()
+    parts: list = []
+    for chunk in llm.stream(convo):
+        delta = getattr(chunk, "content", "")
+        if isinstance(delta, str) and delta:
+            parts.append(delta)
+            writer({"delta": delta})
+    return AIMessage(content="".join(parts))
+
+
 def _text_node(container):
     """
-    Build prompt, attempt a Redis Q&A cache read, otherwise call LLM and cache.
+    Return the router's exact Q&A cache hit, else build the prompt, try the
+    semantic Q&A cache, otherwise call the LLM and fill both caches.
+
+    Concurrent misses for the same cache key are coalesced: one caller runs
+    the LLM, the others wait (up to `qa_singleflight_timeout_seconds`) and
+    reuse its answer. Degraded turns (facts needed but not retrieved) are
+    never coalesced, since their answers are not cached either.
     """
-    def _fn(state: KaranState):
-        msgs = state.get("messages", [])
+    semantic = getattr(container, "semantic_cache", None)
+    flight = SingleFlight()
+
+    def _fn(state: KaranState, config: RunnableConfig):
+        msgs = _prompt_messages(state)
         sys = SystemMessage(content=SYSTEM_PROMPT)
-        convo = [sys] + msgs
-
-        # ---- Q&A cache (global exact-match) ----
-        last_user = _extract_last_user_text(msgs)
-        system_for_key = SYSTEM_PROMPT if settings.qa_cache_include_system_prompt else None
-
-        # Optionally include the persisted summary in the cache key to avoid
-        # cross-context leakage when chats diverge significantly.
-        summary_line = _maybe_get_system_summary(msgs)
-        if summary_line and settings.qa_cache_include_system_prompt:
-            system_for_key = f"{SYSTEM_PROMPT}\n{summary_line}"
-
-        cached = container.short_mem.qa_get(
-            model=settings.openai_model,
-            system_prompt=system_for_key,
-            last_user_text=last_user,
+        # Partial output only makes sense for replies delivered as text.
+        stream = bool((config.get("configurable") or {}).get("stream_text")) and (
+            (state.get("response_type") or "text") == "text"
         )
+        facts = _facts_message(state.get("retrieved"))
+        # Oldest history turns are dropped first to fit the model's input budget;
+        # system messages (prompt, facts) are always kept.
+        convo, _ = fit_prompt([sys] + ([facts] if facts else []) + msgs, model=settings.openai_model)
+        # Facts were needed but the search timed out/failed: answer, but don't
+        # cache a reply written without them.
+        degraded = bool(state.get("needs_retrieval")) and state.get("retrieved") is None
+
+        # ---- Q&A cache (global exact-match, looked up by the router) ----
+        qa_key = _qa_key(msgs)
+        last_user, system_for_key = qa_key["last_user_text"], qa_key["system_prompt"]
+        cached = state.get("cached")
         if cached:
             ai = AIMessage(content=cached)
             return {"messages": [ai]}
 
-        # ---- No cache hit → call LLM ----
-        ai = container.llm.invoke(convo)
-        if not isinstance(ai, AIMessage):
-            ai = AIMessage(content=str(ai))
-
-        # ---- Store in cache ----
-        container.short_mem.qa_set(
-            model=settings.openai_model,
-            system_prompt=system_for_key,
-            last_user_text=last_user,
-            answer=ai.content or "",
-        )
+        def _answer() -> AIMessage:
+            # ---- Semantic cache (paraphrases of cached questions) ----
+            scope = f"{settings.openai_model}\n{system_for_key or ''}"
+            hit = semantic.lookup(last_user, scope=scope) if semantic is not None else None
+            if hit is not None and hit.answer:
+                # Promote to the exact-match tier so a repeat skips the embedding call.
+                container.short_mem.qa_set(**qa_key, answer=hit.answer)
+                return AIMessage(content=hit.answer)
+
+            # ---- No cache hit → call LLM ----
+            ai = _call_llm(container.llm, convo, stream)
+
+            # ---- Store in cache ----
+            if degraded:
+                return ai
+            container.short_mem.qa_set(**qa_key, answer=ai.content or "")
+            if semantic is not None:
+                semantic.store(last_user, ai.content or "", scope=scope,
+                               vector=hit.vector if hit is not None else None)
+            return ai
+
+        # ---- Single-flight: only answers the cache would share are coalesced ----
+        # (a degraded answer is never cached, so it is never shared either)
+        if degraded or not _coalescible(last_user):
+            return {"messages": [_answer()]}
+        key = (settings.openai_model, system_for_key or "", last_user.strip().lower())
+        ai, how = flight.do(key, _answer, timeout=settings.qa_singleflight_timeout_seconds)
+        if how != "leader":
+            inc(QA_SINGLEFLIGHT, result=how)
+            # Fresh message per caller; the leader's object belongs to its own state.
+            ai = AIMessage(content=ai.content)
         return {"messages": [ai]}
     return _fn
 
 
+def _coalescible(last_user_text: str) -> bool:
+    """
+    True if concurrent identical questions may share one LLM answer.
+
+    Mirrors the Q&A cache rules, so coalescing never serves an answer the
+    cache would not have served a moment later.
+    """
+    return (
+        settings.qa_singleflight_enabled
+        and settings.qa_cache_enabled
+        and len(last_user_text.strip()) >= settings.qa_cache_min_chars
+    )
+
+
 # ---------- Final node (materialize side-effects) ----------
 
 def _final_node(container):
     """
     Materialize audio/image outputs based on response_type.
     """
-    basic_img_prompt = (
-        "Create a realistic image of Karan: male, late 20s/early 30s, medium brown skin, "
-        "neatly trimmed beard, short black hair, black rectangular glasses, black long-sleeve crew-neck shirt. "
-        "Background: blurred tech conference with developers around."
-    )
-
     def _fn(state: KaranState):
         rt = state.get("response_type") or "text"
+        # Per-turn inputs/outputs are dropped and old messages pruned so the
+        # checkpoint size stays flat over a long chat.
+        housekeeping = {
+            "history": None, "retrieved": None, "cached": None,
+            "audio_buffer": None, "audio_path": None, "image_path": None,
+        }
+        stale = _stale_messages(state.get("messages", []))
+        if stale:
+            housekeeping["messages"] = stale
 
         if rt == "audio":
             # Use the last AI message content as the narration text.
@@ -153,15 +344,18 @@ def _final_node(container):
                     break
             if not content and state.get("messages"):
                 content = getattr(state["messages"][-1], "content", "")
-            audio = container.tts(content or "Hi, this is Karan.")
-            return {"audio_buffer": audio}
+            text = content or "Hi, this is Karan."
+            # Stream to a temp file and keep only its path in state.
+            if hasattr(container.tts, "to_file"):
+                return {**housekeeping, "audio_path": container.tts.to_file(text)}
+            return {**housekeeping, "audio_buffer": container.tts(text)}
 
         if rt == "image":
-            path = container.image_gen(basic_img_prompt)
-            return {"image_path": path}
+            path = container.image_gen(IMAGE_PROMPT)
+            return {**housekeeping, "image_path": path}
 
         # Default: text response already in messages.
-        return {}
+        return housekeeping
     return _fn
 
 
@@ -170,40 +364,48 @@ def _final_node(container):
 DB_URL = os.getenv("SHORT_TERM_DB_URL", "short_term_memory.db")
 
 
-def build_graph(container, attach_conn_for_tests: bool = False):
+def build_graph(container, attach_conn_for_tests: bool = False, checkpointer: Optional[Any] = None):
     """
-    Compile the LangGraph with a SQLite checkpointer.
+    Compile the LangGraph with the configured checkpointer.
 
     Parameters
     ----------
     container : Any
         DI container providing .llm, .tts, .image_gen, .short_mem, etc.
+        (and optionally .retriever for the retrieve node).
     attach_conn_for_tests : bool
         If True, attach the sqlite3 connection to graph as `_conn` (tests).
+    checkpointer : Optional[Any]
+        Pre-built checkpointer (e.g., from `open_async_checkpointer()`);
+        defaults to `build_checkpointer()` for `settings.checkpointer_backend`.
 
     Returns
     -------
     RunnableGraph
-        A compiled graph ready for .invoke(payload, config) calls.
+        A compiled graph ready for .invoke(payload, config) calls, or
+        .ainvoke(...) when `graph.async_checkpointer` is True.
     """
-    use_uri = DB_URL.startswith("file:")
-    conn = sqlite3.connect(DB_URL, check_same_thread=False, uri=use_uri)
-    checkpointer = SqliteSaver(conn)
+    if checkpointer is None:
+        checkpointer = build_checkpointer(db_url=DB_URL)
 
     sg = StateGraph(KaranState)
     sg.add_node("router", _router_node(container))
+    sg.add_node("retrieve", _retrieve_node(container))
     sg.add_node("text", _text_node(container))
     sg.add_node("final", _final_node(container))
 
     sg.add_edge(START, "router")
-    sg.add_edge("router", "text")
+    sg.add_conditional_edges("router", _route_after_router, ["retrieve", "text"])
+    sg.add_edge("retrieve", "text")
     sg.add_edge("text", "final")
     sg.add_edge("final", END)
 
     graph = sg.compile(checkpointer=checkpointer)
+    setattr(graph, "async_checkpointer", is_async_checkpointer(checkpointer))
 
-    if attach_conn_for_tests:
+    conn = getattr(checkpointer, "conn", None)
+    if attach_conn_for_tests and conn is not None:
         setattr(graph, "_conn", conn)  # expose for test cleanup
 
-    log.info("Graph compiled.")
+    log.info("Graph compiled (checkpointer=%s).", type(checkpointer).__name__)
     return graph
@@ -0,0 +1,43 @@
+"""
+Benchmark: context build time and prompt size per turn.
+
+Builds the prompt for 300 turns of one chat: system prompt + summary + a
+30-message window where every tenth user message is a long paste. Every
+prompt must fit the input budget, and counting + trimming must stay cheap
+(cached counts for the repeating system prompt and window messages).
+"""
+
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.constants import SYSTEM_PROMPT
+from app.workflows.context_budget import fit_prompt
+
+TURNS = 300
+WINDOW = 30
+BUDGET = 4000
+
+
+def test_context_build_time_per_turn():
+    history = []
+    timings, sizes = [], []
+    for i in range(TURNS):
+        text = f"question {i} about the keynote"
+        if i % 10 == 0:
+            text += " pasted log line" * 800                  # ~3k tokens of paste
+        history += [HumanMessage(content=text), AIMessage(content=f"answer {i} " * 30)]
+        window = history[-WINDOW:]
+        msgs = [SystemMessage(content=SYSTEM_PROMPT), SystemMessage(content="(summary) so far")]
+        msgs += window + [HumanMessage(content=f"follow-up {i}")]
+
+        t0 = time.perf_counter()
+        out, used = fit_prompt(msgs, model="bench", budget=BUDGET)
+        timings.append(time.perf_counter() - t0)
+        sizes.append(used)
+
+    timings.sort()
+    p50, p99 = timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+    print(f"\ncontext build p50={p50 * 1e3:.3f}ms p99={p99 * 1e3:.3f}ms max tokens={max(sizes)}")
+    assert max(sizes) <= BUDGET
+    assert p50 < 0.005
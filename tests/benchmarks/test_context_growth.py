@@ -0,0 +1,76 @@
+"""
+Regression benchmark: per-turn prompt size and checkpoint size stay flat.
+
+Drives 500 turns through the handler payload builder, the compiled graph
+(SQLite checkpointer) and the post-reply window update, then checks the
+late turns cost no more than the early ones.
+"""
+
+import sqlite3
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.adapters import telegram_handlers as th
+from app.constants import SYSTEM_PROMPT
+from app.workflows import karan_graph
+from app.workflows.karan_graph import build_graph
+
+TURNS = 500
+
+
+class _RecordingLLM:
+    def __init__(self):
+        self.prompt_tokens = []
+
+    def invoke(self, messages):
+        # whitespace tokens are a stable proxy for model tokens here;
+        # summarization calls (no system prompt) are not chat turns
+        if messages and messages[0].content == SYSTEM_PROMPT:
+            self.prompt_tokens.append(sum(len(str(m.content).split()) for m in messages))
+        return AIMessage(content="sounds good, tell me more about the summit")
+
+
+def _latest_checkpoint_bytes(db_path: str, thread_id: str) -> int:
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT length(checkpoint) FROM checkpoints WHERE thread_id = ? "
+            "ORDER BY checkpoint_id DESC LIMIT 1",
+            (thread_id,),
+        ).fetchone()
+    return int(row[0])
+
+
+@pytest.mark.parametrize("mode", ["window", "checkpoint"])
+def test_prompt_and_checkpoint_size_flat_over_500_turns(container, monkeypatch, tmp_path, mode):
+    db_path = str(tmp_path / "checkpoints.db")
+    monkeypatch.setattr(karan_graph, "DB_URL", db_path)
+    monkeypatch.setattr(th.settings, "context_mode", mode)
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    llm = _RecordingLLM()
+    container.llm = llm
+    container.short_mem.qa_get = lambda **kw: None  # every turn reaches the LLM
+
+    g = build_graph(container, attach_conn_for_tests=True)
+    chat_id = 42
+    cp_bytes = []
+    try:
+        for i in range(TURNS):
+            user_msg = f"question number {i} about the keynote schedule"
+            payload = th._build_payload(container, chat_id, user_msg)
+            out = th._graph_invoke_timed(g, payload, thread_id=str(chat_id))
+            th._after_reply(container, chat_id, user_msg, out["messages"][-1].content)
+            cp_bytes.append(_latest_checkpoint_bytes(db_path, str(chat_id)))
+    finally:
+        g._conn.close()
+
+    tokens = llm.prompt_tokens
+    assert len(tokens) == TURNS
+    early_tok, late_tok = max(tokens[:100]), max(tokens[-100:])
+    early_cp, late_cp = max(cp_bytes[:100]), max(cp_bytes[-100:])
+    print(f"\n[{mode}] prompt tokens/turn  early max={early_tok} late max={late_tok}")
+    print(f"[{mode}] checkpoint bytes    early max={early_cp} late max={late_cp}")
+
+    # bounded by window + summary, independent of chat length
+    assert late_tok <= early_tok * 1.1
+    assert late_cp <= early_cp * 1.1
@@ -0,0 +1,84 @@
+"""
+Benchmark: SQL statements per incoming message spent on identity upserts.
+
+Replays 200 messages from 20 returning users through `_ensure_identity`
+against `PgDurableStore` on SQLite and counts every statement sent to the
+database. The previous SELECT + UPDATE/INSERT per table cost 4 statements
+(and 2 commits) per message; now a first sighting costs one upsert per
+table and a returning user with an unchanged profile costs none.
+"""
+
+import types
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.adapters import telegram_handlers as th
+from app.adapters.memory_postgres import PgDurableStore
+from app.db import Base, User
+
+USERS = 20
+MESSAGES = 200
+
+
+@pytest.fixture
+def store_and_counter(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'identity.db'}")
+    Base.metadata.create_all(engine)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    store = PgDurableStore(sessionmaker(bind=engine))
+    yield store, statements, engine
+    engine.dispose()
+
+
+def _update(uid, username=None):
+    return types.SimpleNamespace(
+        effective_user=types.SimpleNamespace(id=uid, first_name="Ann", last_name=None, username=username),
+        effective_chat=types.SimpleNamespace(id=uid, type="private", title=None),
+    )
+
+
+def test_statements_per_message_for_returning_users(store_and_counter):
+    store, statements, engine = store_and_counter
+    container = types.SimpleNamespace(durable_mem=store)
+
+    for i in range(MESSAGES):
+        th._ensure_identity(container, _update(i % USERS, username=f"u{i % USERS}"))
+    cold = len(statements)
+    per_message = cold / MESSAGES
+    print(f"\nidentity statements/message: {per_message:.2f} ({cold} over {MESSAGES})")
+    assert cold == 2 * USERS                 # one upsert per table on first sight
+    assert per_message < 0.25                # was 4 per message
+
+    statements.clear()
+    for i in range(MESSAGES):
+        th._ensure_identity(container, _update(i % USERS, username=f"u{i % USERS}"))
+    assert statements == []                  # returning users: no DB work at all
+
+    th._ensure_identity(container, _update(3, username="renamed"))
+    assert len(statements) == 1 and "ON CONFLICT" in statements[0]
+    with engine.connect() as conn:
+        assert conn.execute(select(User.username).where(User.user_id == 3)).scalar_one() == "renamed"
+
+
+def test_unchanged_upsert_does_not_rewrite_the_row(store_and_counter):
+    store, _, engine = store_and_counter
+    rowcounts = []
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _rows(conn, cursor, statement, params, context, executemany):
+        if "ON CONFLICT" in statement:
+            rowcounts.append(cursor.rowcount)
+
+    store.ensure_user(user_id=1, first_name="A", last_name=None, username="a")
+    fresh = PgDurableStore(store._session)             # new process: empty identity cache
+    fresh.ensure_user(user_id=1, first_name="A", last_name=None, username="a")
+    fresh.ensure_user(user_id=1, first_name="A", last_name=None, username="b")
+    # insert, no-op (WHERE ... IS DISTINCT FROM is false), real update
+    assert rowcounts == [1, 0, 1]
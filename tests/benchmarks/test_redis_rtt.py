@@ -0,0 +1,50 @@
+"""
+Microbenchmark: Redis round-trips for one turn's short-term memory update.
+
+Compares the per-message API (append user, append assistant, read window)
+with the batched `append_turn` against a local fake Redis that adds a fixed
+latency per round-trip.
+"""
+
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.adapters.memory_redis import RedisMemoryStore
+
+TURNS = 50
+RTT = 0.0005  # 0.5 ms simulated network round-trip
+
+
+def _per_message(store, chat_id, i):
+    store.append_message(chat_id, HumanMessage(content=f"q{i}"))
+    store.append_message(chat_id, AIMessage(content=f"a{i}"))
+    return store.get_window(chat_id, k=store.window + 5)
+
+
+def _batched(store, chat_id, i):
+    return store.append_turn(
+        chat_id, [HumanMessage(content=f"q{i}"), AIMessage(content=f"a{i}")], fetch=store.window + 5
+    )
+
+
+def _run(store, fake, turn_fn):
+    fake.round_trips = 0
+    t0 = time.perf_counter()
+    for i in range(TURNS):
+        turn_fn(store, 1, i)
+    return fake.round_trips / TURNS, (time.perf_counter() - t0) / TURNS
+
+
+def test_batched_turn_needs_one_round_trip(fake_redis):
+    fake_redis.latency = RTT
+    store = RedisMemoryStore()
+
+    rtt_old, lat_old = _run(store, fake_redis, _per_message)
+    rtt_new, lat_new = _run(store, fake_redis, _batched)
+    print(f"\nper-message: {rtt_old:.0f} RTT/turn {lat_old * 1e3:.2f} ms/turn")
+    print(f"append_turn: {rtt_new:.0f} RTT/turn {lat_new * 1e3:.2f} ms/turn")
+
+    assert rtt_new == 1
+    assert rtt_old >= 3
+    assert lat_new < lat_old
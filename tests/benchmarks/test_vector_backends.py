@@ -0,0 +1,95 @@
+"""
+Benchmark: query latency and memory, NumPy index vs Chroma.
+
+Loads 3,000 chunks of 256-d vectors (a summit knowledge base) into both
+backends with precomputed embeddings, then runs 300 top-3 queries through
+`search()` with a constant-time embedder, so only the index path is timed.
+Prints p50/p99 latency and the resident memory each index added; the NumPy
+index must return the same top hit as Chroma and be faster at p50.
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from app.adapters.vector_numpy import NumpyVectorStore
+
+N, DIM, QUERIES, K = 3000, 256, 300, 3
+
+
+class TableEmb:
+    """Returns precomputed vectors by text (the embedding call is not timed)."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def embed_query(self, text):
+        return self.table[text]
+
+    def embed_documents(self, texts):
+        return [self.table[t] for t in texts]
+
+
+def _rss() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):  # not Linux
+        return 0
+
+
+def _percentiles(store, queries):
+    timings, tops = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        docs = store.search(q, k=K)
+        timings.append(time.perf_counter() - t0)
+        tops.append(docs[0].page_content)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.99)], tops
+
+
+def test_numpy_vs_chroma_query_latency(tmp_path):
+    pytest.importorskip("langchain_chroma")
+    from langchain_chroma import Chroma
+
+    from app.di import VSAdapter
+
+    rng = np.random.default_rng(7)
+    vecs = rng.standard_normal((N, DIM)).astype(np.float32)
+    texts = [f"chunk {i}" for i in range(N)]
+    ids = [f"id{i}" for i in range(N)]
+    # queries are noisy copies of stored chunks, so the true top hit is known
+    qvecs = vecs[rng.integers(0, N, QUERIES)] + 0.1 * rng.standard_normal((QUERIES, DIM)).astype(np.float32)
+    queries = [f"query {i}" for i in range(QUERIES)]
+    emb = TableEmb({**dict(zip(texts, vecs.tolist())), **dict(zip(queries, qvecs.tolist()))})
+
+    rss0 = _rss()
+    np_store = NumpyVectorStore(str(tmp_path / "numpy"), emb)
+    np_store.upsert(ids, texts, vecs)
+    np_mem = _rss() - rss0
+
+    rss0 = _rss()
+    chroma = VSAdapter(Chroma(
+        collection_name="bench",
+        embedding_function=emb,
+        persist_directory=str(tmp_path / "chroma"),
+        collection_metadata={"hnsw:space": "cosine"},
+    ))
+    for i in range(0, N, 500):
+        chroma.upsert(ids[i:i + 500], texts[i:i + 500], vecs[i:i + 500].tolist())
+    chroma_mem = _rss() - rss0
+
+    np_p50, np_p99, np_top = _percentiles(np_store, queries)
+    ch_p50, ch_p99, ch_top = _percentiles(chroma, queries)
+    agree = sum(a == b for a, b in zip(np_top, ch_top)) / QUERIES
+    print(
+        f"\nnumpy  p50={np_p50 * 1e3:.3f}ms p99={np_p99 * 1e3:.3f}ms rss+={np_mem / 2**20:.1f}MiB "
+        f"(vectors {np_store.nbytes / 2**20:.1f}MiB)"
+        f"\nchroma p50={ch_p50 * 1e3:.3f}ms p99={ch_p99 * 1e3:.3f}ms rss+={chroma_mem / 2**20:.1f}MiB"
+        f"\ntop-1 agreement={agree:.0%}"
+    )
+    assert agree >= 0.95              # HNSW is approximate; exact search is the reference
+    assert np_p50 < ch_p50
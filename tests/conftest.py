@@ -1,5 +1,7 @@
 # tests/conftest.py
 import os
+import threading
+import time
 import pytest
 from dataclasses import dataclass
 from typing import Any, List, Optional
@@ -33,6 +35,21 @@ class ShortMemFake:
     def append_message(self, chat_id: int, msg: BaseMessage) -> None:
         self._windows.setdefault(chat_id, []).append(msg)
 
+    def append_turn(self, chat_id: int, msgs, fetch: Optional[int] = None) -> List[BaseMessage]:
+        self._windows.setdefault(chat_id, []).extend(msgs)
+        return self.get_window(chat_id, fetch) if fetch else []
+
+    def replace_window(self, chat_id: int, msgs) -> None:
+        self._windows[chat_id] = list(msgs)
+
+    def compact_window(self, chat_id: int, summarized, replacement) -> bool:
+        w, n = self._windows.get(chat_id, []), len(summarized)
+        for p in range(len(w) - n, -1, -1):
+            if n and w[p:p + n] == list(summarized):
+                self._windows[chat_id] = list(replacement) + w[p + n:]
+                return True
+        return False
+
     def get_window(self, chat_id: int, k: int = 30) -> List[BaseMessage]:
         w = self._windows.get(chat_id, [])
         return w[-k:]
@@ -50,10 +67,149 @@ class ShortMemFake:
         self._cache[key] = answer
 
 
+class FakeRedis:
+    """
+    Minimal in-memory Redis (lists + strings) that counts round-trips.
+
+    Every direct command costs one round-trip; a pipeline costs one on
+    `execute()`. `latency` simulates network RTT in seconds.
+    """
+    _COMMANDS = {"lpush", "ltrim", "lrange", "llen", "expire", "delete", "get", "set", "setex"}
+
+    def __init__(self, latency: float = 0.0):
+        self.data = {}
+        self.ttl = {}
+        self.round_trips = 0
+        self.latency = latency
+
+    def _rtt(self):
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def __getattr__(self, name):
+        if name not in FakeRedis._COMMANDS:
+            raise AttributeError(name)
+        impl = getattr(self, f"_cmd_{name}")
+
+        def call(*a, **kw):
+            self._rtt()
+            return impl(*a, **kw)
+        return call
+
+    def pipeline(self, transaction: bool = True):
+        return FakePipeline(self)
+
+    @staticmethod
+    def _b(v):
+        return v if isinstance(v, bytes) else str(v).encode("utf-8")
+
+    def _cmd_lpush(self, key, *vals):
+        lst = self.data.setdefault(key, [])
+        for v in vals:
+            lst.insert(0, self._b(v))
+        return len(lst)
+
+    def _cmd_ltrim(self, key, start, end):
+        lst = self.data.get(key, [])
+        self.data[key] = lst[start:] if end == -1 else lst[start:end + 1]
+        return True
+
+    def _cmd_lrange(self, key, start, end):
+        lst = self.data.get(key, [])
+        return list(lst[start:] if end == -1 else lst[start:end + 1])
+
+    def _cmd_llen(self, key):
+        return len(self.data.get(key, []))
+
+    def _cmd_expire(self, key, seconds):
+        self.ttl[key] = seconds
+        return key in self.data
+
+    def _cmd_delete(self, *keys):
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    def _cmd_get(self, key):
+        return self.data.get(key)
+
+    def _cmd_set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = self._b(value)
+        if ex:
+            self.ttl[key] = ex
+        return True
+
+    def _cmd_setex(self, key, seconds, value):
+        return self._cmd_set(key, value, ex=seconds)
+
+
+class FakePipeline:
+    """Queues commands and runs them in one round-trip on `execute()`."""
+    def __init__(self, r: FakeRedis):
+        self._r = r
+        self._ops = []
+
+    def __getattr__(self, name):
+        if name not in FakeRedis._COMMANDS:
+            raise AttributeError(name)
+
+        def queue(*a, **kw):
+            self._ops.append((name, a, kw))
+            return self
+        return queue
+
+    def execute(self):
+        self._r._rtt()
+        ops, self._ops = self._ops, []
+        return [getattr(self._r, f"_cmd_{n}")(*a, **kw) for n, a, kw in ops]
+
+
+class AsyncFakeRedis:
+    """`redis.asyncio` facade over a FakeRedis (same data, same counters)."""
+    def __init__(self, r: FakeRedis):
+        self._r = r
+
+    def __getattr__(self, name):
+        call = getattr(self._r, name)
+
+        async def acall(*a, **kw):
+            return call(*a, **kw)
+        return acall
+
+    def pipeline(self, transaction: bool = True):
+        return AsyncFakePipeline(self._r)
+
+    async def aclose(self):
+        pass
+
+
+class AsyncFakePipeline(FakePipeline):
+    """Async-context-manager pipeline with an awaitable `execute()`."""
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self):
+        return FakePipeline.execute(self)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Patch sync and async Redis clients in the adapter with a shared FakeRedis."""
+    r = FakeRedis()
+    monkeypatch.setattr("app.adapters.memory_redis.redis.Redis", lambda **kw: r)
+    monkeypatch.setattr("app.adapters.memory_redis.aioredis.Redis", lambda **kw: AsyncFakeRedis(r))
+    return r
+
+
 class DurableMemFake:
     """In-memory durable memory for tests (no Postgres)."""
     def __init__(self):
         self._summary = {}
+        self._cursor = {}
         self._messages = []
 
     def ensure_user(self, **kwargs):  # pragma: no cover - not used in unit tests
@@ -62,8 +218,9 @@ class DurableMemFake:
     def ensure_chat(self, **kwargs):  # pragma: no cover - not used in unit tests
         pass
 
-    def set_summary(self, chat_id: int, text: str) -> None:
+    def set_summary(self, chat_id: int, text: str, *, covered: int = 0) -> None:
         self._summary[chat_id] = text
+        self._cursor[chat_id] = self._cursor.get(chat_id, 0) + covered
 
     def get_summary(self, chat_id: int) -> Optional[str]:
         return self._summary.get(chat_id)
@@ -76,6 +233,55 @@ class DurableMemFake:
             self.add_message(chat_id=chat_id, role=r, content=c)
 
 
+class CountingEmb:
+    """
+    Deterministic embeddings (no network) that count calls.
+
+    One dimension per word of TOPICS ("food"/"eat" also count as lunch),
+    zero-padded to `dim`. The first `fail_first` `embed_documents` calls
+    raise, like a rate-limited API.
+    """
+    model = "text-embedding-3-large"
+    TOPICS = ["keynote", "panel", "lunch", "workshop", "food"]
+
+    def __init__(self, dim: int = 8, fail_first: int = 0):
+        self.dim = dim
+        self.fail_first = fail_first
+        self.calls = 0          # embed_documents calls, failed ones included
+        self.texts = 0          # texts embedded by successful calls
+        self.queries = 0        # embed_query calls
+        self.batches: List[List[str]] = []
+        self.lock = threading.Lock()
+
+    def _vec(self, text: str) -> List[float]:
+        t = text.lower()
+        v = [float(w in t) for w in self.TOPICS]
+        v[2] += float("food" in t or "eat" in t)          # "where can I eat" ~ lunch
+        return v + [0.0] * (self.dim - len(v))
+
+    def embed_documents(self, texts):
+        with self.lock:
+            self.calls += 1
+            if self.fail_first:
+                self.fail_first -= 1
+                raise RuntimeError("429")
+            self.texts += len(texts)
+            self.batches.append(list(texts))
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text):
+        with self.lock:
+            self.queries += 1
+            self.batches.append([text])
+        return self._vec(text)
+
+
+@pytest.fixture
+def counting_emb():
+    """The `CountingEmb` class, to build fakes with per-test arguments."""
+    return CountingEmb
+
+
 @dataclass
 class TestContainer:
     llm: Any
@@ -99,6 +305,16 @@ def _test_env(monkeypatch, tmp_path):
     monkeypatch.setenv("OPENAI_API_KEY", "test")
     monkeypatch.setenv("ELEVENLABS_API_KEY", "test")
     monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test")
+    # deterministic token counts (no tiktoken BPE download)
+    from app.config.settings import settings
+    from app.utils import tokens
+    monkeypatch.setattr(settings, "tokenizer", "estimate")
+    monkeypatch.setattr(settings, "embedding_cache_path", str(tmp_path / "embeddings.sqlite"))
+    tokens.get_encoding.cache_clear()
+    tokens._count.cache_clear()
+    # media temp files go to a per-test directory
+    from app.adapters import media_store
+    monkeypatch.setattr(media_store, "_store", media_store.MediaStore(str(tmp_path / "media")))
     yield
 
 
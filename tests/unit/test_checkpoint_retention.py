@@ -0,0 +1,78 @@
+import sqlite3
+import time
+
+from langchain_core.messages import HumanMessage
+
+from app.entrypoints import checkpoints as cli
+from app.workflows import karan_graph
+from app.workflows.checkpoint_retention import CheckpointRetention, start_retention_scheduler
+from app.workflows.karan_graph import build_graph
+
+
+def _graph(container, monkeypatch, tmp_path):
+    db = str(tmp_path / "cp.db")
+    monkeypatch.setattr(karan_graph, "DB_URL", db)
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    return build_graph(container, attach_conn_for_tests=True), db
+
+
+def _count(conn, thread_id):
+    return conn.execute(
+        "SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (thread_id,)
+    ).fetchone()[0]
+
+
+def test_prune_history_keeps_last_n(container, monkeypatch, tmp_path):
+    g, _ = _graph(container, monkeypatch, tmp_path)
+    try:
+        for i in range(5):
+            g.invoke({"messages": [HumanMessage(content=f"hello {i}")]},
+                     {"configurable": {"thread_id": "a"}})
+        assert _count(g._conn, "a") > 3
+
+        r = CheckpointRetention(g.checkpointer, keep_last=3, idle_ttl_seconds=0)
+        assert r.prune_history() > 0
+        assert _count(g._conn, "a") == 3
+
+        # the thread still resumes from its latest checkpoint
+        out = g.invoke({"messages": [HumanMessage(content="again")]},
+                       {"configurable": {"thread_id": "a"}})
+        assert out["messages"][-1].content
+    finally:
+        g._conn.close()
+
+
+def test_prune_idle_and_gauges(container, monkeypatch, tmp_path):
+    g, _ = _graph(container, monkeypatch, tmp_path)
+    try:
+        for tid in ("old", "new"):
+            g.invoke({"messages": [HumanMessage(content="hi")]},
+                     {"configurable": {"thread_id": tid}})
+        r = CheckpointRetention(g.checkpointer, keep_last=10, idle_ttl_seconds=60)
+        assert r.prune_idle(now=time.time()) == 0
+        assert r.prune_idle(now=time.time() + 3600) == 2
+        assert _count(g._conn, "old") == 0
+
+        report = r.run_once(force_vacuum=True)
+        assert report.vacuumed is True
+        assert report.checkpoint_rows == 0
+        assert report.db_bytes > 0
+    finally:
+        g._conn.close()
+
+
+def test_scheduler_only_for_sqlite():
+    assert start_retention_scheduler(object(), interval_seconds=10) is None
+
+
+def test_cli_runs_once(container, monkeypatch, tmp_path, capsys):
+    g, db = _graph(container, monkeypatch, tmp_path)
+    for i in range(4):
+        g.invoke({"messages": [HumanMessage(content=f"q {i}")]},
+                 {"configurable": {"thread_id": "cli"}})
+    g._conn.close()
+
+    cli.main(["--db", db, "--keep-last", "2", "--idle-ttl", "0"])
+    assert "pruned=" in capsys.readouterr().out
+    with sqlite3.connect(db) as conn:
+        assert _count(conn, "cli") == 2
@@ -0,0 +1,50 @@
+import pytest
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from app.workflows.checkpointers import build_checkpointer, is_async_checkpointer, _postgres_saver
+
+
+def test_default_backend_is_sqlite(tmp_path):
+    saver = build_checkpointer("sqlite", db_url=str(tmp_path / "cp.db"))
+    try:
+        assert isinstance(saver, SqliteSaver)
+        assert is_async_checkpointer(saver) is False
+    finally:
+        saver.conn.close()
+
+
+@pytest.mark.parametrize("backend", ["nope", "postgres_async"])
+def test_rejects_unknown_or_async_backend(backend):
+    with pytest.raises(ValueError):
+        build_checkpointer(backend)
+
+
+def test_postgres_saver_borrows_pool_connections(monkeypatch):
+    class Cur:
+        def __enter__(self): return self
+        def __exit__(self, *a): pass
+
+    class DriverConn:
+        autocommit = False
+        seen = []
+        def cursor(self, **kw):
+            self.seen.append(self.autocommit)
+            return Cur()
+
+    class Raw:
+        closed = 0
+        def __init__(self): self.driver_connection = DriverConn()
+        def close(self): Raw.closed += 1
+
+    class Engine:
+        def raw_connection(self): return Raw()
+
+    monkeypatch.setattr("langgraph.checkpoint.postgres.PostgresSaver.setup", lambda self: None)
+    saver = _postgres_saver(Engine())
+    with saver._cursor():
+        pass
+    with saver._cursor():
+        pass
+
+    assert DriverConn.seen == [True, True]   # autocommit while in use
+    assert Raw.closed == 2                   # returned to the pool each time
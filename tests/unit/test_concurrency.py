@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+import types
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.adapters import telegram_handlers as th
+from app.concurrency import BlockingPool, chat_lock, run_blocking
+from app.metrics import BLOCKING_INFLIGHT, BLOCKING_QUEUE_DEPTH
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_runs_off_loop_thread():
+    loop_thread = threading.get_ident()
+    worker_thread = await run_blocking("unit", threading.get_ident)
+    assert worker_thread != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_pool_respects_limit_and_keeps_loop_responsive():
+    pool = BlockingPool(2)
+    state = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.05)
+        with lock:
+            state["now"] -= 1
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    t = asyncio.create_task(ticker())
+    try:
+        await asyncio.gather(*(pool.run("unit", work) for _ in range(6)))
+    finally:
+        t.cancel()
+        pool.shutdown()
+
+    assert state["peak"] == 2
+    assert ticks > 5  # loop kept running while workers were busy
+    assert BLOCKING_QUEUE_DEPTH._value.get() == 0
+    assert BLOCKING_INFLIGHT._value.get() == 0
+
+
+@pytest.mark.asyncio
+async def test_chat_lock_is_per_chat():
+    assert chat_lock(1) is chat_lock(1)
+    assert chat_lock(1) is not chat_lock(2)
+
+
+# ---- handler-level: two chats overlap instead of queueing ----
+
+class _Mem:
+    def append_message(self, chat_id, msg): pass
+    def append_turn(self, chat_id, msgs, fetch=None): return []
+    def get_window(self, chat_id, k=30): return []
+    def clear(self, chat_id): pass
+    def get_summary(self, chat_id): return None
+    def set_summary(self, chat_id, text, *, covered=0): pass
+    def ensure_user(self, **kw): pass
+    def ensure_chat(self, **kw): pass
+    def add_message(self, **kw): pass
+
+
+class _SlowGraph:
+    def invoke(self, payload, config):
+        time.sleep(0.2)
+        return {"messages": [AIMessage(content="hi")], "response_type": "text"}
+
+
+class _Msg:
+    def __init__(self, text):
+        self.text = text
+        self.replies = []
+    async def reply_text(self, t): self.replies.append(t)
+
+
+def _update(chat_id):
+    u = types.SimpleNamespace(id=chat_id, first_name="A", last_name=None, username=None)
+    c = types.SimpleNamespace(id=chat_id, type="private", title=None)
+    return types.SimpleNamespace(effective_user=u, effective_chat=c, message=_Msg("hello"))
+
+
+@pytest.mark.asyncio
+async def test_handle_text_serves_chats_concurrently():
+    mem = _Mem()
+    container = types.SimpleNamespace(short_mem=mem, durable_mem=mem, llm=None)
+    ctx = types.SimpleNamespace(application=types.SimpleNamespace(bot_data={"container": container}))
+    updates = [_update(100 + i) for i in range(4)]
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(th.handle_text(_SlowGraph(), u, ctx) for u in updates))
+    elapsed = time.perf_counter() - t0
+
+    assert all(u.message.replies == ["hi"] for u in updates)
+    assert elapsed < 0.6  # sequential would be >= 0.8s
+
+
+class _AsyncMem:
+    def __init__(self):
+        self.turns = []
+    async def get_window(self, chat_id, k=None): return []
+    async def append_turn(self, chat_id, msgs, fetch=None):
+        self.turns.append((chat_id, [m.content for m in msgs]))
+        return []
+
+
+@pytest.mark.asyncio
+async def test_handle_text_uses_async_short_memory():
+    mem, amem = _Mem(), _AsyncMem()
+    container = types.SimpleNamespace(short_mem=mem, short_mem_async=amem, durable_mem=mem, llm=None)
+    ctx = types.SimpleNamespace(application=types.SimpleNamespace(bot_data={"container": container}))
+    u = _update(200)
+
+    await th.handle_text(_SlowGraph(), u, ctx)
+    assert u.message.replies == ["hi"]
+    assert amem.turns == [(200, ["hello", "hi"])]
@@ -0,0 +1,77 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.metrics import PROMPT_TOKENS, PROMPT_TRIMMED_MESSAGES
+from app.utils import tokens
+from app.workflows.context_budget import budget_for, fit_prompt
+
+
+def _prompt(turns, paste=""):
+    msgs = [SystemMessage(content="You are Karan." * 10), SystemMessage(content="(summary) earlier chat")]
+    for i in range(turns):
+        msgs += [HumanMessage(content=f"q{i} " * 20), AIMessage(content=f"a{i} " * 20)]
+    msgs.append(HumanMessage(content="latest question" + paste))
+    return msgs
+
+
+def test_trims_oldest_turns_and_keeps_system_and_new_message():
+    msgs = _prompt(15)
+    trimmed = PROMPT_TRIMMED_MESSAGES.labels(model="m")._value.get()
+    out, used = fit_prompt(msgs, model="m", budget=600)
+
+    assert used <= 600
+    assert out[:2] == msgs[:2] and out[-1] == msgs[-1]
+    assert out[-2] == msgs[-2]                                # newest turn survives
+    assert len(out) < len(msgs)
+    assert out[2:-1] == msgs[len(msgs) - len(out) + 2:-1]     # a contiguous newest slice
+    assert PROMPT_TRIMMED_MESSAGES.labels(model="m")._value.get() - trimmed == len(msgs) - len(out)
+
+
+def test_fits_untouched_and_records_prompt_tokens():
+    msgs = _prompt(2)
+    before = PROMPT_TOKENS.labels(model="m")._sum.get()
+    out, used = fit_prompt(msgs, model="m", budget=10_000)
+    assert out == msgs
+    assert PROMPT_TOKENS.labels(model="m")._sum.get() - before == used
+
+
+def test_huge_paste_is_clipped_to_its_tail():
+    msgs = _prompt(3, paste=" filler" * 5000 + " THE END")
+    out, used = fit_prompt(msgs, model="m", budget=500)
+    assert used <= 500
+    assert out[-1].content.endswith("THE END")
+    assert out[:2] == msgs[:2]
+    assert len(out[-1].content) < len(msgs[-1].content)
+
+
+def test_budget_per_model(monkeypatch):
+    monkeypatch.setattr("app.workflows.context_budget.settings.context_max_input_tokens", 8000)
+    monkeypatch.setattr("app.workflows.context_budget.settings.context_max_input_tokens_by_model", {"big": 100_000})
+    assert budget_for("big") == 100_000
+    assert budget_for("other") == 8000
+
+
+def test_counts_use_the_cached_encoding(monkeypatch):
+    class Enc:
+        calls = 0
+
+        def encode(self, text, disallowed_special=()):
+            Enc.calls += 1
+            return text.split()
+
+    monkeypatch.setattr(tokens, "get_encoding", lambda model=None: Enc())
+    tokens._count.cache_clear()
+    assert tokens.count_tokens("one two three", "m") == 3
+    assert tokens.count_tokens("one two three", "m") == 3
+    assert Enc.calls == 1                                     # memoized per text
+    tokens._count.cache_clear()
+
+
+def test_count_memo_is_keyed_by_digest_and_bounded(monkeypatch):
+    monkeypatch.setattr(tokens._count, "maxsize", 2)
+    pasted = "lorem ipsum " * 10_000
+    assert tokens.count_tokens(pasted) == (len(pasted) + 3) // 4
+    for text in ("a", "b"):
+        tokens.count_tokens(text)
+    keys = list(tokens._count._counts)
+    assert len(keys) == 2                                     # oldest (the paste) evicted
+    assert all(len(digest) == 16 for digest, _ in keys)       # texts are not kept as keys
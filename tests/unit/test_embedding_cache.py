@@ -0,0 +1,105 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from app.adapters.embedding_cache import CachedEmbeddings, SqliteEmbeddingStore, text_hash
+from app.workflows.ingestion import Ingestor
+
+
+def test_only_misses_reach_the_api_and_survive_a_restart(tmp_path, counting_emb):
+    path = str(tmp_path / "emb.sqlite")
+    inner = counting_emb()
+    emb = CachedEmbeddings(inner, SqliteEmbeddingStore(path, max_bytes=1 << 20))
+
+    first = emb.embed_documents(["keynote at 9", "lunch at 1", "keynote at 9"])
+    assert inner.batches == [["keynote at 9", "lunch at 1"]]      # deduped within the batch
+    assert first[0] == first[2]
+
+    again = emb.embed_documents(["lunch at 1", "room B204"])
+    assert inner.batches[-1] == ["room B204"]
+    assert again[0] == first[1]
+    assert emb.embed_query("keynote at 9") == first[0]           # query path shares the cache
+    assert len(inner.batches) == 2
+
+    emb.store.close()
+    reopened = CachedEmbeddings(inner, SqliteEmbeddingStore(path, max_bytes=1 << 20))
+    assert reopened.embed_query("room B204") == again[1]
+    assert len(inner.batches) == 2
+    assert reopened.store.size_bytes == 3 * 8 * 4                # three float32 vectors
+
+
+def test_model_is_part_of_the_key(tmp_path):
+    store = SqliteEmbeddingStore(str(tmp_path / "emb.sqlite"), max_bytes=1 << 20)
+    store.put_many("small", {text_hash("hi"): [1.0, 2.0]})
+    assert store.get_many("large", [text_hash("hi")]) == {}
+    assert store.get_many("small", [text_hash("hi")])[text_hash("hi")].tolist() == [1.0, 2.0]
+
+
+def test_least_recently_used_vectors_are_evicted(tmp_path):
+    now = [0.0]
+    store = SqliteEmbeddingStore(str(tmp_path / "emb.sqlite"), max_bytes=3 * 16, clock=lambda: now[0])
+    for i, t in enumerate(["a", "b", "c"]):
+        now[0] = i
+        store.put_many("m", {text_hash(t): [float(i)] * 4})
+    now[0] = 10
+    store.get_many("m", [text_hash("a")])                        # "a" becomes most recent
+
+    now[0] = 11
+    store.put_many("m", {text_hash("d"): [3.0] * 4})
+    left = store.get_many("m", [text_hash(t) for t in "abcd"])
+    assert set(left) == {text_hash("a"), text_hash("d")}         # evicted down to 90% of the cap
+    assert store.size_bytes <= 3 * 16
+
+
+def test_locked_cache_falls_back_to_the_api(tmp_path, monkeypatch, counting_emb):
+    monkeypatch.setattr("app.adapters.embedding_cache._BUSY_TIMEOUT_MS", 50)
+    path = str(tmp_path / "emb.sqlite")
+    inner = counting_emb()
+    emb = CachedEmbeddings(inner, SqliteEmbeddingStore(path, max_bytes=1 << 20))
+    emb.embed_documents(["keynote at 9"])
+    size = emb.store.size_bytes
+
+    other = sqlite3.connect(path, isolation_level=None)         # another process holds the write lock
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            emb.store.put_many(emb.model, {text_hash("lunch at 1"): [1.0] * 8})
+        assert emb.store.size_bytes == size                      # nothing committed, nothing counted
+
+        out = emb.embed_documents(["keynote at 9", "lunch at 1"])
+        assert out == [inner._vec("keynote at 9"), inner._vec("lunch at 1")]
+        assert emb.embed_query("room B204") == inner._vec("room B204")
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    assert emb.store.size_bytes == size
+    emb.embed_documents(["lunch at 1"])                          # the lock is gone: stored again
+    assert emb.store.size_bytes == size + 8 * 4
+
+
+def test_reingestion_is_served_from_the_cache(tmp_path, counting_emb):
+    class Store:
+        def __init__(self):
+            self.rows = {}
+
+        def ids(self):
+            return list(self.rows)
+
+        def upsert(self, ids, texts, vectors, metadatas=None):
+            self.rows.update(zip(ids, vectors))
+
+        def delete(self, ids):
+            for i in ids:
+                self.rows.pop(i)
+
+    inner = counting_emb()
+    emb = CachedEmbeddings(inner, SqliteEmbeddingStore(str(tmp_path / "emb.sqlite"), max_bytes=1 << 20))
+    docs = [("schedule.md", "Keynote 9:00\n\nPanel 11:00\n\nClosing 17:00")]
+
+    Ingestor(Store(), emb, chunk_chars=15).run(docs)
+    calls = len(inner.batches)
+    # a fresh collection (e.g., rebuilt index) re-embeds nothing
+    report = Ingestor(Store(), emb, chunk_chars=15).run(docs)
+    assert report.embedded == 3
+    assert len(inner.batches) == calls
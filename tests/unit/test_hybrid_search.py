@@ -0,0 +1,151 @@
+from app.adapters.hybrid_search import BM25Index, HybridVectorStore, tokenize
+from app.adapters.vector_numpy import NumpyVectorStore
+from app.di import _chroma_where
+from app.metrics import HYBRID_SEARCHES
+from app.workflows.ingestion import Ingestor
+
+CHUNKS = {
+    "c1": "Keynote by Karan on recommender systems, main hall, 9:00",
+    "c2": "Panel on LLM evaluation in room B204 with Dr. Ramaswamy",
+    "c3": "Lunch is served in the venue courtyard at 13:00",
+    "c4": "Workshop on vector databases in room A101",
+}
+
+
+def _store(tmp_path, emb, **kwargs):
+    store = HybridVectorStore(
+        NumpyVectorStore(str(tmp_path / "vec"), emb), BM25Index(str(tmp_path / "bm25.json")),
+        rrf_k=60, candidates=10, lexical_max_terms=4, **kwargs,
+    )
+    ids = list(CHUNKS)
+    store.upsert(ids, [CHUNKS[i] for i in ids], emb.embed_documents([CHUNKS[i] for i in ids]),
+                 [{"source": "schedule.md"} for _ in ids])
+    store.flush()
+    return store
+
+
+def _paths():
+    return {p: HYBRID_SEARCHES.labels(path=p)._value.get() for p in ("lexical", "hybrid", "vector")}
+
+
+def test_bm25_ranks_rare_exact_terms_and_updates_incrementally(tmp_path):
+    idx = BM25Index(str(tmp_path / "bm25.json"))
+    idx.upsert(list(CHUNKS), list(CHUNKS.values()))
+    assert idx.search(tokenize("room B204"), k=2)[0][0] == "c2"
+    assert idx.search(tokenize("Ramaswamy"), k=3) == [("c2", idx.search(tokenize("Ramaswamy"), k=1)[0][1], 1)]
+
+    idx.upsert(["c2"], ["Panel moved to room C301"])
+    idx.delete(["c4"])
+    idx.save()
+    reloaded = BM25Index(str(tmp_path / "bm25.json"))
+    assert len(reloaded) == 3
+    assert reloaded.search(tokenize("B204"), k=3) == []
+    assert reloaded.search(tokenize("room"), k=3)[0][0] == "c2"
+
+
+def test_exact_name_lookup_makes_no_embedding_call(tmp_path, counting_emb):
+    emb = counting_emb()
+    store = _store(tmp_path, emb, lexical_min_margin=0.5)
+    before = _paths()
+
+    docs = store.search("room B204", k=2)
+    assert docs[0].page_content == CHUNKS["c2"]
+    assert emb.queries == 0
+    assert _paths()["lexical"] - before["lexical"] == 1
+
+
+def test_generic_terms_still_go_through_the_dense_path(tmp_path, counting_emb):
+    emb = counting_emb()
+    store = _store(tmp_path, emb, lexical_min_margin=0.5)
+    before = _paths()
+
+    # "room" is in c2 and c4 with near-equal BM25 scores: not decisive
+    store.search("room", k=1)
+    assert emb.queries == 1
+    assert _paths()["lexical"] == before["lexical"]
+    assert _paths()["hybrid"] - before["hybrid"] == 1
+
+    # the fast path is off by default, even for an exact name
+    default = HybridVectorStore(store.vector, store.bm25)
+    assert default.search("room B204", k=1)[0].page_content == CHUNKS["c2"]
+    assert emb.queries == 2
+    assert _paths()["lexical"] == before["lexical"]
+
+
+def test_hybrid_fuses_both_rankings(tmp_path, counting_emb):
+    emb = counting_emb()
+    store = _store(tmp_path, emb)
+    before = _paths()
+
+    # "food" is not in any chunk, "courtyard" is: lexical and dense both find c3
+    docs = store.search("food near the courtyard", k=2)
+    assert docs[0].page_content == CHUNKS["c3"]
+    assert emb.queries == 1
+    assert _paths()["hybrid"] - before["hybrid"] == 1
+
+    # no indexed term at all: vector only
+    assert store.search("where can I eat", k=1)[0].page_content == CHUNKS["c3"]
+    assert _paths()["vector"] - before["vector"] == 1
+
+
+def test_filters_and_deletes_apply_to_both_indexes(tmp_path, counting_emb):
+    store = _store(tmp_path, counting_emb())
+    assert store.search("room", k=3, filter={"source": "other.md"}) == []
+    store.delete(["c2"])
+    assert all(d.page_content != CHUNKS["c2"] for d in store.search("room B204 panel", k=3))
+    assert "c2" not in store.bm25 and "c2" not in store.ids()
+
+
+def test_sync_backfills_an_existing_collection(tmp_path, counting_emb):
+    emb = counting_emb()
+    vec = NumpyVectorStore(str(tmp_path / "vec"), emb)
+    vec.upsert(list(CHUNKS), list(CHUNKS.values()), emb.embed_documents(list(CHUNKS.values())))
+    store = HybridVectorStore(vec, BM25Index(str(tmp_path / "bm25.json")))
+    assert store.sync() == 4
+    assert store.sync() == 0
+    assert store.search("Ramaswamy", k=1)[0].page_content == CHUNKS["c2"]
+
+
+def test_sync_drops_chunks_the_vector_store_lost(tmp_path, counting_emb):
+    store = _store(tmp_path, counting_emb())
+    store.vector.delete(["c2"])                  # e.g., pruned by a run that died before flushing BM25
+    assert store.sync() == 1
+    assert "c2" not in store.bm25
+    assert store.search("room B204", k=3)[0].page_content == CHUNKS["c4"]
+    assert "c2" not in BM25Index(str(tmp_path / "bm25.json"))
+
+
+def test_writes_are_saved_on_flush_and_picked_up_by_readers(tmp_path, counting_emb):
+    emb = counting_emb()
+    store = _store(tmp_path, emb)                                # the ingest CLI
+    bot = HybridVectorStore(NumpyVectorStore(str(tmp_path / "vec"), emb),
+                            BM25Index(str(tmp_path / "bm25.json")), lexical_max_terms=4)
+    saved = (tmp_path / "bm25.json").stat().st_mtime_ns
+
+    store.upsert(["c5"], ["Closing party on the rooftop"], emb.embed_documents(["closing party"]))
+    store.delete(["c2"])
+    assert (tmp_path / "bm25.json").stat().st_mtime_ns == saved   # no rewrite per batch
+    store.flush()
+
+    assert bot.search("rooftop", k=1)[0].page_content == "Closing party on the rooftop"
+    assert "c2" not in bot.bm25
+
+
+def test_ingestion_flushes_bm25_once_per_run(tmp_path, counting_emb, monkeypatch):
+    emb = counting_emb()
+    store = HybridVectorStore(NumpyVectorStore(str(tmp_path / "vec"), emb), BM25Index(str(tmp_path / "bm25.json")))
+    saves = []
+    monkeypatch.setattr(store.bm25, "save", lambda: saves.append(1) or BM25Index.save(store.bm25))
+    docs = [("schedule.md", "\n\n".join(CHUNKS.values()))]
+
+    Ingestor(store, emb, batch_size=1, concurrency=1, chunk_chars=60).run(docs, corpus="summit")
+    assert len(saves) == 1
+    assert len(BM25Index(str(tmp_path / "bm25.json"))) == 4
+
+
+def test_chroma_where_translation():
+    assert _chroma_where(None) is None
+    assert _chroma_where({"source": "a.md"}) == {"source": "a.md"}
+    assert _chroma_where({"source": ["a.md", "b.md"], "chunk": 0}) == {
+        "$and": [{"source": {"$in": ["a.md", "b.md"]}}, {"chunk": 0}]
+    }
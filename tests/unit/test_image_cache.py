@@ -0,0 +1,58 @@
+import os
+import threading
+
+from app.adapters.image_cache import CachedImageGen, image_cache_key
+from app.utils.disk_cache import DiskLRU
+
+
+class CountingGen:
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt, size="1024x1024"):
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        p = self.tmp_path / f"gen-{n}.png"
+        p.write_bytes(f"png-{n}".encode())
+        return str(p)
+
+
+def _drain(gen):
+    """Wait for queued background renders (single FIFO worker)."""
+    gen._worker.submit(lambda: None).result()
+
+
+def _gen(tmp_path, pool_size):
+    inner = CountingGen(tmp_path)
+    cache = DiskLRU("image_test", str(tmp_path / "cache"), max_bytes=10_000, suffix=".png")
+    return inner, CachedImageGen(inner, cache, pool_size=pool_size)
+
+
+def test_cold_prompt_renders_once_then_serves_from_pool(tmp_path):
+    inner, gen = _gen(tmp_path, pool_size=3)
+    first = gen("selfie")
+    _drain(gen)
+    assert inner.calls == 3             # 1 live + 2 pre-rendered variants
+    os.remove(first)                    # caller owns the returned file
+
+    served = {open(gen("selfie"), "rb").read() for _ in range(20)}
+    assert inner.calls == 3
+    assert served <= {b"png-1", b"png-2", b"png-3"} and len(served) > 1
+
+
+def test_warm_fills_the_pool_before_first_request(tmp_path):
+    inner, gen = _gen(tmp_path, pool_size=2)
+    gen.warm("selfie")
+    _drain(gen)
+    assert inner.calls == 2
+    assert all(gen.cache.contains(k) for k in gen._variant_keys("selfie", "1024x1024"))
+    # rendered temp files were moved into the cache, not left behind
+    assert not any(p.name.startswith("gen-") for p in tmp_path.iterdir())
+
+
+def test_key_includes_size_and_prompt():
+    assert image_cache_key("a", "1024x1024") != image_cache_key("a", "512x512")
+    assert image_cache_key("a", "1024x1024") != image_cache_key("b", "1024x1024")
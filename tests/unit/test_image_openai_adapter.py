@@ -21,11 +21,8 @@ def test_image_gen_monkeypatched(tmp_path, monkeypatch):
             def generate(**kwargs):
                 return Result()
 
-    monkeypatch.setenv("OPENAI_API_KEY", "test")  # ensure client init doesn't choke
-    monkeypatch.setattr("app.adapters.image_openai.OpenAI", lambda **_: DummyClient)
-
     # run
-    gen = build_image_gen()
+    gen = build_image_gen(DummyClient)
     path = gen("test", size="512x512")
 
     # assert
@@ -0,0 +1,88 @@
+from tenacity import wait_none
+
+from app.workflows.ingestion import Ingestor, chunk_id, chunk_text, corpus_name, iter_files
+
+
+class FakeStore:
+    def __init__(self):
+        self.rows = {}
+
+    def ids(self, where=None):
+        return [i for i, (_, _, m) in self.rows.items() if all(m.get(k) == v for k, v in (where or {}).items())]
+
+    def upsert(self, ids, texts, vectors, metadatas=None):
+        for i, t, v, m in zip(ids, texts, vectors, metadatas):
+            self.rows[i] = (t, v, m)
+
+    def delete(self, ids):
+        for i in ids:
+            self.rows.pop(i, None)
+
+
+def _write(root, name, paragraphs):
+    (root / name).write_text("\n\n".join(paragraphs), encoding="utf-8")
+
+
+def test_chunking_packs_paragraphs_and_splits_long_ones():
+    chunks = chunk_text("a" * 30 + "\n\n" + "b" * 30 + "\n\n" + "c" * 120, chunk_chars=70, overlap=10)
+    assert chunks[0] == "a" * 30 + "\n\n" + "b" * 30
+    assert all(len(c) <= 70 for c in chunks)
+    assert "".join(c[:60] for c in chunks[1:-1]) + chunks[-1] == "c" * 120   # overlapping windows
+
+
+def test_rerun_embeds_only_changed_chunks(tmp_path, counting_emb):
+    _write(tmp_path, "schedule.md", [f"Session {i}: talk {i} in room B20{i}" for i in range(10)])
+    _write(tmp_path, "venue.txt", ["Venue: NIMHANS convention centre", "Session 0: talk 0 in room B200"])
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG")
+    store, emb = FakeStore(), counting_emb()
+    ing = Ingestor(store, emb, batch_size=4, concurrency=2, chunk_chars=40)
+    corpus = corpus_name(str(tmp_path))
+
+    first = ing.run(iter_files(str(tmp_path)), corpus=corpus)
+    assert (first.files, first.chunks, first.duplicates) == (2, 12, 1)
+    assert first.embedded == 11 == len(store.rows)
+    assert emb.calls == first.embed_calls == 3
+
+    again = ing.run(iter_files(str(tmp_path)), corpus=corpus)
+    assert (again.embedded, again.unchanged, again.embed_calls) == (0, 11, 0)
+    assert again.embed_calls_saved == 3
+
+    # the schedule changes: one session moves rooms
+    _write(tmp_path, "schedule.md", [f"Session {i}: talk {i} in room B20{i}" for i in range(9)]
+           + ["Session 9: talk 9 in room C101"])
+    texts_before = emb.texts
+    third = ing.run(iter_files(str(tmp_path)), corpus=corpus)
+    assert (third.embedded, third.pruned) == (1, 1)
+    assert emb.texts - texts_before == 1
+    assert chunk_id("Session 9: talk 9 in room C101") in store.rows
+    assert chunk_id("Session 9: talk 9 in room B209") not in store.rows
+    assert store.rows[chunk_id("Session 9: talk 9 in room C101")][2]["source"] == "schedule.md"
+
+
+def test_pruning_only_touches_the_ingested_corpus(tmp_path, counting_emb):
+    docs, other = tmp_path / "docs", tmp_path / "other"
+    docs.mkdir()
+    other.mkdir()
+    _write(docs, "bio.md", ["Karan is an ML engineer."])
+    _write(other, "faq.md", ["Parking is free on Saturday."])
+    store = FakeStore()
+    store.upsert(["fact"], ["Karan likes filter coffee."], [[1.0, 0.0]], [{}])     # e.g. from add_texts
+    ing = Ingestor(store, counting_emb())
+    ing.run(iter_files(str(docs)), corpus=corpus_name(str(docs)))
+    ing.run(iter_files(str(other)), corpus=corpus_name(str(other)))
+
+    _write(docs, "bio.md", ["Karan is a staff ML engineer."])
+    report = ing.run(iter_files(str(docs)), corpus=corpus_name(str(docs)))
+    assert report.pruned == 1                                                    # only the old bio chunk
+    assert {"fact", chunk_id("Parking is free on Saturday.")} <= set(store.rows)
+    assert Ingestor(store, counting_emb()).run(iter(())).pruned == 0            # no corpus → no pruning
+
+
+def test_embedding_calls_are_retried(tmp_path, monkeypatch, counting_emb):
+    monkeypatch.setattr(Ingestor._embed.retry, "wait", wait_none())
+    _write(tmp_path, "bio.md", ["Karan is an ML engineer."])
+    store, emb = FakeStore(), counting_emb(fail_first=2)
+
+    report = Ingestor(store, emb).run(iter_files(str(tmp_path)))
+    assert report.embedded == 1 and len(store.rows) == 1
+    assert emb.calls == 3
@@ -41,3 +41,34 @@ def test_image_flow(container):
     finally:
         _close(g)
 
+
+
+class FileTTS:
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+
+    def __call__(self, text):  # pragma: no cover - file path preferred
+        raise AssertionError("bytes path should not be used")
+
+    def to_file(self, text):
+        p = self.tmp_path / "out.mp3"
+        p.write_bytes(b"x" * 100_000)
+        return str(p)
+
+
+def test_audio_flow_keeps_only_a_path_in_state(container, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    container.tts = FileTTS(tmp_path)
+    g = build_graph(container, attach_conn_for_tests=True)
+    try:
+        cfg = {"configurable": {"thread_id": "t4"}}
+        out = g.invoke({"messages": [HumanMessage(content="send a voice note")]}, cfg)
+        assert out["audio_path"].endswith("out.mp3")
+        assert out.get("audio_buffer") is None
+
+        # the next turn clears the per-turn output from the checkpoint
+        nxt = g.invoke({"messages": [HumanMessage(content="thanks, what's next")]}, cfg)
+        assert nxt["response_type"] == "text"
+        assert nxt.get("audio_path") is None
+    finally:
+        _close(g)
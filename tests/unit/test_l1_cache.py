@@ -0,0 +1,133 @@
+import json
+import types
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.adapters.l1_cache import CachedDurableStore, CachedQAStore, RedisInvalidationBus, wrap_with_l1
+from app.adapters.memory_redis import RedisMemoryStore
+from app.adapters.telegram_handlers import _summarize_window
+from app.metrics import L1_CACHE_HIT_RATIO
+from app.utils.lru import MISSING, LRUTTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_lru_respects_byte_budget_and_recency():
+    c = LRUTTLCache("t_lru", max_bytes=400, ttl_seconds=0)
+    for i in range(3):
+        c.set(i, "x" * 50)
+    c.get(0)                 # 0 becomes most recent
+    c.set(3, "x" * 50)       # over budget → evict LRU (1)
+    assert c.size_bytes <= 400
+    assert c.get(1) is MISSING
+    assert c.get(0) == "x" * 50
+    c.set("huge", "x" * 1000)  # larger than the whole budget → not stored
+    assert c.get("huge") is MISSING
+
+
+def test_lru_ttl_none_values_and_hit_ratio():
+    clock = Clock()
+    c = LRUTTLCache("t_ttl", max_bytes=10_000, ttl_seconds=10, clock=clock)
+    c.set("no-summary", None)
+    assert c.get("no-summary") is None   # negative result is cached
+    clock.t = 11
+    assert c.get("no-summary") is MISSING
+    assert c.hit_ratio == 0.5
+    assert L1_CACHE_HIT_RATIO.labels(cache="t_ttl")._value.get() == 0.5
+
+
+class CountingDurable:
+    def __init__(self):
+        self.reads = 0
+        self.summary = {}
+
+    def get_summary(self, chat_id):
+        self.reads += 1
+        return self.summary.get(chat_id)
+
+    def set_summary(self, chat_id, text, *, covered=0):
+        self.summary[chat_id] = text
+
+    def add_message(self, **kw):
+        return "delegated"
+
+
+def test_cached_durable_store_reads_once_and_writes_through():
+    inner = CountingDurable()
+    store = CachedDurableStore(inner, LRUTTLCache("t_sum", max_bytes=10_000, ttl_seconds=60), None)
+    assert store.get_summary(1) is None
+    assert store.get_summary(1) is None
+    assert inner.reads == 1
+
+    store.set_summary(1, "likes rust")
+    assert store.get_summary(1) == "likes rust"
+    assert inner.reads == 1 and inner.summary[1] == "likes rust"
+    assert store.add_message(chat_id=1, role="user", content="x") == "delegated"
+
+
+def test_summarizer_reads_past_a_stale_l1_entry(monkeypatch):
+    monkeypatch.setattr("app.adapters.telegram_handlers.settings.window_size", 2)
+    shared = CountingDurable()                                  # one Postgres, two replicas, no bus
+    a = CachedDurableStore(shared, LRUTTLCache("t_sum_a", max_bytes=10_000, ttl_seconds=300), None)
+    b = CachedDurableStore(shared, LRUTTLCache("t_sum_b", max_bytes=10_000, ttl_seconds=300), None)
+    assert b.get_summary(3) is None                              # B caches "no summary"
+    a.set_summary(3, "they asked about the keynote")
+
+    class LLM:
+        def invoke(self, messages):
+            self.prompt = messages[0].content
+            return AIMessage(content="keynote; then lunch")
+
+    llm = LLM()
+    container = types.SimpleNamespace(llm=llm, durable_mem=b, short_mem=types.SimpleNamespace(
+        replace_window=lambda chat_id, msgs: None))
+    _summarize_window(container, 3, [HumanMessage(content="and lunch?"), AIMessage(content="at 1")])
+    assert "they asked about the keynote" in llm.prompt             # folded into the current summary
+    assert shared.summary[3] == "keynote; then lunch"
+
+
+def test_cached_qa_store_skips_redis_on_hot_keys(fake_redis):
+    store = CachedQAStore(RedisMemoryStore(), LRUTTLCache("t_qa", max_bytes=10_000, ttl_seconds=60), None)
+    q = dict(model="m", system_prompt=None, last_user_text="where is the venue?")
+    assert store.qa_get(**q) is None
+    store.qa_set(**q, answer="Hall B")
+
+    fake_redis.round_trips = 0
+    assert [store.qa_get(**q) for _ in range(5)] == ["Hall B"] * 5
+    assert fake_redis.round_trips == 0
+
+
+class FakePubClient:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, data):
+        self.published.append((channel, data))
+
+
+def test_invalidation_bus_evicts_on_other_replicas():
+    client = FakePubClient()
+    bus_a, bus_b = RedisInvalidationBus(client, "ch"), RedisInvalidationBus(client, "ch")
+    a = CachedDurableStore(CountingDurable(), LRUTTLCache("summary", max_bytes=10_000, ttl_seconds=60), bus_a)
+    b = CachedDurableStore(CountingDurable(), LRUTTLCache("summary", max_bytes=10_000, ttl_seconds=60), bus_b)
+    b.get_summary(7)                      # replica B caches "no summary"
+    a.set_summary(7, "new")               # replica A writes + publishes
+
+    channel, data = client.published[-1]
+    assert channel == "ch" and json.loads(data)["key"] == 7
+    bus_a.handle({"data": data})          # own message is ignored
+    assert a.l1.get(7) == "new"
+    bus_b.handle({"data": data})
+    assert b.l1.get(7) is MISSING
+
+
+def test_wrap_is_a_noop_when_disabled(monkeypatch):
+    monkeypatch.setattr("app.adapters.l1_cache.settings.l1_cache_enabled", False)
+    s, d = object(), object()
+    assert wrap_with_l1(s, d) == (s, d)
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import random
+import time
+import types
+
+import pytest
+
+from app.adapters import telegram_handlers as th
+from app.adapters.media_store import MediaStore
+from app.metrics import MEDIA_DISK_BYTES, MEDIA_FILES, MEDIA_FILES_REMOVED
+
+
+def _write(store, kind, size, mtime):
+    path = store.temp_path(kind, ".bin")
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_temp_paths_are_unique_and_temp_file_cleans_up(tmp_path):
+    store = MediaStore(str(tmp_path / "m"))
+    assert len({store.temp_path("voice", ".ogg") for _ in range(100)}) == 100
+    with store.temp_file("voice", ".ogg") as p:
+        open(p, "wb").close()
+        assert os.path.exists(p)
+    assert not os.path.exists(p)
+
+
+def test_sweep_removes_expired_then_oldest_and_updates_gauges(tmp_path):
+    store = MediaStore(str(tmp_path / "m"), max_bytes=250, max_age_seconds=100)
+    old = _write(store, "images", 100, mtime=1_000)
+    a = _write(store, "images", 100, mtime=1_950)
+    b = _write(store, "tts", 100, mtime=1_960)
+    c = _write(store, "tts", 100, mtime=1_970)
+    by_age = MEDIA_FILES_REMOVED.labels(reason="age")._value.get()
+    by_size = MEDIA_FILES_REMOVED.labels(reason="size")._value.get()
+
+    assert store.sweep(now=2_000) == 2
+    assert not os.path.exists(old) and not os.path.exists(a)
+    assert os.path.exists(b) and os.path.exists(c)
+    assert MEDIA_FILES_REMOVED.labels(reason="age")._value.get() - by_age == 1
+    assert MEDIA_FILES_REMOVED.labels(reason="size")._value.get() - by_size == 1
+    assert MEDIA_FILES.labels(kind="images")._value.get() == 0
+    assert MEDIA_FILES.labels(kind="tts")._value.get() == 2
+    assert MEDIA_DISK_BYTES.labels(kind="tts")._value.get() == 200
+
+
+def test_sweep_skips_files_deleted_while_scanning(tmp_path, monkeypatch):
+    store = MediaStore(str(tmp_path / "m"), max_bytes=150, max_age_seconds=0)
+    gone = _write(store, "voice", 100, mtime=1_000)
+    kept = _write(store, "tts", 100, mtime=1_100)
+    newest = _write(store, "tts", 100, mtime=1_200)
+    real_scandir = os.scandir
+
+    def racing_scandir(path):
+        entries = list(real_scandir(path))
+        if any(e.path == gone for e in entries):
+            os.remove(gone)                      # the reply was sent between listing and stat
+        return iter(entries)
+
+    monkeypatch.setattr("app.adapters.media_store.os.scandir", racing_scandir)
+    assert store.sweep(now=2_000) == 1
+    assert not os.path.exists(kept) and os.path.exists(newest)
+
+
+# ---- 50 concurrent voice notes ----
+
+class FakeTgFile:
+    """Telegram File whose payload identifies the note; downloads take a while."""
+    def __init__(self, payload: bytes):
+        self.payload = payload
+
+    async def download_to_memory(self, out):
+        await asyncio.sleep(random.uniform(0, 0.01))
+        out.write(self.payload)
+
+    async def download_to_drive(self, path):
+        await asyncio.sleep(random.uniform(0, 0.01))
+        with open(path, "wb") as f:
+            f.write(self.payload)
+
+
+class FakeBot:
+    async def get_file(self, file_id):
+        return FakeTgFile(f"note-{file_id}".encode())
+
+
+class FakeWhisper:
+    """Transcribes a note by echoing its bytes (after a blocking delay)."""
+    class audio:
+        class transcriptions:
+            @staticmethod
+            def create(file, model):
+                time.sleep(random.uniform(0, 0.005))
+                return types.SimpleNamespace(text=file.read().decode())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_voice_notes_get_their_own_transcription(container, monkeypatch):
+    # 6-byte limit: notes 0-9 ("note-0") stay in memory, the rest go to disk
+    monkeypatch.setattr(th.settings, "media_inline_max_bytes", 6)
+    container.openai = types.SimpleNamespace(for_op=lambda op: FakeWhisper)
+    monkeypatch.setattr(th, "_ensure_identity", lambda c, u: None)
+    seen = {}
+
+    async def fake_turn(graph, c, update, context, user_msg):
+        seen[update.effective_chat.id] = user_msg
+
+    monkeypatch.setattr(th, "_run_turn", fake_turn)
+    ctx = types.SimpleNamespace(
+        bot=FakeBot(), application=types.SimpleNamespace(bot_data={"container": container})
+    )
+
+    def update(i):
+        voice = types.SimpleNamespace(file_id=str(i), file_size=len(f"note-{i}"))
+        return types.SimpleNamespace(
+            effective_chat=types.SimpleNamespace(id=i),
+            message=types.SimpleNamespace(voice=voice),
+        )
+
+    await asyncio.gather(*(th.handle_voice(None, update(i), ctx) for i in range(50)))
+
+    assert seen == {i: f"note-{i}" for i in range(50)}
+    # disk downloads were cleaned up
+    voice_dir = os.path.join(th.get_media_store().root, "voice")
+    assert not os.listdir(voice_dir)
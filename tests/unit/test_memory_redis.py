@@ -0,0 +1,49 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.adapters.memory_redis import AsyncRedisMemoryStore, RedisMemoryStore
+
+
+def test_append_turn_is_one_round_trip(fake_redis):
+    store = RedisMemoryStore()
+    fake_redis.round_trips = 0
+    window = store.append_turn(7, [HumanMessage(content="q"), AIMessage(content="a")], fetch=10)
+    assert fake_redis.round_trips == 1
+    assert [m.content for m in window] == ["q", "a"]
+    assert isinstance(window[0], HumanMessage) and isinstance(window[1], AIMessage)
+
+
+def test_window_is_trimmed_and_ordered(fake_redis):
+    store = RedisMemoryStore()
+    store.window = 4
+    for i in range(5):
+        store.append_turn(7, [HumanMessage(content=f"q{i}"), AIMessage(content=f"a{i}")])
+    assert [m.content for m in store.get_window(7)] == ["q3", "a3", "q4", "a4"]
+    assert fake_redis.ttl[store._k(7)] == store.ttl
+
+
+def test_replace_window(fake_redis):
+    store = RedisMemoryStore()
+    store.append_turn(7, [HumanMessage(content="q")])
+    fake_redis.round_trips = 0
+    store.replace_window(7, [SystemMessage(content="(summary) s")])
+    assert fake_redis.round_trips == 1
+    assert [m.content for m in store.get_window(7)] == ["(summary) s"]
+
+
+# ---- async store ----
+
+
+@pytest.mark.asyncio
+async def test_async_store_shares_keys_with_sync_store(fake_redis):
+    store = AsyncRedisMemoryStore()
+    fake_redis.round_trips = 0
+    window = await store.append_turn(7, [HumanMessage(content="q"), AIMessage(content="a")], fetch=10)
+    assert fake_redis.round_trips == 1
+    assert [m.content for m in window] == ["q", "a"]
+    assert [m.content for m in RedisMemoryStore().get_window(7)] == ["q", "a"]
+
+    await store.replace_window(7, [SystemMessage(content="(summary) s")])
+    assert [m.content for m in await store.get_window(7)] == ["(summary) s"]
+    await store.clear(7)
+    assert await store.get_window(7) == []
@@ -0,0 +1,38 @@
+import pytest
+
+from app.adapters import openai_clients as oc
+from app.adapters.llm_openai import build_llm
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    c = oc.OpenAIClients(api_key="test")
+    monkeypatch.setattr(oc, "_clients", c)
+    yield c
+    c.close()
+
+
+def test_operation_clients_share_one_pool(clients, monkeypatch):
+    monkeypatch.setattr(oc.settings, "openai_transcribe_timeout_sec", 60.0)
+    monkeypatch.setattr(oc.settings, "openai_image_timeout_sec", 120.0)
+
+    whisper, image = clients.for_op("transcribe"), clients.for_op("image")
+    assert whisper._client is clients.http and image._client is clients.http
+    assert whisper.timeout.read == 60.0 and image.timeout.read == 120.0
+    assert clients.for_op("transcribe") is whisper          # built once
+    assert clients.afor_op("vision")._client is clients.ahttp
+    assert oc.get_openai_clients() is clients
+
+
+def test_http2_needs_the_h2_package(monkeypatch):
+    monkeypatch.setattr(oc.settings, "openai_http2", True)
+    monkeypatch.setattr(oc.importlib.util, "find_spec", lambda name: None)
+    assert oc.http2_available() is False
+    monkeypatch.setattr(oc.settings, "openai_http2", False)
+    assert oc.http2_available() is False
+
+
+def test_chat_model_reuses_the_shared_pool(clients):
+    llm = build_llm(clients)
+    assert llm.root_client._client is clients.http
+    assert llm.root_async_client._client is clients.ahttp
@@ -0,0 +1,203 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.adapters.retrieval import CachedQueryEmbeddings, Retriever
+from app.metrics import RETRIEVAL_REQUESTS
+from app.workflows.karan_graph import _needs_retrieval, build_graph
+
+
+class FakeVector:
+    def __init__(self, docs=("Karan works on recommender systems.", "Karan speaks at 3pm."), block=None):
+        self.docs = [Document(page_content=d) for d in docs]
+        self.block = block
+        self.calls = 0
+
+    def search(self, query, k=3):
+        self.calls += 1
+        if self.block is not None:
+            self.block.wait(2)
+        return self.docs[:k]
+
+
+class PromptLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages)
+        return AIMessage(content="answer")
+
+
+def _count(result):
+    return RETRIEVAL_REQUESTS.labels(result=result)._value.get()
+
+
+def test_results_are_cached_per_normalized_question():
+    vec = FakeVector()
+    r = Retriever(vec, k=2, timeout_seconds=1)
+    hits = _count("hit")
+
+    assert r.retrieve("What is your talk about?") == ["Karan works on recommender systems.", "Karan speaks at 3pm."]
+    assert r.retrieve("  what is your TALK about? ") == r.retrieve("What is your talk about?")
+    assert vec.calls == 1
+    assert _count("hit") - hits == 2
+
+
+def test_timeout_answers_without_facts_then_warms_the_cache():
+    gate = threading.Event()
+    vec = FakeVector(block=gate)
+    r = Retriever(vec, k=1, timeout_seconds=0.05)
+    timeouts = _count("timeout")
+
+    assert r.retrieve("where do you work?") is None
+    assert _count("timeout") - timeouts == 1
+
+    gate.set()                                   # the slow search finishes in the background
+    for _ in range(100):
+        if r.cache.get("where do you work?", None) is not None:
+            break
+        time.sleep(0.01)
+    assert r.retrieve("where do you work?") == ["Karan works on recommender systems."]
+    assert vec.calls == 1
+
+
+def test_search_error_is_swallowed():
+    class Broken:
+        def search(self, query, k=3):
+            raise RuntimeError("chroma down")
+
+    errors = _count("error")
+    assert Retriever(Broken(), timeout_seconds=1).retrieve("who are you?") is None
+    assert _count("error") - errors == 1
+
+
+def test_query_embeddings_are_memoized():
+    class Emb:
+        calls = 0
+
+        def embed_query(self, text):
+            Emb.calls += 1
+            return [0.5, 0.25]
+
+    emb = CachedQueryEmbeddings(Emb())
+    assert emb.embed_query("Where are you from?") == [0.5, 0.25]
+    assert emb.embed_query("where are you  from?") == [0.5, 0.25]
+    assert Emb.calls == 1
+
+
+def test_concurrent_first_retrievals_share_one_pool(monkeypatch):
+    monkeypatch.setattr(Retriever, "_pool", None)
+    created = []
+    real = ThreadPoolExecutor
+
+    class SlowPool(real):
+        def __init__(self, *a, **kw):
+            time.sleep(0.05)                     # widen the check-then-create window
+            created.append(self)
+            super().__init__(*a, **kw)
+
+    monkeypatch.setattr("app.adapters.retrieval.ThreadPoolExecutor", SlowPool)
+    start = threading.Barrier(8)
+
+    def first(_):
+        start.wait()
+        return Retriever._executor()
+
+    with real(8) as ex:
+        pools = set(ex.map(first, range(8)))
+    assert len(created) == 1 and pools == {created[0]}
+    created[0].shutdown()
+
+
+def test_router_heuristic():
+    assert _needs_retrieval("what's your talk at the summit about?")
+    assert _needs_retrieval("where are you from?")
+    assert not _needs_retrieval("how are you?")
+    assert not _needs_retrieval("thanks, that was great")
+
+
+def _run(container, text, thread):
+    g = build_graph(container, attach_conn_for_tests=True)
+    try:
+        return g.invoke({"messages": [HumanMessage(content=text)]}, {"configurable": {"thread_id": thread}})
+    finally:
+        conn = getattr(g, "_conn", None)
+        if conn:
+            conn.close()
+
+
+def test_graph_puts_facts_in_the_prompt(container, monkeypatch):
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    vec, llm = FakeVector(), PromptLLM()
+    container.llm, container.retriever = llm, Retriever(vec, k=2, timeout_seconds=1)
+
+    out = _run(container, "what is your talk at the summit about?", "r1")
+    facts = [m for m in llm.prompts[0] if isinstance(m, SystemMessage) and m.content.startswith("Facts about Karan")]
+    assert len(facts) == 1 and "speaks at 3pm" in facts[0].content
+    assert out.get("retrieved") is None          # per-turn field cleared for the checkpoint
+
+    _run(container, "thanks!", "r1")             # small talk skips the search
+    assert vec.calls == 1
+    assert not any(str(m.content).startswith("Facts about Karan") for m in llm.prompts[1])
+
+
+def test_timed_out_answer_is_not_cached(container, monkeypatch):
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    gate = threading.Event()
+    container.llm = PromptLLM()
+    container.retriever = Retriever(FakeVector(block=gate), timeout_seconds=0.01)
+    try:
+        out = _run(container, "where do you work these days?", "r2")
+    finally:
+        gate.set()
+    assert out["messages"][-1].content == "answer"
+    assert container.short_mem._cache == {}
+
+
+class CountingRetriever:
+    def __init__(self, snippets=("Karan speaks at 3pm.",)):
+        self.snippets = list(snippets) if snippets is not None else None
+        self.calls = 0
+
+    def retrieve(self, query):
+        self.calls += 1
+        return self.snippets
+
+
+def test_exact_cache_hit_skips_retrieval(container, monkeypatch):
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    container.llm, container.retriever = PromptLLM(), CountingRetriever()
+
+    _run(container, "when is your talk at the summit?", "r3")
+    _run(container, "when is your talk at the summit?", "r4")   # exact hit from the first turn
+    assert container.retriever.calls == 1
+    assert len(container.llm.prompts) == 1
+
+
+class SlowLLM(PromptLLM):
+    def invoke(self, messages):
+        time.sleep(0.2)
+        return super().invoke(messages)
+
+
+def test_degraded_turns_are_not_coalesced(container, monkeypatch):
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    container.llm, container.retriever = SlowLLM(), CountingRetriever(snippets=None)   # search keeps failing
+
+    g = build_graph(container, attach_conn_for_tests=True)
+
+    def ask(i):
+        out = g.invoke({"messages": [HumanMessage(content="where do you work now?")]},
+                       {"configurable": {"thread_id": f"r5-{i}"}})
+        return out["messages"][-1].content
+
+    try:
+        with ThreadPoolExecutor(3) as ex:
+            assert list(ex.map(ask, range(3))) == ["answer"] * 3
+    finally:
+        g._conn.close()
+    assert len(container.llm.prompts) == 3                       # each degraded turn answers on its own
@@ -0,0 +1,114 @@
+import re
+import zlib
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.adapters.semantic_cache import SemanticQACache
+from app.metrics import SEMANTIC_CACHE
+from app.workflows.karan_graph import build_graph
+
+
+class BagOfWordsEmbeddings:
+    """Local, deterministic embedding: hashed bag of words (ignores stop words)."""
+    STOP = {"the", "a", "is", "does", "what", "when", "to", "of"}
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        v = [0.0] * self.dim
+        for w in re.findall(r"[a-z]+", text.lower()):
+            if w not in self.STOP:
+                v[zlib.crc32(w.encode()) % self.dim] += 1.0
+        return v
+
+
+def _count(result):
+    return SEMANTIC_CACHE.labels(result=result)._value.get()
+
+
+def test_paraphrase_hits_and_scopes_are_isolated():
+    cache = SemanticQACache(BagOfWordsEmbeddings(), threshold=0.8, near_miss_margin=0.1, min_chars=1)
+    cache.store("when does the keynote start?", "10am", scope="s1")
+
+    hits = _count("hit")
+    assert cache.lookup("what time does the keynote start", scope="s1").answer == "10am"
+    assert _count("hit") == hits + 1
+    assert cache.lookup("what time does the keynote start", scope="s2").answer is None
+
+
+def test_near_miss_and_miss_are_counted():
+    cache = SemanticQACache(BagOfWordsEmbeddings(), threshold=0.99, near_miss_margin=0.5, min_chars=1)
+    cache.store("keynote start time", "10am")
+
+    near, miss = _count("near_miss"), _count("miss")
+    r = cache.lookup("keynote start")  # similar but below threshold
+    assert r.answer is None and 0.49 <= r.score < 0.99
+    assert cache.lookup("favourite pizza topping").answer is None
+    assert (_count("near_miss"), _count("miss")) == (near + 1, miss + 1)
+
+
+def test_eviction_and_ttl():
+    cache = SemanticQACache(BagOfWordsEmbeddings(), max_entries=2, min_chars=1, ttl_seconds=0)
+    for q in ("alpha question", "beta question", "gamma question"):
+        cache.store(q, q.upper())
+    assert len(cache) == 2
+    assert cache.lookup("alpha question").answer is None
+
+    cache.ttl = 1
+    cache._scopes[cache._scope_key(None)].ts[:] = [0.0, 0.0]
+    assert cache.lookup("beta question").answer is None
+    assert len(cache) == 0
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content="The keynote starts at 10am.")
+
+
+def test_text_node_answers_paraphrase_from_semantic_cache(container, monkeypatch):
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    emb = BagOfWordsEmbeddings()
+    container.llm = CountingLLM()
+    container.semantic_cache = SemanticQACache(emb, threshold=0.8)
+    g = build_graph(container, attach_conn_for_tests=True)
+    try:
+        for i, q in enumerate(["when does the keynote start?", "what time does the keynote start"]):
+            out = g.invoke({"messages": [HumanMessage(content=q)]},
+                           {"configurable": {"thread_id": f"sem{i}"}})
+            assert out["messages"][-1].content == "The keynote starts at 10am."
+        assert container.llm.calls == 1
+        assert emb.calls == 2  # the miss's vector is reused for store()
+
+        # the paraphrase was promoted to the exact-match tier
+        g.invoke({"messages": [HumanMessage(content="what time does the keynote start")]},
+                 {"configurable": {"thread_id": "sem2"}})
+        assert emb.calls == 2
+    finally:
+        g._conn.close()
+
+
+def test_embedding_failure_fails_open(container, monkeypatch):
+    class BrokenEmbeddings:
+        def embed_query(self, text):
+            raise ConnectionError("embeddings API down")
+
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    container.llm = CountingLLM()
+    container.semantic_cache = SemanticQACache(BrokenEmbeddings(), min_chars=1)
+    errors = _count("error")
+    g = build_graph(container, attach_conn_for_tests=True)
+    try:
+        out = g.invoke({"messages": [HumanMessage(content="when does the keynote start?")]},
+                       {"configurable": {"thread_id": "sem-err"}})
+    finally:
+        g._conn.close()
+    assert out["messages"][-1].content == "The keynote starts at 10am."
+    assert container.llm.calls == 1
+    assert _count("error") - errors == 2   # lookup and store
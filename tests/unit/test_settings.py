@@ -3,3 +3,7 @@ from app.config.settings import settings
 def test_defaults():
     assert settings.env in {"dev", "prod", "test"}
     assert settings.app_log_file.endswith("app.log")
+
+
+def test_image_variant_pool_is_opt_in():
+    assert settings.image_pool_size == 1
@@ -0,0 +1,94 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.metrics import QA_SINGLEFLIGHT
+from app.utils.singleflight import SingleFlight
+from app.workflows.karan_graph import build_graph
+
+
+def test_concurrent_calls_share_one_execution():
+    sf = SingleFlight()
+    calls = []
+    gate = threading.Event()
+
+    def work():
+        calls.append(1)
+        gate.wait(1)
+        return "answer"
+
+    with ThreadPoolExecutor(8) as ex:
+        futs = [ex.submit(sf.do, "k", work) for _ in range(8)]
+        time.sleep(0.05)
+        gate.set()
+        results = [f.result() for f in futs]
+
+    assert len(calls) == 1
+    assert all(v == "answer" for v, _ in results)
+    assert sorted(how for _, how in results).count("shared") == 7
+    assert sf.inflight() == 0
+
+
+def test_waiter_falls_back_on_timeout_and_leader_error():
+    sf = SingleFlight()
+    gate = threading.Event()
+
+    def slow():
+        gate.wait(1)
+        return "slow"
+
+    with ThreadPoolExecutor(2) as ex:
+        leader = ex.submit(sf.do, "k", slow)
+        time.sleep(0.02)
+        assert sf.do("k", lambda: "own", timeout=0.01) == ("own", "timeout")
+        gate.set()
+        assert leader.result() == ("slow", "leader")
+
+    def boom():
+        time.sleep(0.05)
+        raise RuntimeError("llm down")
+
+    with ThreadPoolExecutor(1) as ex:
+        leader = ex.submit(sf.do, "k", boom)
+        time.sleep(0.01)
+        assert sf.do("k", lambda: "own") == ("own", "leader_error")
+        with pytest.raises(RuntimeError):
+            leader.result()
+
+
+class SlowCountingLLM:
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.3)
+        return AIMessage(content="Registration opens at 8am.")
+
+
+def test_text_node_coalesces_identical_misses(container, monkeypatch):
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    container.llm = SlowCountingLLM()
+    g = build_graph(container, attach_conn_for_tests=True)
+    shared = QA_SINGLEFLIGHT.labels(result="shared")._value.get()
+
+    def ask(i):
+        out = g.invoke({"messages": [HumanMessage(content="When does registration open?")]},
+                       {"configurable": {"thread_id": f"sf{i}"}})
+        return out["messages"][-1].content
+
+    try:
+        with ThreadPoolExecutor(6) as ex:
+            answers = list(ex.map(ask, range(6)))
+    finally:
+        g._conn.close()
+
+    assert answers == ["Registration opens at 8am."] * 6
+    assert container.llm.calls == 1
+    # requests that arrive after the leader finished hit the exact cache instead
+    assert QA_SINGLEFLIGHT.labels(result="shared")._value.get() - shared >= 1
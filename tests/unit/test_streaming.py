@@ -0,0 +1,260 @@
+import types
+
+import pytest
+from tenacity import wait_none
+from langchain_core.messages import AIMessage, AIMessageChunk
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+from app.adapters import telegram_handlers as th
+from app.adapters.llm_openai import LLMWithMetrics
+from app.adapters.telegram_streaming import CURSOR, ProgressiveReply, split_message
+from app.metrics import LLM_TTFT
+from app.workflows.karan_graph import build_graph
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class SentMsg:
+    def __init__(self, text, fail_with=None):
+        self.text = text
+        self.edits = []
+        self.fail_with = fail_with
+
+    async def edit_text(self, text):
+        if self.fail_with is not None:
+            e, self.fail_with = self.fail_with, None
+            raise e
+        self.text = text
+        self.edits.append(text)
+
+
+class UserMsg:
+    def __init__(self, text="hello"):
+        self.text = text
+        self.replies = []
+
+    async def reply_text(self, t):
+        m = SentMsg(t)
+        self.replies.append(m)
+        return m
+
+
+@pytest.mark.asyncio
+async def test_progressive_reply_throttles_edits():
+    clock, msg = Clock(), UserMsg()
+    r = ProgressiveReply(msg, min_interval=1.0, min_chars=5, clock=clock)
+
+    await r.feed("Hi")                      # placeholder posted on first text
+    assert len(msg.replies) == 1 and msg.replies[0].text.startswith("Hi")
+    await r.feed(" there, friend")          # too soon → no edit
+    assert r.edits == 0
+    clock.t = 1.5
+    await r.feed("!")                       # interval passed + enough new chars
+    assert r.edits == 1
+    await r.feed("!")                       # too few new chars
+    clock.t = 3.0
+    await r.feed("?")
+    assert r.edits == 1
+
+    await r.finish("Hi there, friend!!?")
+    assert msg.replies[0].text == "Hi there, friend!!?"
+    assert len(msg.replies) == 1
+
+
+@pytest.mark.asyncio
+async def test_progressive_reply_pauses_on_flood_control():
+    clock, msg = Clock(), UserMsg()
+    r = ProgressiveReply(msg, min_interval=0, min_chars=1, clock=clock)
+    await r.feed("a")
+    r.sent.fail_with = RetryAfter(5)
+    await r.feed("b")                       # flood control → paused, no raise
+    await r.feed("c")
+    assert r.edits == 0
+    clock.t = 6
+    await r.feed("d")
+    assert r.edits == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_edit_stops_edits_and_final_text_is_resent():
+    clock, msg = Clock(), UserMsg()
+    r = ProgressiveReply(msg, min_interval=0, min_chars=1, clock=clock)
+    await r.feed("a")
+    r.sent.fail_with = TimedOut()
+    await r.feed("b")                       # swallowed; edits disabled
+    r.sent.fail_with = BadRequest("Message to edit not found")
+    await r.feed("c")
+    assert r.edits == 0
+
+    await r.finish("abc")                   # the edit fails again → new message
+    assert [m.text for m in msg.replies] == ["a" + CURSOR, "abc"]
+
+
+def test_split_message_prefers_newlines():
+    text = "a" * 3000 + "\n" + "b" * 3000
+    assert split_message(text) == ["a" * 3000, "b" * 3000]
+    assert [len(c) for c in split_message("x" * 5000)] == [4096, 904]
+
+
+class StreamingInner:
+    def stream(self, messages):
+        for t in ["Hel", "lo", " world", ""]:
+            yield AIMessageChunk(content=t)
+
+
+def test_llm_stream_records_ttft():
+    before = LLM_TTFT.labels("s")._sum.get()
+    chunks = list(LLMWithMetrics(StreamingInner(), model="s").stream([]))
+    assert "".join(c.content for c in chunks) == "Hello world"
+    assert LLM_TTFT.labels("s")._sum.get() > before
+
+
+class StreamingLLM:
+    def invoke(self, messages):  # pragma: no cover - streaming path only
+        return AIMessage(content="unused")
+
+    def stream(self, messages):
+        for t in ["The keynote ", "starts at ", "10am in Hall B."]:
+            yield AIMessageChunk(content=t)
+
+
+@pytest.mark.asyncio
+async def test_handle_text_streams_into_one_edited_message(container, monkeypatch):
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    monkeypatch.setattr(th.settings, "tg_stream_min_chars", 1)
+    monkeypatch.setattr(th.settings, "tg_stream_edit_interval_seconds", 0.0)
+    container.llm = StreamingLLM()
+    container.durable_mem.ensure_user = lambda **kw: None
+    container.durable_mem.ensure_chat = lambda **kw: None
+    g = build_graph(container, attach_conn_for_tests=True)
+
+    msg = UserMsg("when is the keynote")
+    update = types.SimpleNamespace(
+        effective_user=types.SimpleNamespace(id=1, first_name="A", last_name=None, username=None),
+        effective_chat=types.SimpleNamespace(id=1, type="private", title=None),
+        message=msg,
+    )
+    ctx = types.SimpleNamespace(application=types.SimpleNamespace(bot_data={"container": container}))
+    try:
+        await th.handle_text(g, update, ctx)
+    finally:
+        g._conn.close()
+
+    assert len(msg.replies) == 1
+    sent = msg.replies[0]
+    assert sent.text == "The keynote starts at 10am in Hall B."
+    assert sent.edits  # progressively edited, not re-sent
+
+
+class FlakyUserMsg(UserMsg):
+    """Every edit of the placeholder fails with a network error."""
+
+    async def reply_text(self, t):
+        m = await super().reply_text(t)
+        m.edit_text = self._fail
+        return m
+
+    async def _fail(self, text):
+        raise NetworkError("connection reset")
+
+
+@pytest.mark.asyncio
+async def test_edit_errors_do_not_abort_the_turn(container, monkeypatch):
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    monkeypatch.setattr(th.settings, "tg_stream_min_chars", 1)
+    monkeypatch.setattr(th.settings, "tg_stream_edit_interval_seconds", 0.0)
+    container.llm = StreamingLLM()
+    container.durable_mem.ensure_user = lambda **kw: None
+    container.durable_mem.ensure_chat = lambda **kw: None
+    after = []
+
+    async def _after_turn(c, chat_id, user_msg, ai_text):
+        after.append(ai_text)
+
+    monkeypatch.setattr(th, "_after_turn", _after_turn)
+    g = build_graph(container, attach_conn_for_tests=True)
+
+    msg = FlakyUserMsg("when is the keynote")
+    update = types.SimpleNamespace(
+        effective_user=types.SimpleNamespace(id=2, first_name="A", last_name=None, username=None),
+        effective_chat=types.SimpleNamespace(id=2, type="private", title=None),
+        message=msg,
+    )
+    ctx = types.SimpleNamespace(application=types.SimpleNamespace(bot_data={"container": container}))
+    try:
+        await th.handle_text(g, update, ctx)
+    finally:
+        g._conn.close()
+
+    assert msg.replies[-1].text == "The keynote starts at 10am in Hall B."
+    assert after == ["The keynote starts at 10am in Hall B."]
+
+
+class BrokenStreamLLM:
+    """Streams `partial` and then fails; `invoke` (the fallback) answers unless `invoke_fails`."""
+
+    def __init__(self, partial=(), invoke_fails=False):
+        self.partial, self.invoke_fails = list(partial), invoke_fails
+        self.invokes = 0
+
+    def stream(self, messages):
+        yield from (AIMessageChunk(content=t) for t in self.partial)
+        raise RuntimeError("upstream 502")
+
+    def invoke(self, messages):
+        self.invokes += 1
+        if self.invoke_fails:
+            raise RuntimeError("upstream 502")
+        return AIMessage(content="The keynote is at 10am.")
+
+
+async def _stream_turn(container, monkeypatch, llm, msg, chat_id):
+    monkeypatch.setattr("app.workflows.karan_graph.random.random", lambda: 0.0)
+    monkeypatch.setattr(th.settings, "tg_stream_min_chars", 1)
+    monkeypatch.setattr(th.settings, "tg_stream_edit_interval_seconds", 0.0)
+    monkeypatch.setattr(th._graph_invoke_timed.retry, "wait", wait_none())
+    container.llm = llm
+    container.durable_mem.ensure_user = lambda **kw: None
+    container.durable_mem.ensure_chat = lambda **kw: None
+    g = build_graph(container, attach_conn_for_tests=True)
+    update = types.SimpleNamespace(
+        effective_user=types.SimpleNamespace(id=chat_id, first_name="A", last_name=None, username=None),
+        effective_chat=types.SimpleNamespace(id=chat_id, type="private", title=None),
+        message=msg,
+    )
+    ctx = types.SimpleNamespace(application=types.SimpleNamespace(bot_data={"container": container}))
+    try:
+        await th.handle_text(g, update, ctx)
+    finally:
+        g._conn.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_falls_back_to_a_retried_invoke(container, monkeypatch):
+    llm, msg = BrokenStreamLLM(), UserMsg("when is the keynote")
+    await _stream_turn(container, monkeypatch, llm, msg, chat_id=3)
+    assert llm.invokes == 1
+    assert [m.text for m in msg.replies] == ["The keynote is at 10am."]
+
+
+@pytest.mark.asyncio
+async def test_stream_failing_after_the_placeholder_replaces_the_partial_text(container, monkeypatch):
+    msg = UserMsg("when is the keynote")
+    await _stream_turn(container, monkeypatch, BrokenStreamLLM(partial=["The keyn"]), msg, chat_id=4)
+    assert len(msg.replies) == 1
+    assert msg.replies[0].text == "The keynote is at 10am."
+
+
+@pytest.mark.asyncio
+async def test_placeholder_gets_an_apology_when_the_fallback_fails(container, monkeypatch):
+    llm, msg = BrokenStreamLLM(partial=["The keyn"], invoke_fails=True), UserMsg("when is the keynote")
+    with pytest.raises(RuntimeError):
+        await _stream_turn(container, monkeypatch, llm, msg, chat_id=5)
+    assert llm.invokes == 3                                      # the fallback is retried
+    assert [m.text for m in msg.replies] == [th._FAILED_REPLY]  # no partial answer left behind
@@ -12,3 +12,98 @@ def test_summarize_window_uses_last_20():
     window = [HumanMessage(content=f"m{i}") for i in range(30)]
     out = summarize_window(llm, window)
     assert out == "short summary"
+
+
+class RecordingLLM:
+    def __init__(self):
+        self.inputs = []
+
+    def invoke(self, messages):
+        self.inputs.append(messages[0].content)
+        class R: content = f"summary after cycle {len(self.inputs)} " + "facts " * 60
+        return R()
+
+
+def test_incremental_summary_cost_stays_flat():
+    from langchain_core.messages import AIMessage, SystemMessage
+    from app.adapters.summarizer import summarize_incremental
+
+    llm = RecordingLLM()
+    summary = None
+    for cycle in range(50):
+        delta = [SystemMessage(content="(summary) stale copy")]  # legacy window entry is ignored
+        for i in range(15):
+            delta += [HumanMessage(content=f"question {cycle}.{i} " * 5), AIMessage(content="answer " * 20)]
+        summary, folded = summarize_incremental(llm, summary, delta, max_input_tokens=600)
+        assert folded == delta[1:len(folded) + 1]               # an oldest prefix, minus the stale entry
+
+    sizes = [len(p) for p in llm.inputs]
+    assert max(sizes[-10:]) <= max(sizes[:10]) * 1.1
+    assert max(sizes) < 600 * 4 + 400                          # budget (+ instructions)
+    assert "summary after cycle 49" in llm.inputs[-1]           # previous summary carried once
+    assert "stale copy" not in llm.inputs[-1]
+    assert "question 49.0" in llm.inputs[-1]                    # oldest messages folded first
+    assert 0 < len(folded) < 30
+
+
+def test_set_summary_records_cursor_and_timestamp(tmp_path):
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import sessionmaker
+    from app.adapters.memory_postgres import PgDurableStore
+    from app.db import Base, ChatMemory
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'mem.db'}")
+    Base.metadata.create_all(engine)
+    store = PgDurableStore(sessionmaker(bind=engine))
+    store.set_summary(1, "first", covered=30)
+    store.set_summary(1, "second", covered=28)
+
+    assert store.get_summary(1) == "second"
+    with engine.connect() as conn:
+        row = conn.execute(select(ChatMemory.last_summary_at, ChatMemory.flags)).one()
+    assert row.last_summary_at is not None
+    assert row.flags["summary_cursor"] == 58
+    engine.dispose()
+
+
+def test_summary_upsert_bumps_updated_at(tmp_path):
+    import datetime as dt
+    from sqlalchemy import create_engine, select, update
+    from sqlalchemy.orm import sessionmaker
+    from app.adapters.memory_postgres import PgDurableStore
+    from app.db import Base, ChatMemory
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'mem.db'}")
+    Base.metadata.create_all(engine)
+    store = PgDurableStore(sessionmaker(bind=engine))
+    store.set_summary(1, "first")
+    with engine.begin() as conn:
+        conn.execute(update(ChatMemory).values(updated_at=dt.datetime(2000, 1, 1)))
+    store.set_summary(1, "second")
+
+    with engine.connect() as conn:
+        assert conn.execute(select(ChatMemory.updated_at)).scalar_one().year > 2000
+    engine.dispose()
+
+
+def test_set_summary_increments_the_cursor_in_one_statement(tmp_path):
+    from sqlalchemy import create_engine, event, insert, select
+    from sqlalchemy.orm import sessionmaker
+    from app.adapters.memory_postgres import PgDurableStore
+    from app.db import Base, ChatMemory
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'mem.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(ChatMemory).values(chat_id=1, flags={"pinned": True}))
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cur, sql, *a: statements.append(sql))
+
+    store = PgDurableStore(sessionmaker(bind=engine))
+    store.set_summary(1, "first", covered=4)
+    store.set_summary(1, "second", covered=3)
+
+    assert [sql.split()[0] for sql in statements] == ["INSERT", "INSERT"]   # no read-modify-write
+    with engine.connect() as conn:
+        assert conn.execute(select(ChatMemory.flags)).scalar_one() == {"pinned": True, "summary_cursor": 7}
+    engine.dispose()
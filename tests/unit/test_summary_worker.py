@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.adapters import telegram_handlers as th
+from app.adapters.memory_redis import RedisMemoryStore
+from app.adapters.summary_worker import SummaryWorker
+from app.metrics import SUMMARY_JOBS
+
+
+@pytest.mark.asyncio
+async def test_dedupes_per_chat_and_caps_concurrency():
+    running, peak, gate = [0], [0], threading.Event()
+    lock = threading.Lock()
+
+    def job(_):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        gate.wait(2)
+        with lock:
+            running[0] -= 1
+
+    deduped = SUMMARY_JOBS.labels(result="deduped")._value.get()
+    w = SummaryWorker(max_concurrency=2)
+    assert [w.submit(chat, job, chat) for chat in (1, 2, 3)] == [True, True, True]
+    assert w.submit(1, job, 1) is False                       # already pending for chat 1
+    await asyncio.sleep(0.05)
+    gate.set()
+    await w.drain(timeout=2)
+    assert peak[0] == 2
+    assert not w.pending(1)
+    assert SUMMARY_JOBS.labels(result="deduped")._value.get() - deduped == 1
+
+
+class SlowSummaryLLM:
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        self.release.wait(2)
+        return AIMessage(content="they talked about the keynote")
+
+
+@pytest.mark.asyncio
+async def test_after_turn_does_not_wait_for_the_summary(container, monkeypatch):
+    monkeypatch.setattr(th.settings, "window_size", 4)
+    slow = SlowSummaryLLM()
+    container.summary_llm = slow
+    container.summary_worker = SummaryWorker(max_concurrency=1)
+    container.short_mem.replace_window(5, [HumanMessage(content="q1"), AIMessage(content="a1")])
+
+    # window reaches 4 → summary is scheduled, reply path returns right away
+    await asyncio.wait_for(th._after_turn(container, 5, "q2", "a2"), 1)
+    assert container.summary_worker.pending(5)
+
+    # a turn lands while the summary is still being written
+    await th._after_turn(container, 5, "q3", "a3")
+    slow.release.set()
+    await container.summary_worker.drain(timeout=2)
+
+    win = container.short_mem.get_window(5)
+    assert [m.content for m in win] == ["q3", "a3"]            # newer turn kept
+    assert container.durable_mem.get_summary(5) == "they talked about the keynote"
+    assert container.durable_mem._cursor[5] == 4
+    assert slow.calls == 1
+
+
+class FailingSummaryLLM:
+    def invoke(self, messages):
+        raise TimeoutError("summary model timed out")
+
+
+@pytest.mark.asyncio
+async def test_failed_summary_job_is_counted(container, monkeypatch):
+    monkeypatch.setattr(th.settings, "window_size", 2)
+    container.summary_llm = FailingSummaryLLM()
+    container.summary_worker = SummaryWorker(max_concurrency=1)
+    errors = SUMMARY_JOBS.labels(result="error")._value.get()
+
+    await th._after_turn(container, 6, "q1", "a1")
+    await container.summary_worker.drain(timeout=2)
+
+    assert SUMMARY_JOBS.labels(result="error")._value.get() - errors == 1
+    assert [m.content for m in container.short_mem.get_window(6)] == ["q1", "a1"]   # window kept
+
+
+def _compact_script(r):
+    """Python stand-in for the compact Lua script on the FakeRedis list."""
+    def run(keys, args):
+        lst = r.data.get(keys[0], [])
+        n = int(args[1])
+        span = [r._b(a) for a in args[2:2 + n]]
+        for pos in reversed([i for i, v in enumerate(lst) if v == span[0]]):   # LPOS ... RANK -1 COUNT 0
+            if lst[pos:pos + n] == span[:len(lst[pos:pos + n])]:
+                r.data[keys[0]] = lst[:pos] + [r._b(a) for a in args[2 + n:]]
+                return 1
+        return 0
+    return run
+
+
+def test_redis_compact_window_keeps_newer_turns(fake_redis, monkeypatch):
+    monkeypatch.setattr(fake_redis, "register_script", lambda script: _compact_script(fake_redis), raising=False)
+    store = RedisMemoryStore()
+    snapshot = store.append_turn(9, [HumanMessage(content="q1"), AIMessage(content="a1")], fetch=10)
+    store.append_turn(9, [HumanMessage(content="q2"), AIMessage(content="a2")])
+
+    assert store.compact_window(9, snapshot, [SystemMessage(content="(summary) s")])
+    assert [m.content for m in store.get_window(9)] == ["(summary) s", "q2", "a2"]
+    raw = fake_redis.data[store._k(9)][-1]
+    assert json.loads(raw)["type"] == "system"
+
+    store.clear(9)
+    assert store.compact_window(9, snapshot, [SystemMessage(content="(summary) s")]) is False
+
+
+def test_compaction_matches_entries_not_repeated_texts(fake_redis, monkeypatch):
+    monkeypatch.setattr(fake_redis, "register_script", lambda script: _compact_script(fake_redis), raising=False)
+    store = RedisMemoryStore()
+    store.append_turn(9, [HumanMessage(content="ok"), AIMessage(content="sure")])
+    snapshot = store.append_turn(9, [HumanMessage(content="ok"), AIMessage(content="thanks")], fetch=10)
+    store.append_turn(9, [HumanMessage(content="ok"), AIMessage(content="thanks")])
+
+    # only the first three entries were summarized; the later "ok"/"thanks" are other entries
+    assert store.compact_window(9, snapshot[:3], [SystemMessage(content="(summary) s")])
+    assert [m.content for m in store.get_window(9)] == ["(summary) s", "thanks", "ok", "thanks"]
+    assert store.get_window(9)[1].id == snapshot[3].id
+
+
+def test_messages_over_the_summary_budget_stay_in_the_window(container, monkeypatch):
+    monkeypatch.setattr(th.settings, "window_size", 4)
+    monkeypatch.setattr(th.settings, "summary_max_input_tokens", 60)
+    container.summary_llm = SlowSummaryLLM()
+    container.summary_llm.release.set()
+    window = [HumanMessage(content=f"question {i} " + "detail " * 20) for i in range(4)]
+    container.short_mem.replace_window(8, window)
+
+    th._summarize_window(container, 8, window)
+
+    left = container.short_mem.get_window(8)
+    covered = container.durable_mem._cursor[8]
+    assert 0 < covered < 4
+    assert left == window[covered:]                            # unfolded messages wait for the next cycle
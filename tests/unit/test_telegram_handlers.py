@@ -44,3 +44,14 @@ async def test_send_response_image(tmp_path):
     resp = {"messages": [HumanMessage(content="x")], "response_type": "image", "image_path": str(p)}
     await _send_response(update, DummyCtx(), resp)
     assert len(update.message.sent["photo"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_send_response_audio_file_is_streamed_and_removed(tmp_path):
+    p = tmp_path / "voice.mp3"
+    p.write_bytes(b"mp3")
+    update = DummyUpdate()
+    resp = {"messages": [HumanMessage(content="x")], "response_type": "audio", "audio_path": str(p)}
+    await _send_response(update, DummyCtx(), resp)
+    assert len(update.message.sent["voice"]) == 1
+    assert not p.exists()
@@ -7,6 +7,12 @@ class ShortMemFake:
     def __init__(self): self.w = {}; self.ops=[]
     def append_message(self, chat_id, msg):
         self.w.setdefault(chat_id, []).append(msg)
+    def append_turn(self, chat_id, msgs, fetch=None):
+        for m in msgs: self.append_message(chat_id, m)
+        return self.get_window(chat_id, fetch) if fetch else []
+    def replace_window(self, chat_id, msgs):
+        self.clear(chat_id)
+        for m in msgs: self.append_message(chat_id, m)
     def get_window(self, chat_id, k=30):
         return list(self.w.get(chat_id, []))[-k:]
     def clear(self, chat_id): self.ops.append(("clear", chat_id)); self.w.pop(chat_id, None)
@@ -15,7 +21,7 @@ class DurableMemFake:
     def __init__(self): self.summ={}; self.ops=[]
     def ensure_user(self, **kw): pass
     def ensure_chat(self, **kw): pass
-    def set_summary(self, chat_id, text): self.summ[chat_id]=text; self.ops.append(("set_summary", chat_id, text))
+    def set_summary(self, chat_id, text, covered=0): self.summ[chat_id]=text; self.ops.append(("set_summary", chat_id, text))
     def get_summary(self, chat_id): return self.summ.get(chat_id)
     def add_message(self, **kw): self.ops.append(("add", kw))
 
@@ -68,12 +74,19 @@ def test_after_reply_triggers_summary(monkeypatch):
     # force summarize when len(window) >= settings.window_size
     monkeypatch.setattr("app.adapters.telegram_handlers.settings", 
                         types.SimpleNamespace(window_size=1))
-    # make summarize_window return fixed text
-    monkeypatch.setattr("app.adapters.telegram_handlers.summarize_window",
-                        lambda llm, w: "compact summary")
+    # make the incremental summarizer return fixed text
+    seen = {}
+    def fake_summarize(llm, previous, delta):
+        seen.update(previous=previous, delta=[m.content for m in delta])
+        return "compact summary", list(delta)
+    monkeypatch.setattr("app.adapters.telegram_handlers.summarize_incremental", fake_summarize)
+    c.durable_mem.summ[10] = "older summary"
     th._after_reply(c, chat_id=10, user_msg="u", ai_msg="a")
-    # set_summary called and short_mem cleared then a (summary) SystemMessage appended
+    # previous summary + new messages in; summary stored durably; window cleared
+    assert seen == {"previous": "older summary", "delta": ["u", "a"]}
     assert ("set_summary", 10, "compact summary") in c.durable_mem.ops
     assert ("clear", 10) in c.short_mem.ops
-    win = c.short_mem.get_window(10)
-    assert any(isinstance(m, SystemMessage) and "(summary)" in m.content for m in win)
+    assert c.short_mem.get_window(10) == []
+    # the next context carries the summary once, from durable memory
+    ctx = th._build_context(c, 10, "next")
+    assert [m.content for m in ctx] == ["(summary) compact summary", "next"]
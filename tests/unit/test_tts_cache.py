@@ -0,0 +1,80 @@
+import os
+
+from app.adapters.tts_cache import CachedTTS, tts_cache_key
+from app.metrics import BLOB_CACHE_BYTES_SAVED
+from app.utils.disk_cache import DiskLRU
+
+
+class CountingTTS:
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return f"audio:{text}".encode()
+
+    def to_file(self, text):
+        self.calls += 1
+        p = self.tmp_path / f"synth-{self.calls}.mp3"
+        p.write_bytes(f"audio:{text}".encode())
+        return str(p)
+
+
+def _cache(tmp_path, max_bytes=10_000):
+    return DiskLRU("tts_test", str(tmp_path / "cache"), max_bytes=max_bytes, suffix=".mp3")
+
+
+def test_repeat_text_is_served_from_disk(tmp_path):
+    inner = CountingTTS(tmp_path)
+    tts = CachedTTS(inner, _cache(tmp_path))
+    saved = BLOB_CACHE_BYTES_SAVED.labels(cache="tts_test")._value.get()
+
+    first = tts.to_file("Hi, this is Karan.")
+    second = tts.to_file("Hi, this is Karan.")
+    assert inner.calls == 1
+    assert first != second
+    with open(second, "rb") as f:
+        assert f.read() == b"audio:Hi, this is Karan."
+
+    # the caller deleting its copy leaves the cached blob intact
+    os.remove(second)
+    assert tts.to_file("Hi, this is Karan.")
+    assert inner.calls == 1
+    assert tts.cache.hit_ratio == 2 / 3
+    assert BLOB_CACHE_BYTES_SAVED.labels(cache="tts_test")._value.get() - saved == 2 * len(b"audio:Hi, this is Karan.")
+
+    assert tts("Hi, this is Karan.") == b"audio:Hi, this is Karan."
+    assert inner.calls == 1
+
+
+def test_key_depends_on_voice_and_model():
+    assert tts_cache_key("hi", "v1", "m1") != tts_cache_key("hi", "v2", "m1")
+    assert tts_cache_key("hi", "v1", "m1") != tts_cache_key("hi", "v1", "m2")
+    assert tts_cache_key(" hi ", "v1", "m1") == tts_cache_key("hi", "v1", "m1")
+
+
+def test_lru_eviction_keeps_recent_blobs(tmp_path):
+    cache = _cache(tmp_path, max_bytes=350)
+    for i in range(3):
+        cache.put_bytes(f"{i:064d}", b"x" * 100)
+        os.utime(cache.path_for(f"{i:064d}"), (i, i))   # deterministic ages
+    cache.get(f"{0:064d}")                                # 0 becomes most recent
+    cache.put_bytes(f"{3:064d}", b"x" * 100)
+
+    assert cache.size_bytes <= 350
+    assert cache.get(f"{0:064d}") is not None
+    assert cache.get(f"{1:064d}") is None
+
+
+def test_eviction_skips_blobs_removed_mid_scan(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, max_bytes=1000)
+    for i in range(2):
+        cache.put_bytes(f"{i:064d}", b"x" * 100)
+    entries = list(cache._blobs())
+    os.remove(cache.path_for(f"{0:064d}"))              # e.g., another replica evicted it
+    monkeypatch.setattr(cache, "_blobs", lambda: iter(entries))
+
+    cache.max_bytes = 50
+    assert cache.evict() == 1
+    assert cache.size_bytes == 0
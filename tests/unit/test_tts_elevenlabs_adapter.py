@@ -16,3 +16,23 @@ def test_tts_synth_monkeypatched(monkeypatch):
     data = synth("hello")
     assert isinstance(data, bytes)
     assert data == b"abc123"
+
+
+def test_tts_to_file_streams_chunks(monkeypatch, tmp_path):
+    seen = []
+
+    class DummyTextToSpeech:
+        @staticmethod
+        def convert(**kwargs):
+            for c in (b"abc", b"123"):
+                seen.append(c)
+                yield c
+
+    class DummyClient:
+        text_to_speech = DummyTextToSpeech()
+
+    monkeypatch.setattr("app.adapters.tts_elevenlabs.ElevenLabs", lambda **_: DummyClient)
+    path = build_tts().to_file("hello")
+    assert path.startswith(str(tmp_path / "media" / "tts")) and path.endswith(".mp3")
+    with open(path, "rb") as f:
+        assert f.read() == b"abc123"
@@ -9,7 +9,7 @@ def test_build_vectorstore_monkeypatched(monkeypatch):
             self.embedding_function = embedding_function
             self.persist_directory = persist_directory
 
-    monkeypatch.setattr("app.adapters.vector_chroma.OpenAIEmbeddings", lambda model=None: DummyEmb(model=model))
+    monkeypatch.setattr("app.adapters.vector_chroma.OpenAIEmbeddings", lambda model=None, **kw: DummyEmb(model=model))
     monkeypatch.setattr("app.adapters.vector_chroma.Chroma",
                         lambda collection_name=None, embedding_function=None, persist_directory=None:
                             DummyVS(collection_name, embedding_function, persist_directory))
@@ -0,0 +1,123 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.adapters.vector_numpy import NumpyVectorStore
+from app.workflows.ingestion import Ingestor
+
+
+class KeywordEmb:
+    """Bag-of-words vectors over a tiny vocabulary (deterministic, no network)."""
+    VOCAB = ["keynote", "lunch", "room", "karan", "panel", "venue"]
+
+    def _vec(self, text):
+        words = text.lower().split()
+        return [float(sum(w.startswith(v) for w in words)) for v in self.VOCAB]
+
+    def embed_documents(self, texts):
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vec(text)
+
+
+def test_cosine_top_k_with_filters(tmp_path):
+    vs = NumpyVectorStore(str(tmp_path / "idx"), KeywordEmb())
+    vs.add_texts(
+        ["keynote by karan", "lunch in the venue", "panel in room B204", "keynote replay in room A1"],
+        metadatas=[{"source": "schedule.md"}, {"source": "venue.md"}, {"source": "schedule.md"},
+                   {"source": "replays.md"}],
+    )
+    top = vs.search("karan keynote", k=2)
+    assert [d.page_content for d in top] == ["keynote by karan", "keynote replay in room A1"]
+    assert top[0].metadata["score"] >= top[1].metadata["score"]
+
+    only = vs.search("keynote", k=3, filter={"source": ["schedule.md", "venue.md"]})
+    assert [d.page_content for d in only][0] == "keynote by karan"
+    assert all(d.metadata["source"] != "replays.md" for d in only)
+    assert vs.search("keynote", k=3, filter={"source": "nope.md"}) == []
+    assert len(vs.as_retriever(k=1).invoke("lunch")) == 1
+
+
+def test_persists_across_reopen(tmp_path):
+    path = str(tmp_path / "idx")
+    vs = NumpyVectorStore(path, KeywordEmb())
+    rng = np.random.default_rng(0)
+    ids = [f"id{i}" for i in range(600)]
+    vecs = rng.standard_normal((600, 6)).astype(np.float32)
+    vs.upsert(ids, [f"text {i}" for i in range(600)], vecs, [{"n": i} for i in range(600)])
+    vs.delete(["id0", "id10", "missing"])
+    vs.upsert(["id5"], ["text 5 v2"], [vecs[5]], [{"n": 5}])
+
+    reopened = NumpyVectorStore(path, KeywordEmb())
+    assert len(reopened) == 598 and "id0" not in reopened.ids()
+    hit = reopened.search_by_vector(vecs[599], k=1)[0]
+    assert hit.id == "id599" and hit.metadata["n"] == 599
+    assert reopened.search_by_vector(vecs[5], k=1)[0].page_content == "text 5 v2"
+    assert reopened.nbytes == 598 * 6 * 4
+    assert sorted(f for f in os.listdir(path) if f.endswith(".f32")) == ["vectors.3.f32"]   # old generations removed
+
+
+def test_other_process_sees_consistent_rows(tmp_path):
+    path = str(tmp_path / "idx")
+    writer, reader = NumpyVectorStore(path, KeywordEmb()), None
+    writer.add_texts(["keynote by karan", "lunch in the venue", "panel in room B204"])
+    reader = NumpyVectorStore(path, KeywordEmb())                # e.g., the bot, while ingestion runs
+    assert reader.search("panel room", k=1)[0].page_content == "panel in room B204"
+
+    mapped, before = reader._mat, np.array(reader._mat)
+    writer.delete([writer.ids()[0]])
+    assert np.array_equal(mapped, before)                        # rows a reader has mapped never change
+    assert [d.page_content for d in reader.search("panel room", k=3)] == ["panel in room B204",
+                                                                          "lunch in the venue"]
+    writer.upsert(["new"], ["keynote replay"], [KeywordEmb()._vec("keynote")])
+    top = reader.search("keynote", k=1)[0]
+    assert (top.id, top.page_content) == ("new", "keynote replay")
+    assert len(reader) == 3
+
+
+def test_writers_in_different_processes_do_not_lose_batches(tmp_path):
+    path = str(tmp_path / "idx")
+    # Separate instances lock like separate processes (one flock per open file).
+    writers = [NumpyVectorStore(path, KeywordEmb()) for _ in range(2)]
+
+    def write(w, tag):
+        for i in range(15):
+            w.upsert([f"{tag}{i}"], [f"{tag} {i}"], [[1.0, i, 0, 0, 0, 0]])
+            if i % 5 == 4:
+                w.delete([f"{tag}{i - 1}"])
+
+    with ThreadPoolExecutor(2) as ex:
+        list(ex.map(write, writers, ["a", "b"]))
+
+    ids = set(NumpyVectorStore(path, KeywordEmb()).ids())
+    expected = {f"{t}{i}" for t in "ab" for i in range(15)} - {f"{t}{i}" for t in "ab" for i in (3, 8, 13)}
+    assert ids == expected
+    assert [f for f in os.listdir(path) if f.endswith(".f32")] == ["vectors.36.f32"]   # one generation per write
+
+
+def test_reads_the_pre_generation_layout(tmp_path):
+    path = tmp_path / "idx"
+    path.mkdir()
+    vecs = np.zeros((256, 6), dtype=np.float32)                  # spare capacity past the live rows
+    vecs[0, 0] = vecs[1, 1] = 1.0
+    vecs.tofile(path / "vectors.f32")
+    (path / "meta.json").write_text(json.dumps(
+        {"dim": 6, "ids": ["a", "b"], "texts": ["keynote", "lunch"], "metadatas": [{}, {}]}))
+
+    vs = NumpyVectorStore(str(path), KeywordEmb())
+    assert vs.search("lunch", k=1)[0].id == "b"
+    vs.delete(["a"])
+    assert sorted(os.listdir(path)) == ["meta.json", "vectors.1.f32", "write.lock"]
+    assert NumpyVectorStore(str(path), KeywordEmb()).search("lunch", k=1)[0].id == "b"
+
+
+def test_ingestion_into_the_numpy_backend(tmp_path):
+    emb = KeywordEmb()
+    vs = NumpyVectorStore(str(tmp_path / "idx"), emb)
+    docs = [("schedule.md", "Keynote by Karan at 9\n\nLunch at the venue\n\nPanel in room B204")]
+    assert Ingestor(vs, emb, chunk_chars=25).run(docs).embedded == 3
+    assert vs.search("panel room", k=1)[0].page_content == "Panel in room B204"
+    assert Ingestor(vs, emb, chunk_chars=25).run(docs).embedded == 0
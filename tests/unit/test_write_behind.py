@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.adapters import telegram_handlers as th
+from app.adapters.write_behind import WriteBehindQueue
+from app.metrics import HISTORY_FLUSHES, HISTORY_QUEUE_LAG, HISTORY_ROWS_DROPPED
+
+
+class Sink:
+    def __init__(self, fail_times=0):
+        self.calls = []
+        self.fail_times = fail_times
+
+    async def __call__(self, chat_id, turns):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("db down")
+        self.calls.append((chat_id, list(turns)))
+
+
+@pytest.mark.asyncio
+async def test_batches_by_size_and_keeps_per_chat_order():
+    sink = Sink()
+    q = WriteBehindQueue(sink, batch_size=4, flush_interval=60).start()
+    await q.put(1, [("user", "a"), ("assistant", "b")])
+    await q.put(2, [("user", "x"), ("assistant", "y")])   # reaches batch size
+    await asyncio.sleep(0.01)
+    assert sink.calls == [(1, [("user", "a"), ("assistant", "b")]), (2, [("user", "x"), ("assistant", "y")])]
+    assert len(q) == 0
+    await q.close()
+
+
+@pytest.mark.asyncio
+async def test_flushes_by_time_and_records_lag():
+    sink = Sink()
+    lag = HISTORY_QUEUE_LAG._sum.get()
+    q = WriteBehindQueue(sink, batch_size=100, flush_interval=0.02).start()
+    await q.put(1, [("user", "hi")])
+    assert sink.calls == []                                # not on the reply path
+    await asyncio.sleep(0.08)
+    assert sink.calls == [(1, [("user", "hi")])]
+    assert HISTORY_QUEUE_LAG._sum.get() > lag
+    await q.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried_and_close_drains():
+    sink = Sink(fail_times=1)
+    errors = HISTORY_FLUSHES.labels(result="error")._value.get()
+    q = WriteBehindQueue(sink, batch_size=100, flush_interval=60).start()
+    await q.put(1, [("user", "a")])
+    assert await q.flush() == 0                            # DB down: rows kept
+    await q.put(1, [("assistant", "b")])
+    await q.close()                                        # shutdown flushes everything
+    assert sink.calls == [(1, [("user", "a"), ("assistant", "b")])]
+    assert HISTORY_FLUSHES.labels(result="error")._value.get() - errors == 1
+
+
+@pytest.mark.asyncio
+async def test_put_applies_backpressure_when_full():
+    gate = asyncio.Event()
+    written = []
+
+    async def slow_sink(chat_id, turns):
+        await gate.wait()
+        written.extend(turns)
+
+    q = WriteBehindQueue(slow_sink, batch_size=100, flush_interval=60, max_pending=2).start()
+    await q.put(1, [("user", "a"), ("assistant", "b")])
+    blocked = asyncio.ensure_future(q.put(1, [("user", "c")]))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    gate.set()
+    await asyncio.wait_for(blocked, 1)
+    await q.close()
+    assert [c for _, c in written] == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_put_drops_rows_when_the_queue_stays_full():
+    gate = asyncio.Event()
+
+    async def stuck_sink(chat_id, turns):
+        await gate.wait()
+
+    dropped = HISTORY_ROWS_DROPPED.labels(reason="backpressure")._value.get()
+    q = WriteBehindQueue(stuck_sink, batch_size=100, flush_interval=60, max_pending=2, put_timeout=0.05).start()
+    await q.put(1, [("user", "a"), ("assistant", "b")])
+    await asyncio.wait_for(q.put(1, [("user", "c")]), 1)   # returns instead of waiting forever
+    assert HISTORY_ROWS_DROPPED.labels(reason="backpressure")._value.get() - dropped == 1
+    gate.set()
+    await q.close()
+
+
+@pytest.mark.asyncio
+async def test_poison_row_is_quarantined_without_blocking_other_chats():
+    written = []
+
+    async def sink(chat_id, turns):
+        if any("\x00" in c for _, c in turns):
+            raise ValueError("A string literal cannot contain NUL (0x00) characters.")
+        written.append((chat_id, [c for _, c in turns]))
+
+    quarantined = HISTORY_ROWS_DROPPED.labels(reason="quarantined")._value.get()
+    q = WriteBehindQueue(sink, batch_size=100, flush_interval=60, max_attempts=2)
+    await q.put(1, [("user", "bad\x00"), ("assistant", "reply")])
+    await q.put(2, [("user", "fine")])
+    assert await q.flush() == 1                            # chat 2 is not held up by chat 1
+    assert written == [(2, ["fine"])]
+
+    assert await q.flush(force=True) == 1                  # out of attempts: rows written one by one
+    assert written[-1] == (1, ["reply"])
+    assert len(q) == 0
+    assert HISTORY_ROWS_DROPPED.labels(reason="quarantined")._value.get() - quarantined == 1
+
+
+@pytest.mark.asyncio
+async def test_after_turn_enqueues_instead_of_writing(container):
+    q = WriteBehindQueue(Sink(), batch_size=100, flush_interval=60)
+    container.history_writer = q
+    await th._after_turn(container, 7, "hello", "hi there")
+    assert container.durable_mem._messages == []
+    assert len(q) == 2